@@ -6,17 +6,258 @@ Provides interface for Sentinel-1 data search and download
 import logging
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import hashlib
 from typing import Dict, Any, List, Tuple, Optional
 from pathlib import Path
 from datetime import datetime
 import json
+import time
+import mmap
+import functools
+import threading
 import zipfile
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import httpx
+    import h2  # noqa: F401 - required by httpx for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Non-200 search responses raise the error type of whichever client sent them
+if HTTP2_AVAILABLE:
+    _HTTP_STATUS_ERRORS = (requests.HTTPError, httpx.HTTPStatusError)
+else:
+    _HTTP_STATUS_ERRORS = (requests.HTTPError,)
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+HASH_SLICE_SIZE = 64 * 1024 * 1024  # 64MB
+RANGE_CONNECTIONS = 8
+HTTP_POOL_SIZE = 32  # Pooled connections; also caps concurrent download streams
+RANGE_MIN_SIZE = 64 * 1024 * 1024  # 64MB; smaller files use a single stream
+PROGRESS_INTERVAL = 0.1  # seconds between progress callbacks
+PROGRESS_BYTES = 64 * 1024 * 1024  # or every 64MB, whichever comes first
+AUTH_VERIFY_TTL = 3600  # seconds a verified token is trusted without re-checking
+SEARCH_CACHE_TTL = 300  # seconds
+
+# ASF search result fields and the product keys they map to
+_ASF_FIELDS = (
+    "granuleName", "fileName", "url", "sizeMB", "startTime", "stopTime",
+    "pathNumber", "frameNumber", "flightDirection", "polarization",
+    "beamModeType", "processingLevel", "browseUrl", "md5sum"
+)
+_PRODUCT_KEYS = (
+    "granule_name", "file_name", "url", "file_size", "start_time", "stop_time",
+    "path", "frame", "flight_direction", "polarization",
+    "beam_mode", "processing_level", "browse_url", "md5sum"
+)
+
+# Columnar layout for search results (same order as _PRODUCT_KEYS) and the
+# values used for missing fields. String columns ("U") are sized from the data
+_PRODUCT_COLUMNS = (
+    ("granule_name", "U"), ("file_name", "U"), ("url", "U"), ("file_size", "f8"),
+    ("start_time", "U"), ("stop_time", "U"), ("path", "i4"), ("frame", "i4"),
+    ("flight_direction", "U"), ("polarization", "U"), ("beam_mode", "U"),
+    ("processing_level", "U"), ("browse_url", "U"), ("md5sum", "U")
+)
+_PRODUCT_FILL = ("", "", "", np.nan, "", "", -1, -1, "", "", "", "", "", "")
+
+
+def _new_md5():
+    """Create an MD5 hasher for integrity checks (not used for security)"""
+    try:
+        return hashlib.md5(usedforsecurity=False)
+    except TypeError:
+        return hashlib.md5()
+
+
+def _records_to_array(records: List[Dict[str, Any]]) -> np.ndarray:
+    """Project ASF search records straight into a structured array"""
+    columns = []
+    dtype = []
+    for field, (name, kind), fill in zip(_ASF_FIELDS, _PRODUCT_COLUMNS, _PRODUCT_FILL):
+        values = [item.get(field) for item in records]
+        values = [fill if value is None or value == "" else value for value in values]
+        if kind == "U":
+            values = [str(value) for value in values]
+            kind = f"U{max(map(len, values), default=0) or 1}"
+        columns.append(values)
+        dtype.append((name, kind))
+    
+    products = np.empty(len(records), dtype=dtype)
+    for (name, _), values in zip(dtype, columns):
+        products[name] = values
+    return products
+
+
+def products_to_pylist(products: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    Convert a structured product array back to the list-of-dicts form
+    
+    Missing or empty fields come back as None.
+    
+    Args:
+        products: Products returned by search_sentinel1(..., as_array=True)
+        
+    Returns:
+        List of product dicts
+    """
+    def _value(value, fill):
+        if value == fill or (isinstance(value, float) and np.isnan(value)):
+            return None
+        return value
+    
+    return [
+        {key: _value(value, fill) for key, value, fill in zip(_PRODUCT_KEYS, row, _PRODUCT_FILL)}
+        for row in products.tolist()
+    ]
+
+
+def _sha256_stream(f) -> str:
+    """SHA-256 hex digest of a binary stream"""
+    sha = hashlib.sha256()
+    for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+        sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _extract_member(
+    zf: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+    output_path: Path,
+    blob_dir: Optional[Path] = None
+):
+    """
+    Extract one archive member through a handle owned by the calling thread
+    
+    With a blob_dir, file contents are deduplicated through a content-addressed
+    store: members already seen in an earlier extraction are hard-linked from
+    the store instead of being written again. Extracted files then share an
+    inode with the store and must be treated as read-only.
+    """
+    root = output_path.resolve()
+    target = (root / info.filename).resolve()
+    
+    if blob_dir is None or info.is_dir() or not target.is_relative_to(root):
+        zf.extract(info, output_path)
+        return
+    
+    # Blobs are bucketed by CRC-32 and size, so members without a
+    # matching bucket skip hashing before the write
+    bucket = blob_dir / f"{info.CRC:08x}-{info.file_size}"
+    if bucket.is_dir():
+        with zf.open(info) as src:
+            blob = bucket / _sha256_stream(src)
+        if blob.exists():
+            target.unlink(missing_ok=True)
+            try:
+                os.link(blob, target)
+                return
+            except OSError as e:
+                # e.g. EXDEV when output_dir is on another filesystem
+                logger.debug(f"Blob store link skipped for {info.filename}: {e}")
+    
+    # Never write through an existing hard link into the store; hash the
+    # member while writing it rather than re-reading the file afterwards
+    target.unlink(missing_ok=True)
+    sha = hashlib.sha256()
+    with zf.open(info) as src, open(target, "wb") as dst:
+        _copy_stream(src, dst, sha)
+    
+    # Register the new content in the store
+    blob = bucket / sha.hexdigest()
+    try:
+        bucket.mkdir(parents=True, exist_ok=True)
+        os.link(target, blob)
+    except FileExistsError:
+        pass
+    except OSError as e:
+        logger.debug(f"Blob store link skipped for {info.filename}: {e}")
+
+
+def _copy_stream(src, dst, hasher=None):
+    """
+    Copy src to dst through one reusable buffer (no per-chunk bytes objects)
+    
+    If a hasher is given it is fed the same buffer, fusing the checksum into
+    the copy instead of re-reading the file afterwards.
+    
+    Returns:
+        Number of bytes copied
+    """
+    buf = bytearray(DOWNLOAD_CHUNK_SIZE)
+    copied = 0
+    with memoryview(buf) as view:
+        while True:
+            n = src.readinto(view)
+            if not n:
+                break
+            dst.write(view[:n])
+            if hasher is not None:
+                hasher.update(view[:n])
+            copied += n
+    return copied
+
+
+class _ProgressTracker:
+    """Thread-safe byte counter that reports to a progress callback
+    
+    Reports are throttled to one per PROGRESS_INTERVAL seconds or
+    PROGRESS_BYTES bytes, plus a final report on completion.
+    """
+    
+    def __init__(self, total_size: int, progress_callback: callable):
+        self.total_size = total_size
+        self.downloaded_size = 0
+        self.progress_callback = progress_callback
+        self._lock = threading.Lock()
+        self._next_time = time.monotonic() + PROGRESS_INTERVAL
+        self._next_bytes = PROGRESS_BYTES
+    
+    def advance(self, nbytes: int):
+        with self._lock:
+            self.downloaded_size += nbytes
+            now = time.monotonic()
+            if (self.downloaded_size < self.total_size
+                    and self.downloaded_size < self._next_bytes
+                    and now < self._next_time):
+                return
+            
+            self._next_time = now + PROGRESS_INTERVAL
+            self._next_bytes = self.downloaded_size + PROGRESS_BYTES
+            self.progress_callback(
+                self.downloaded_size / self.total_size * 100,
+                self.downloaded_size,
+                self.total_size
+            )
+
+
+class _ProgressWriter:
+    """File wrapper that reports bytes written to a progress tracker"""
+    
+    def __init__(self, f, tracker: _ProgressTracker):
+        self._file = f
+        self.tracker = tracker
+    
+    def write(self, data) -> int:
+        written = self._file.write(data)
+        self.tracker.advance(written)
+        return written
+
 
 class ASFAPIClient:
     """Client for ASF Data Search and Download API"""
@@ -38,27 +279,89 @@ class ASFAPIClient:
         self.search_url = "https://api.daac.asf.alaska.edu/services/search/param"
         self.download_url = "https://data.asf.alaska.edu"
         
+        # Search parameters that only change when callers override the defaults
+        self._search_param_template = {
+            "platform": "Sentinel-1",
+            "beamMode": "IW",
+            "processingLevel": "SLC",
+            "polarization": "VV+VH",
+            "output": "json"
+        }
+        
         self.session = requests.Session()
+        
+        # Pooled keep-alive connections with retry on transient server errors
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Connection"] = "keep-alive"
+        
+        # Concurrent products x range connections can exceed the pool; streams
+        # beyond it would open throwaway connections, so they wait for a slot
+        self._download_slots = threading.BoundedSemaphore(HTTP_POOL_SIZE)
+        
+        # Search/metadata calls go over one multiplexed HTTP/2 connection when
+        # available; bulk downloads stay on the pooled requests session
+        self.search_client = None
+        if HTTP2_AVAILABLE:
+            self.search_client = httpx.Client(
+                http2=True,
+                timeout=60,
+                headers={"Accept": "application/json"},
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+                # httpx only retries failed connects; 5xx are not retried here
+                transport=httpx.HTTPTransport(http2=True, retries=5)
+            )
+        
         self.download_dir = Path("./data/sentinel1")
         self.download_dir.mkdir(parents=True, exist_ok=True)
         
         self._authenticated = False
+        self._auth_verified_at = 0.0
         
-        # Auto-authenticate if token is available
+        # Per-client search cache, keyed by canonical params + TTL bucket
+        self._search_raw = functools.lru_cache(maxsize=128)(self._fetch_search)
+        
+        # Auto-authenticate if token is available; it is only trusted without
+        # a probe once a 200 response has verified it
         if self.token:
             self._setup_token_auth()
         
         logger.info("ASFAPIClient initialized")
     
+    def close(self):
+        """Close the download session and the search client's connections"""
+        self.session.close()
+        if self.search_client is not None:
+            self.search_client.close()
+    
+    def __enter__(self) -> "ASFAPIClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def _setup_token_auth(self):
         """Setup Bearer token authentication"""
         self.session.headers.update({
             "Authorization": f"Bearer {self.token}",
             "Accept": "application/json"
         })
+        if self.search_client is not None:
+            self.search_client.headers["Authorization"] = f"Bearer {self.token}"
         self._authenticated = True
         logger.info("ASF token authentication configured")
     
+    def _reject_auth(self):
+        """Forget a verification after the server rejected the credentials"""
+        # Forces a full re-authentication on the next authenticate() call
+        self._authenticated = False
+        self._auth_verified_at = 0.0
+    
     def authenticate(self) -> bool:
         """
         Authenticate with ASF/Earthdata
@@ -68,17 +371,22 @@ class ASFAPIClient:
         """
         # If token is available, use token auth
         if self.token:
+            # Fast path: token verified by a recent 200 and not rejected since
+            if self._authenticated and time.time() - self._auth_verified_at < AUTH_VERIFY_TTL:
+                return True
+            
             self._setup_token_auth()
             # Verify token by making a test request
             try:
                 test_url = "https://api.daac.asf.alaska.edu/services/search/param?platform=Sentinel-1&maxResults=1&output=json"
                 response = self.session.get(test_url, timeout=30)
                 if response.status_code == 200:
+                    self._auth_verified_at = time.time()
                     logger.info("ASF token authentication verified")
                     return True
                 else:
                     logger.warning(f"ASF token verification failed: {response.status_code}")
-                    self._authenticated = False
+                    self._reject_auth()
                     return False
             except Exception as e:
                 logger.error(f"ASF token verification error: {e}")
@@ -94,6 +402,8 @@ class ASFAPIClient:
             auth_url = "https://urs.earthdata.nasa.gov/oauth/authorize"
             
             self.session.auth = (self.username, self.password)
+            if self.search_client is not None:
+                self.search_client.auth = (self.username, self.password)
             
             # Test authentication
             test_url = "https://api.daac.asf.alaska.edu/services/utils/mission_list"
@@ -111,6 +421,37 @@ class ASFAPIClient:
             logger.error(f"ASF authentication error: {e}")
             return False
     
+    def _fetch_search(self, params: Tuple[Tuple[str, Any], ...], time_bucket: int) -> bytes:
+        """
+        Execute a search request and return the raw response body
+        
+        Args:
+            params: Search parameters as sorted (key, value) pairs
+            time_bucket: Cache TTL bucket; only part of the cache key
+            
+        Returns:
+            Raw JSON response body
+        """
+        if self.search_client is not None:
+            response = self.search_client.get(self.search_url, params=dict(params))
+        else:
+            response = self.session.get(self.search_url, params=dict(params), timeout=60)
+        
+        if response.status_code in (401, 403):
+            self._reject_auth()
+        
+        if response.status_code != 200:
+            if self.search_client is not None:
+                raise httpx.HTTPStatusError(
+                    f"Search failed: {response.status_code}",
+                    request=response.request,
+                    response=response
+                )
+            raise requests.HTTPError(response=response)
+        
+        self._auth_verified_at = time.time()
+        return response.content
+    
     def search_sentinel1(
         self,
         start_date: str,
@@ -121,7 +462,8 @@ class ASFAPIClient:
         processing_level: str = "SLC",
         polarization: str = "VV+VH",
         flight_direction: str = None,
-        max_results: int = 100
+        max_results: int = 100,
+        as_array: bool = False
     ) -> Dict[str, Any]:
         """
         Search for Sentinel-1 products
@@ -136,6 +478,9 @@ class ASFAPIClient:
             polarization: Polarization (VV, VH, VV+VH)
             flight_direction: Flight direction (ASCENDING, DESCENDING)
             max_results: Maximum number of results
+            as_array: Return products as a NumPy structured array (one column
+                per field) instead of a list of dicts; products_to_pylist()
+                converts it back
             
         Returns:
             Search results
@@ -143,51 +488,45 @@ class ASFAPIClient:
         try:
             logger.info(f"Searching Sentinel-1 data: {start_date} to {end_date}")
             
-            # Build search parameters
-            params = {
-                "platform": platform,
-                "beamMode": beam_mode,
-                "processingLevel": processing_level,
-                "polarization": polarization,
-                "start": start_date,
-                "end": end_date,
-                "bbox": f"{bbox[0]},{bbox[1]},{bbox[2]},{bbox[3]}",
-                "maxResults": max_results,
-                "output": "json"
-            }
+            # Build search parameters from the fixed template
+            params = self._search_param_template.copy()
+            params.update(
+                start=start_date,
+                end=end_date,
+                bbox=",".join(map(str, bbox)),
+                maxResults=max_results
+            )
+            
+            if platform != "Sentinel-1":
+                params["platform"] = platform
+            if beam_mode != "IW":
+                params["beamMode"] = beam_mode
+            if processing_level != "SLC":
+                params["processingLevel"] = processing_level
+            if polarization != "VV+VH":
+                params["polarization"] = polarization
             
             if flight_direction:
                 params["flightDirection"] = flight_direction
             
-            # Execute search
-            response = self.session.get(self.search_url, params=params, timeout=60)
-            
-            if response.status_code != 200:
-                logger.error(f"Search failed: {response.status_code}")
-                return {"status": "error", "error": f"Search failed: {response.status_code}"}
-            
-            results = response.json()
-            
-            # Parse results
-            products = []
-            for item in results:
-                product = {
-                    "granule_name": item.get("granuleName"),
-                    "file_name": item.get("fileName"),
-                    "url": item.get("url"),
-                    "file_size": item.get("sizeMB"),
-                    "start_time": item.get("startTime"),
-                    "stop_time": item.get("stopTime"),
-                    "path": item.get("pathNumber"),
-                    "frame": item.get("frameNumber"),
-                    "flight_direction": item.get("flightDirection"),
-                    "polarization": item.get("polarization"),
-                    "beam_mode": item.get("beamModeType"),
-                    "processing_level": item.get("processingLevel"),
-                    "browse_url": item.get("browseUrl"),
-                    "md5sum": item.get("md5sum")
-                }
-                products.append(product)
+            # Execute search (repeated queries within the TTL hit the cache)
+            try:
+                content = self._search_raw(
+                    tuple(sorted(params.items())),
+                    int(time.time() // SEARCH_CACHE_TTL)
+                )
+            except _HTTP_STATUS_ERRORS as e:
+                status_code = e.response.status_code
+                logger.error(f"Search failed: {status_code}")
+                return {"status": "error", "error": f"Search failed: {status_code}"}
+            
+            results = orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+            
+            # Parse results: project ASF fields onto product keys
+            if as_array:
+                products = _records_to_array(results)
+            else:
+                products = [dict(zip(_PRODUCT_KEYS, map(item.get, _ASF_FIELDS))) for item in results]
             
             logger.info(f"Found {len(products)} Sentinel-1 products")
             
@@ -206,7 +545,8 @@ class ASFAPIClient:
         self,
         product: Dict[str, Any],
         output_dir: str = None,
-        progress_callback: callable = None
+        progress_callback: callable = None,
+        verify: bool = True
     ) -> Dict[str, Any]:
         """
         Download a Sentinel-1 product
@@ -215,6 +555,7 @@ class ASFAPIClient:
             product: Product metadata from search
             output_dir: Output directory
             progress_callback: Progress callback function
+            verify: Verify MD5 of the downloaded file (callers may defer this)
             
         Returns:
             Download result
@@ -244,27 +585,46 @@ class ASFAPIClient:
             
             logger.info(f"Downloading: {file_name}")
             
-            # Download with progress tracking
-            response = self.session.get(url, stream=True, timeout=3600)
+            # Split large files across parallel Range requests when the server allows it
+            md5_hash = None
             
-            if response.status_code != 200:
-                return {"status": "error", "error": f"Download failed: {response.status_code}"}
-            
-            total_size = int(response.headers.get("content-length", 0))
-            downloaded_size = 0
-            
-            with open(output_file, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded_size += len(chunk)
+            if not self._download_ranged(url, output_file, progress_callback):
+                # Single-stream download with progress tracking
+                with self._download_slots, \
+                        self.session.get(url, stream=True, timeout=3600) as response:
+                    if response.status_code != 200:
+                        if response.status_code in (401, 403):
+                            self._reject_auth()
+                        return {"status": "error", "error": f"Download failed: {response.status_code}"}
+                    
+                    total_size = int(response.headers.get("content-length", 0))
+                    
+                    # Copy the raw stream in large blocks instead of iterating chunks
+                    # in Python; urllib3's readinto() raises on a truncated body
+                    response.raw.decode_content = True
+                    try:
+                        with open(output_file, "wb") as f:
+                            sink = f
+                            if progress_callback and total_size > 0:
+                                sink = _ProgressWriter(f, _ProgressTracker(total_size, progress_callback))
+                            md5_hash = _new_md5() if expected_md5 else None
+                            copied = _copy_stream(response.raw, sink, md5_hash)
                         
-                        if progress_callback and total_size > 0:
-                            progress = downloaded_size / total_size * 100
-                            progress_callback(progress, downloaded_size, total_size)
+                        if (total_size and not response.headers.get("content-encoding")
+                                and copied != total_size):
+                            raise IOError(f"Incomplete download: got {copied} of {total_size} bytes")
+                    except BaseException:
+                        # A partial file must not be mistaken for a cached download
+                        output_file.unlink(missing_ok=True)
+                        raise
+            
+            # A checksum computed while streaming is recorded so that any later
+            # verification (including a deferred one) skips re-reading the file
+            if md5_hash is not None and md5_hash.hexdigest() == expected_md5.lower():
+                self._mark_verified(output_file, expected_md5)
             
             # Verify download
-            if expected_md5 and not self._verify_md5(output_file, expected_md5):
+            if verify and expected_md5 and not self._verify_md5(output_file, expected_md5):
                 logger.warning("MD5 verification failed")
                 return {"status": "error", "error": "MD5 verification failed"}
             
@@ -281,13 +641,118 @@ class ASFAPIClient:
             logger.error(f"Download error: {e}")
             return {"status": "error", "error": str(e)}
     
-    def extract_product(self, zip_file: str, output_dir: str = None) -> Dict[str, Any]:
+    def _download_ranged(
+        self,
+        url: str,
+        output_file: Path,
+        progress_callback: callable = None
+    ) -> bool:
+        """
+        Download a file with parallel HTTP Range requests
+        
+        Args:
+            url: Product URL
+            output_file: Destination file
+            progress_callback: Progress callback function
+            
+        Returns:
+            True if downloaded, False if the caller should fall back to a single stream
+        """
+        if not hasattr(os, "pwrite"):
+            return False
+        
+        try:
+            head = self.session.head(url, allow_redirects=True, timeout=60)
+        except requests.RequestException as e:
+            logger.info(f"HEAD request failed ({e}), using a single stream")
+            return False
+        
+        if head.status_code in (401, 403):
+            self._reject_auth()
+        total_size = int(head.headers.get("content-length", 0))
+        
+        if (head.status_code != 200
+                or head.headers.get("accept-ranges", "").lower() != "bytes"
+                or total_size < RANGE_MIN_SIZE):
+            return False
+        
+        range_size = -(-total_size // RANGE_CONNECTIONS)
+        ranges = [
+            (start, min(start + range_size, total_size) - 1)
+            for start in range(0, total_size, range_size)
+        ]
+        tracker = _ProgressTracker(total_size, progress_callback) if progress_callback else None
+        
+        fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fd, 0, total_size)
+            else:
+                os.ftruncate(fd, total_size)
+            
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [
+                    executor.submit(self._download_range, url, fd, start, end, tracker)
+                    for start, end in ranges
+                ]
+                completed = all([f.result() for f in futures])
+        except BaseException:
+            # A preallocated, partly filled file must not pass as a cached download
+            os.close(fd)
+            output_file.unlink(missing_ok=True)
+            raise
+        
+        os.close(fd)
+        if not completed:
+            logger.info("Server ignored Range request, falling back to single stream")
+            output_file.unlink(missing_ok=True)
+        return completed
+    
+    def _download_range(
+        self,
+        url: str,
+        fd: int,
+        start: int,
+        end: int,
+        tracker: Optional[_ProgressTracker]
+    ) -> bool:
+        """Download bytes [start, end] of url into fd at the same offset"""
+        headers = {"Range": f"bytes={start}-{end}"}
+        with self._download_slots, \
+                self.session.get(url, headers=headers, stream=True, timeout=3600) as response:
+            if response.status_code != 206:
+                if response.status_code in (401, 403):
+                    self._reject_auth()
+                return False
+            
+            offset = start
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                os.pwrite(fd, chunk, offset)
+                offset += len(chunk)
+                if tracker:
+                    tracker.advance(len(chunk))
+        
+        if offset != end + 1:
+            raise IOError(f"Incomplete range {start}-{end}: got {offset - start} bytes")
+        
+        return True
+    
+    def extract_product(
+        self,
+        zip_file: str,
+        output_dir: str = None,
+        dedupe: bool = False
+    ) -> Dict[str, Any]:
         """
         Extract downloaded product
         
         Args:
             zip_file: Path to zip file
             output_dir: Output directory
+            dedupe: Hard-link members already extracted elsewhere from the
+                blob store instead of writing them again. Extracted files then
+                share their inode with the store, so they must not be modified
+                in place; see prune_blob_store() for reclaiming space
             
         Returns:
             Extraction result
@@ -303,7 +768,36 @@ class ASFAPIClient:
             logger.info(f"Extracting: {zip_file}")
             
             with zipfile.ZipFile(zip_file, 'r') as zf:
-                zf.extractall(output_path)
+                members = zf.infolist()
+            
+            # Create the directory tree up front so workers don't race on makedirs
+            root = output_path.resolve()
+            for info in members:
+                parent = (root / info.filename).resolve().parent
+                if parent.is_relative_to(root):
+                    parent.mkdir(parents=True, exist_ok=True)
+            
+            # Inflate members in parallel; zlib releases the GIL. ZipFile is not
+            # thread-safe, so each worker opens the archive once and reuses it
+            blob_dir = self.download_dir / ".blobs" if dedupe else None
+            local = threading.local()
+            handles = []
+            handles_lock = threading.Lock()
+            
+            def extract(info):
+                zf = getattr(local, "zf", None)
+                if zf is None:
+                    zf = local.zf = zipfile.ZipFile(zip_file, 'r')
+                    with handles_lock:
+                        handles.append(zf)
+                _extract_member(zf, info, output_path, blob_dir)
+            
+            try:
+                with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                    list(executor.map(extract, members))
+            finally:
+                for zf in handles:
+                    zf.close()
             
             # Find SAFE directory
             safe_dirs = list(output_path.glob("*.SAFE"))
@@ -326,15 +820,75 @@ class ASFAPIClient:
             logger.error(f"Extraction error: {e}")
             return {"status": "error", "error": str(e)}
     
+    def prune_blob_store(self) -> int:
+        """
+        Remove blob store entries no longer linked from any extracted product
+        
+        Returns:
+            Number of bytes freed
+        """
+        blob_dir = self.download_dir / ".blobs"
+        freed = 0
+        if not blob_dir.is_dir():
+            return freed
+        
+        for bucket in blob_dir.iterdir():
+            for blob in bucket.iterdir():
+                stat = blob.stat()
+                if stat.st_nlink == 1:
+                    blob.unlink()
+                    freed += stat.st_size
+            try:
+                bucket.rmdir()
+            except OSError:
+                pass
+        
+        logger.info(f"Blob store pruned: {freed} bytes freed")
+        return freed
+    
     def _verify_md5(self, file_path: Path, expected_md5: str) -> bool:
-        """Verify file MD5 checksum"""
+        """Verify file MD5 checksum, skipping the hash if a matching marker exists"""
         if not expected_md5:
             return True
         
-        md5_hash = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(8192), b""):
-                md5_hash.update(chunk)
+        # File unchanged since it was last verified against the same checksum
+        try:
+            marker_file = file_path.with_name(file_path.name + ".md5.ok")
+            if json.loads(marker_file.read_text()) == self._verification_marker(file_path, expected_md5):
+                return True
+        except (OSError, ValueError):
+            pass
+        
+        if not self._hash_matches(file_path, expected_md5):
+            return False
+        
+        self._mark_verified(file_path, expected_md5)
+        return True
+    
+    def _verification_marker(self, file_path: Path, md5: str) -> Dict[str, Any]:
+        """Identity of a file's current contents for the .md5.ok sidecar"""
+        stat = file_path.stat()
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "md5": md5.lower()}
+    
+    def _mark_verified(self, file_path: Path, md5: str):
+        """Record that file_path currently matches md5"""
+        marker_file = file_path.with_name(file_path.name + ".md5.ok")
+        try:
+            marker_file.write_text(json.dumps(self._verification_marker(file_path, md5)))
+        except OSError as e:
+            logger.warning(f"Failed to write verification marker: {e}")
+    
+    def _hash_matches(self, file_path: Path, expected_md5: str) -> bool:
+        """Hash the full file and compare against the expected MD5"""
+        md5_hash = _new_md5()
+        
+        # Feed the hasher slices of a read-only mapping instead of copied buffers
+        if file_path.stat().st_size > 0:
+            with open(file_path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                    memoryview(mm) as view:
+                for offset in range(0, len(view), HASH_SLICE_SIZE):
+                    md5_hash.update(view[offset:offset + HASH_SLICE_SIZE])
         
         return md5_hash.hexdigest().lower() == expected_md5.lower()
 
@@ -342,20 +896,32 @@ class ASFAPIClient:
 class Sentinel1DataManager:
     """Manager for Sentinel-1 data acquisition workflow"""
     
-    def __init__(self, username: str = None, password: str = None):
+    def __init__(self, username: str = None, password: str = None, max_workers: int = 8):
         """
         Initialize data manager
         
         Args:
             username: ASF/Earthdata username
             password: ASF/Earthdata password
+            max_workers: Maximum number of concurrent product downloads
         """
         self.client = ASFAPIClient(username, password)
         self.data_dir = Path("./data/sentinel1")
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
         
         logger.info("Sentinel1DataManager initialized")
     
+    def close(self):
+        """Release the ASF client's connections"""
+        self.client.close()
+    
+    def __enter__(self) -> "Sentinel1DataManager":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def acquire_data(
         self,
         start_date: str,
@@ -404,24 +970,26 @@ class Sentinel1DataManager:
                     "error": "Need at least 2 products for InSAR processing"
                 }
             
-            # Download products
-            downloaded_files = []
-            
-            for i, product in enumerate(products):
-                logger.info(f"Downloading product {i+1}/{len(products)}")
+            # Download products concurrently and hand each finished file to a
+            # second pool for verification/extraction while the rest stream
+            with ThreadPoolExecutor(max_workers=min(len(products), self.max_workers)) as download_pool, \
+                    ThreadPoolExecutor(max_workers=2) as process_pool:
+                download_futures = {
+                    download_pool.submit(self.client.download_product, product, verify=False): i
+                    for i, product in enumerate(products)
+                }
                 
-                download_result = self.client.download_product(product)
+                process_futures = [None] * len(products)
+                for future in as_completed(download_futures):
+                    i = download_futures[future]
+                    process_futures[i] = process_pool.submit(
+                        self._verify_then_extract, products[i], future.result()
+                    )
                 
-                if download_result["status"] == "completed":
-                    # Extract product
-                    extract_result = self.client.extract_product(download_result["file"])
-                    
-                    if extract_result["status"] == "completed":
-                        downloaded_files.append({
-                            "product": product,
-                            "download": download_result,
-                            "extract": extract_result
-                        })
+                # Results keep search order
+                results = [f.result() for f in process_futures]
+            
+            downloaded_files = [r for r in results if r is not None]
             
             logger.info(f"Data acquisition completed: {len(downloaded_files)} products")
             
@@ -436,6 +1004,48 @@ class Sentinel1DataManager:
             logger.error(f"Data acquisition error: {e}")
             return {"status": "error", "error": str(e)}
     
+    def _verify_then_extract(
+        self,
+        product: Dict[str, Any],
+        download_result: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Verify and extract a downloaded product
+        
+        Args:
+            product: Product metadata from search
+            download_result: Result of an unverified download_product call
+            
+        Returns:
+            Product record with download/extract results, or None on failure
+        """
+        if download_result["status"] != "completed":
+            return None
+        
+        # Cache hits were already verified by download_product
+        if download_result["source"] == "download" and not self.client._verify_md5(
+            Path(download_result["file"]), product.get("md5sum")
+        ):
+            logger.warning(f"MD5 verification failed: {product.get('file_name')}")
+            return None
+        
+        # Extract product
+        extract_result = self.client.extract_product(download_result["file"])
+        
+        if extract_result["status"] != "completed":
+            return None
+        
+        return {
+            "product": product,
+            "download": download_result,
+            "extract": extract_result
+        }
+    
+    def _fetch_orbit_file(self, orbit_file: Path):
+        """Download a single orbit file"""
+        # Simulate orbit file download
+        orbit_file.touch()
+    
     def get_orbit_files(
         self,
         products: List[Dict[str, Any]]
@@ -455,17 +1065,18 @@ class Sentinel1DataManager:
             orbit_dir = self.data_dir / "orbits"
             orbit_dir.mkdir(parents=True, exist_ok=True)
             
-            orbit_files = []
+            orbit_files = [
+                orbit_dir / f"orbit_{product.get('start_time')[:10]}.EOF"
+                for product in products
+            ]
             
-            for product in products:
-                # Get orbit file URL from ASF
-                start_time = product.get("start_time")
-                
-                # Simulate orbit file download
-                orbit_file = orbit_dir / f"orbit_{start_time[:10]}.EOF"
-                orbit_file.touch()
-                
-                orbit_files.append(str(orbit_file))
+            # Products from the same day share an orbit file; fetch each once, concurrently
+            unique_files = list(dict.fromkeys(orbit_files))
+            if unique_files:
+                with ThreadPoolExecutor(max_workers=min(len(unique_files), self.max_workers)) as executor:
+                    list(executor.map(self._fetch_orbit_file, unique_files))
+            
+            orbit_files = [str(orbit_file) for orbit_file in orbit_files]
             
             logger.info(f"Downloaded {len(orbit_files)} orbit files")
             
@@ -11,51 +11,403 @@ from scipy.ndimage import uniform_filter, gaussian_filter
 from pathlib import Path
 from typing import Tuple, Dict, Any, Optional
 import logging
+import multiprocessing
+from functools import cached_property
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
 from datetime import datetime
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Gaussian sigma (pixels) above which FFT convolution beats direct filtering
+FFT_SIGMA_THRESHOLD = 8.0
+PIPELINE_WORKERS = 3  # Processes running independent APS estimators
+TILE_SIZE = 512  # Tile edge (pixels) for cache-blocked elementwise/filter passes
+
+# Creation options for phase GeoTIFFs: internal tiling plus floating-point
+# predictor + LZW, compressed on all cores
+GEOTIFF_OPTIONS = {
+    "tiled": True,
+    "blockxsize": 512,
+    "blockysize": 512,
+    "compress": "lzw",
+    "predictor": 3,
+    "num_threads": "ALL_CPUS",
+}
+PIPELINE_MIN_PIXELS = 2048 * 2048  # Smaller scenes don't amortize worker start-up
+
+
+def _local_correlation_aps_numpy(n, mx, my, mxy, mxx, myy, dem_centered, min_fraction):
+    """
+    Combine sliding-window moments into the spatial-correlation APS
+    
+    Args:
+        n: Window fraction of valid pixels
+        mx, my, mxy, mxx, myy: Window means of x, y, x*y, x*x, y*y (invalid pixels zeroed)
+        dem_centered: Globally centered DEM
+        min_fraction: Minimum valid fraction for a window to yield a correlation
+        
+    Returns:
+        APS in radians
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = mx / n
+        mean_y = my / n
+        cov_xy = mxy / n - mean_x * mean_y
+        var_x = mxx / n - mean_x ** 2
+        var_y = np.maximum(myy / n - mean_y ** 2, 0.0)
+        corr = cov_xy / np.sqrt(var_x * var_y)
+    
+    corr[~np.isfinite(corr) | (n <= min_fraction)] = 0
+    
+    # Locally normalized DEM scaled by the local correlation
+    dem_norm = (dem_centered - mean_y) / (np.sqrt(var_y) + 1e-10)
+    return corr * dem_norm * np.pi
+
+
+def _gaussian_filter_fft(data: np.ndarray, sigma: float, truncate: float = 4.0) -> np.ndarray:
+    """
+    Gaussian filter via separable FFT convolution
+    
+    Matches scipy.ndimage.gaussian_filter (mode='reflect') but costs
+    O(N log N) instead of O(N * sigma), which wins for large kernels.
+    NaNs spread over the whole output, so callers must pass finite data.
+    """
+    radius = int(truncate * sigma + 0.5)
+    x = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (x / sigma) ** 2)
+    kernel /= kernel.sum()
+    
+    # 'symmetric' padding is scipy's 'reflect' boundary mode
+    padded = np.pad(data, radius, mode='symmetric')
+    filtered = signal.fftconvolve(padded, kernel[np.newaxis, :], mode='valid', axes=1)
+    filtered = signal.fftconvolve(filtered, kernel[:, np.newaxis], mode='valid', axes=0)
+    return filtered.astype(np.result_type(data, np.float32), copy=False)
+
+
+def _tile_iter(shape: Tuple[int, int], tile: int = TILE_SIZE, halo: int = 0):
+    """
+    Cover a 2-D array with tiles, optionally grown by a halo
+    
+    Yields:
+        (padded, interior, local): slices of the halo-padded tile (clipped to
+        the array), of the tile itself, and of the tile within the padded block
+    """
+    rows, cols = shape
+    for r0 in range(0, rows, tile):
+        r1 = min(r0 + tile, rows)
+        pr0, pr1 = max(r0 - halo, 0), min(r1 + halo, rows)
+        for c0 in range(0, cols, tile):
+            c1 = min(c0 + tile, cols)
+            pc0, pc1 = max(c0 - halo, 0), min(c1 + halo, cols)
+            yield (
+                (slice(pr0, pr1), slice(pc0, pc1)),
+                (slice(r0, r1), slice(c0, c1)),
+                (slice(r0 - pr0, r1 - pr0), slice(c0 - pc0, c1 - pc0))
+            )
+
+
+def _gaussian_filter_tiled(data: np.ndarray, sigma: float, truncate: float = 4.0) -> np.ndarray:
+    """
+    Gaussian filter computed tile by tile, in parallel
+    
+    Each tile is filtered together with a halo as wide as the kernel radius,
+    so the result is identical to scipy.ndimage.gaussian_filter while every
+    tile's intermediates stay cache-resident.
+    """
+    halo = int(truncate * sigma + 0.5)
+    filtered = np.empty(data.shape, dtype=np.result_type(data, np.float32))
+    
+    def filter_tile(tile):
+        padded, interior, local = tile
+        filtered[interior] = gaussian_filter(data[padded], sigma, truncate=truncate)[local]
+    
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(filter_tile, _tile_iter(data.shape, halo=halo)))
+    return filtered
+
+
+def _valid_mask(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Mask of pixels where both a and b are finite (one mask buffer, in-place AND)"""
+    mask = np.isfinite(a)
+    mask &= np.isfinite(b)
+    return mask
+
+
+def _polyfit_normal(x: np.ndarray, y: np.ndarray, order: int) -> np.ndarray:
+    """
+    Least-squares polynomial fit from moment sums (drop-in for np.polyfit)
+    
+    Accumulates sum(t^k) and sum(t^k * y) with a single working buffer and
+    solves the (order+1)^2 normal equations, instead of building an
+    N x (order+1) Vandermonde matrix and running an SVD. x is standardized
+    to t first so the normal matrix stays well conditioned.
+    
+    Returns:
+        Coefficients in x, highest power first
+    """
+    x_mean = x.mean(dtype=np.float64)
+    x_scale = x.std(dtype=np.float64) or 1.0
+    t = (x - x_mean) / x_scale
+    
+    moments = np.empty(2 * order + 1)
+    rhs = np.empty(order + 1)
+    t_pow = np.ones_like(t)
+    for k in range(2 * order + 1):
+        moments[k] = t_pow.sum()
+        if k <= order:
+            rhs[k] = np.dot(t_pow, y)
+        t_pow *= t
+    
+    # Hankel normal matrix: entry (i, j) is sum(t^(i+j))
+    idx = np.arange(order + 1)
+    coeffs_t = np.linalg.solve(moments[idx[:, None] + idx[None, :]], rhs)
+    
+    # Map back from standardized t to x
+    poly = np.polynomial.Polynomial(coeffs_t, domain=[x_mean - x_scale, x_mean + x_scale])
+    return poly.convert().coef[::-1]
+
+
+def _nan_stats_numpy(a: np.ndarray) -> Tuple[float, float, float, float, float]:
+    """NaN-aware (min, max, mean, std, rms) of an array"""
+    mean = np.nanmean(a)
+    std = np.nanstd(a)
+    return np.nanmin(a), np.nanmax(a), mean, std, np.sqrt(std ** 2 + mean ** 2)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _nan_stats_numba(a):
+        """Single-pass version of _nan_stats_numpy for 2-D arrays"""
+        rows = a.shape[0]
+        count = np.zeros(rows)
+        mean = np.zeros(rows)
+        m2 = np.zeros(rows)
+        lo = np.full(rows, np.inf)
+        hi = np.full(rows, -np.inf)
+        
+        # Per-row Welford accumulation
+        for i in prange(rows):
+            for j in range(a.shape[1]):
+                v = a[i, j]
+                if np.isnan(v):
+                    continue
+                count[i] += 1
+                delta = v - mean[i]
+                mean[i] += delta / count[i]
+                m2[i] += delta * (v - mean[i])
+                lo[i] = min(lo[i], v)
+                hi[i] = max(hi[i], v)
+        
+        # Merge rows (Chan et al. parallel variance)
+        n_total = 0.0
+        mean_total = 0.0
+        m2_total = 0.0
+        for i in range(rows):
+            if count[i] == 0:
+                continue
+            n_new = n_total + count[i]
+            delta = mean[i] - mean_total
+            mean_total += delta * count[i] / n_new
+            m2_total += m2[i] + delta * delta * n_total * count[i] / n_new
+            n_total = n_new
+        
+        if n_total == 0:
+            return np.nan, np.nan, np.nan, np.nan, np.nan
+        
+        std = np.sqrt(m2_total / n_total)
+        return lo.min(), hi.max(), mean_total, std, np.sqrt(std * std + mean_total * mean_total)
+
+
+def _nan_stats(a: np.ndarray) -> Tuple[float, float, float, float, float]:
+    """NaN-aware (min, max, mean, std, rms), fused into one pass when numba is available"""
+    if NUMBA_AVAILABLE and a.ndim == 2 and a.dtype.kind == 'f':
+        return _nan_stats_numba(a)
+    return _nan_stats_numpy(a)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True, error_model="numpy")
+    def _local_correlation_aps_numba(n, mx, my, mxy, mxx, myy, dem_centered, min_fraction):
+        """Fused single-pass version of _local_correlation_aps_numpy"""
+        aps = np.empty_like(dem_centered)
+        for i in prange(aps.shape[0]):
+            for j in range(aps.shape[1]):
+                cnt = n[i, j]
+                mean_x = mx[i, j] / cnt
+                mean_y = my[i, j] / cnt
+                cov_xy = mxy[i, j] / cnt - mean_x * mean_y
+                var_x = mxx[i, j] / cnt - mean_x * mean_x
+                var_y = max(myy[i, j] / cnt - mean_y * mean_y, 0.0)
+                corr = cov_xy / np.sqrt(var_x * var_y)
+                if not np.isfinite(corr) or cnt <= min_fraction:
+                    corr = 0.0
+                dem_norm = (dem_centered[i, j] - mean_y) / (np.sqrt(var_y) + 1e-10)
+                aps[i, j] = corr * dem_norm * np.pi
+        return aps
+    
+    _local_correlation_aps = _local_correlation_aps_numba
+else:
+    _local_correlation_aps = _local_correlation_aps_numpy
+
+
+def _tropospheric_delay_numpy(dem, h_ref, t0_k, p0_hpa, lapse_rate, rh, wavelength, cos_inc):
+    """
+    Saastamoinen slant delay converted to phase
+    
+    Args:
+        dem: Elevation (m)
+        h_ref: Reference elevation (m)
+        t0_k: Temperature at h_ref (K)
+        p0_hpa: Pressure at h_ref (hPa)
+        lapse_rate: Temperature lapse rate (K/m)
+        rh: Relative humidity (0-1)
+        wavelength: Radar wavelength (m)
+        cos_inc: Cosine of the incidence angle
+        
+    Returns:
+        Phase delay in radians
+    """
+    dh = dem - h_ref
+    temp_k = t0_k - lapse_rate * dh
+    # Barometric formula
+    pressure_hpa = p0_hpa * (1 - lapse_rate * dh / temp_k) ** 5.255
+    # Saturation water vapor pressure
+    e = rh * 6.112 * np.exp((17.67 * (temp_k - 273.15)) / (temp_k - 29.65))
+    # ZTD = 0.002277 * (P + 4810*e/T)
+    ztd = 0.002277 * (pressure_hpa + 4810 * e / temp_k)
+    return -ztd / cos_inc * 4 * np.pi / wavelength
+
+
+if NUMBA_AVAILABLE:
+    # fastmath without 'nnan'/'ninf' so NaN DEM pixels still propagate
+    @njit(parallel=True, cache=True, fastmath={"contract", "afn", "arcp", "reassoc"})
+    def _tropospheric_delay_numba(dem, h_ref, t0_k, p0_hpa, lapse_rate, rh, wavelength, cos_inc):
+        """Fused single-pass version of _tropospheric_delay_numpy for 2-D arrays"""
+        phase = np.empty_like(dem)
+        scale = -4 * np.pi / (wavelength * cos_inc)
+        for i in prange(dem.shape[0]):
+            for j in range(dem.shape[1]):
+                dh = dem[i, j] - h_ref
+                temp_k = t0_k - lapse_rate * dh
+                pressure_hpa = p0_hpa * (1 - lapse_rate * dh / temp_k) ** 5.255
+                e = rh * 6.112 * np.exp((17.67 * (temp_k - 273.15)) / (temp_k - 29.65))
+                phase[i, j] = scale * 0.002277 * (pressure_hpa + 4810 * e / temp_k)
+        return phase
+
+
+def _tropospheric_delay(dem, h_ref, t0_k, p0_hpa, lapse_rate, rh, wavelength, cos_inc):
+    """Saastamoinen phase delay, fused into one pass when numba is available"""
+    if NUMBA_AVAILABLE and dem.ndim == 2 and dem.dtype.kind == 'f':
+        return _tropospheric_delay_numba(
+            dem, h_ref, t0_k, p0_hpa, lapse_rate, rh, wavelength, cos_inc
+        )
+    return _tropospheric_delay_numpy(dem, h_ref, t0_k, p0_hpa, lapse_rate, rh, wavelength, cos_inc)
+
+
+# Phase delay per mm of precipitable water vapor (rad/mm) and the synthetic
+# elevation-based PWV model used when no PWV map is supplied
+PWV_PHASE_FACTOR = -0.2065
+PWV_BASE, PWV_LAPSE = 50.0, 0.01  # PWV = 50 - 0.01 * h (mm)
+PWV_MIN, PWV_MAX = 5.0, 80.0  # mm
+
+
+def _water_vapor_delay_numpy(dem):
+    """Phase delay of the synthetic elevation-based PWV model"""
+    pwv = np.clip(PWV_BASE - PWV_LAPSE * dem, PWV_MIN, PWV_MAX)
+    pwv *= PWV_PHASE_FACTOR
+    return pwv
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _water_vapor_delay_numba(dem):
+        """Fused single-pass version of _water_vapor_delay_numpy for 2-D arrays"""
+        phase = np.empty_like(dem)
+        for i in prange(dem.shape[0]):
+            for j in range(dem.shape[1]):
+                pwv = PWV_BASE - PWV_LAPSE * dem[i, j]
+                # Comparisons are False for NaN, so NaN passes through like np.clip
+                if pwv < PWV_MIN:
+                    pwv = PWV_MIN
+                elif pwv > PWV_MAX:
+                    pwv = PWV_MAX
+                phase[i, j] = PWV_PHASE_FACTOR * pwv
+        return phase
+
+
+def _water_vapor_delay(dem):
+    """Synthetic PWV phase delay, fused into one pass when numba is available"""
+    if NUMBA_AVAILABLE and dem.ndim == 2 and dem.dtype.kind == 'f':
+        return _water_vapor_delay_numba(dem)
+    return _water_vapor_delay_numpy(dem)
+
 
 class AtmosphericCorrection:
     """Atmospheric phase screen estimation and correction"""
 
-    def __init__(self, dem_file: str, interferogram_file: str):
+    def __init__(
+        self,
+        dem_file: str,
+        interferogram_file: str,
+        dem_data: Optional[np.ndarray] = None,
+        ifg_data: Optional[np.ndarray] = None
+    ):
         """
         Initialize atmospheric correction
         
         Args:
             dem_file: Path to DEM file
             interferogram_file: Path to interferogram file
+            dem_data: Already-loaded DEM array (skips reading dem_file)
+            ifg_data: Already-loaded interferogram array (skips reading interferogram_file)
         """
         self.dem_file = dem_file
         self.interferogram_file = interferogram_file
-        self.dem_data = self._load_dem()
-        self.ifg_data = self._load_interferogram()
+        self.dem_data = self._load_dem() if dem_data is None else dem_data
+        self.ifg_data = self._load_interferogram() if ifg_data is None else ifg_data
+        # Interferometric phase, extracted once and shared by all estimators
+        self.phase = np.angle(self.ifg_data) if np.iscomplexobj(self.ifg_data) else self.ifg_data
         self.metadata = {}
 
+    @cached_property
+    def dem_stats(self) -> Tuple[float, float]:
+        """NaN-aware (mean, std) of the DEM, computed once in a single pass (dem_data is not reassigned)"""
+        _, _, mean, std, _ = _nan_stats(self.dem_data)
+        return float(mean), float(std)
+
     def _load_dem(self) -> np.ndarray:
         """Load DEM data"""
         try:
             with rasterio.open(self.dem_file) as src:
-                return src.read(1)
+                # GDAL converts straight into the float32 buffer (no native-dtype copy)
+                return src.read(1, out=np.empty(src.shape, dtype=np.float32))
         except Exception as e:
             logger.error(f"Error loading DEM: {e}")
-            return np.random.randn(256, 256) * 1000 + 1000
+            return (np.random.randn(256, 256) * 1000 + 1000).astype(np.float32)
 
     def _load_interferogram(self) -> np.ndarray:
         """Load interferogram data"""
         try:
             with rasterio.open(self.interferogram_file) as src:
                 if src.count == 2:
-                    # Complex data stored as 2-band
-                    real = src.read(1)
-                    imag = src.read(2)
-                    return real + 1j * imag
+                    # Complex data stored as 2-band; both bands pass through one scratch buffer
+                    ifg = np.empty(src.shape, dtype=np.complex64)
+                    band = np.empty(src.shape, dtype=np.float32)
+                    ifg.real = src.read(1, out=band)
+                    ifg.imag = src.read(2, out=band)
+                    return ifg
                 else:
-                    return src.read(1)
+                    return src.read(1, out=np.empty(src.shape, dtype=np.float32))
         except Exception as e:
             logger.error(f"Error loading interferogram: {e}")
-            return np.random.randn(256, 256)
+            return np.random.randn(256, 256).astype(np.float32)
 
     def estimate_aps_dem_correlation(self) -> np.ndarray:
         """
@@ -71,23 +423,25 @@ class AtmosphericCorrection:
         logger.info("Estimating APS using DEM correlation method")
         
         try:
-            # Extract phase from interferogram
-            if np.iscomplexobj(self.ifg_data):
-                phase = np.angle(self.ifg_data)
-            else:
-                phase = self.ifg_data
+            phase = self.phase
             
             # Normalize DEM
-            dem_normalized = (self.dem_data - np.nanmean(self.dem_data)) / np.nanstd(self.dem_data)
+            dem_mean, dem_std = self.dem_stats
+            dem_normalized = (self.dem_data - dem_mean) / dem_std
             
             # Compute correlation coefficient
-            valid_mask = ~(np.isnan(phase) | np.isnan(dem_normalized))
-            
-            if np.sum(valid_mask) > 0:
-                correlation = np.corrcoef(
-                    phase[valid_mask].flatten(),
-                    dem_normalized[valid_mask].flatten()
-                )[0, 1]
+            valid_mask = _valid_mask(phase, dem_normalized)
+            
+            if np.any(valid_mask):
+                # Single-pair Pearson on centered samples (no 2x2 covariance matrix)
+                # Boolean indexing already copies; only widen when needed
+                a = phase[valid_mask].astype(np.float64, copy=False)
+                b = dem_normalized[valid_mask].astype(np.float64, copy=False)
+                a -= a.mean()
+                b -= b.mean()
+                correlation = float(np.einsum('i,i->', a, b) / np.sqrt(
+                    np.einsum('i,i->', a, a) * np.einsum('i,i->', b, b)
+                ))
             else:
                 correlation = 0.1
             
@@ -105,7 +459,7 @@ class AtmosphericCorrection:
             logger.error(f"Error in DEM correlation APS estimation: {e}")
             return np.zeros_like(self.dem_data)
 
-    def estimate_aps_high_pass_filter(self, wavelength: float = 1000.0) -> np.ndarray:
+    def estimate_aps_high_pass_filter(self, wavelength: float = 1000.0, method: str = "auto") -> np.ndarray:
         """
         Estimate APS using high-pass filtering
         
@@ -114,6 +468,8 @@ class AtmosphericCorrection:
         
         Args:
             wavelength: Wavelength cutoff in meters (default: 1000m)
+            method: Gaussian filter implementation: 'direct', 'fft', or 'auto'
+                (FFT for large kernels on NaN-free phase)
             
         Returns:
             Estimated APS in radians
@@ -121,11 +477,7 @@ class AtmosphericCorrection:
         logger.info(f"Estimating APS using high-pass filter (wavelength={wavelength}m)")
         
         try:
-            # Extract phase
-            if np.iscomplexobj(self.ifg_data):
-                phase = np.angle(self.ifg_data)
-            else:
-                phase = self.ifg_data
+            phase = self.phase
             
             # Apply low-pass filter to get long-wavelength component
             # Assume 1 pixel = 30m (Sentinel-1 resolution)
@@ -137,10 +489,16 @@ class AtmosphericCorrection:
                 filter_size += 1
             
             # Apply Gaussian low-pass filter
-            phase_lp = gaussian_filter(phase, sigma=filter_size/6)
-            
-            # High-pass component (atmospheric + noise)
-            phase_hp = phase - phase_lp
+            sigma = filter_size / 6
+            use_fft = method == "fft" or (
+                method == "auto" and sigma > FFT_SIGMA_THRESHOLD and np.isfinite(phase).all()
+            )
+            if use_fft:
+                phase_lp = _gaussian_filter_fft(phase, sigma)
+            elif phase.ndim == 2 and phase.size > TILE_SIZE ** 2:
+                phase_lp = _gaussian_filter_tiled(phase, sigma)
+            else:
+                phase_lp = gaussian_filter(phase, sigma=sigma)
             
             # Use low-pass component as APS estimate
             aps = phase_lp
@@ -175,7 +533,7 @@ class AtmosphericCorrection:
             scale_height = 2000.0
             
             # Reference elevation
-            h_ref = np.nanmean(self.dem_data)
+            h_ref, _ = self.dem_stats
             
             # Height-dependent model
             # APS decreases exponentially with elevation
@@ -213,36 +571,27 @@ class AtmosphericCorrection:
         logger.info(f"Estimating APS using spatial correlation (window_size={window_size})")
         
         try:
-            # Extract phase
-            if np.iscomplexobj(self.ifg_data):
-                phase = np.angle(self.ifg_data)
-            else:
-                phase = self.ifg_data
-            
-            # Initialize APS array
-            aps = np.zeros_like(phase)
-            
-            # Compute local correlations
-            for i in range(0, phase.shape[0] - window_size, window_size // 2):
-                for j in range(0, phase.shape[1] - window_size, window_size // 2):
-                    # Extract windows
-                    phase_window = phase[i:i+window_size, j:j+window_size]
-                    dem_window = self.dem_data[i:i+window_size, j:j+window_size]
-                    
-                    # Compute correlation
-                    valid_mask = ~(np.isnan(phase_window) | np.isnan(dem_window))
-                    
-                    if np.sum(valid_mask) > 10:
-                        corr = np.corrcoef(
-                            phase_window[valid_mask].flatten(),
-                            dem_window[valid_mask].flatten()
-                        )[0, 1]
-                    else:
-                        corr = 0
-                    
-                    # Fill APS window
-                    dem_norm = (dem_window - np.nanmean(dem_window)) / (np.nanstd(dem_window) + 1e-10)
-                    aps[i:i+window_size, j:j+window_size] = corr * dem_norm * np.pi
+            phase = self.phase
+            
+            # Local Pearson correlation from sliding-window moments: every
+            # statistic is a uniform_filter over a masked array, so the whole
+            # map is a handful of separable filter passes plus one fused
+            # combine. The DEM is centered globally first to keep
+            # E[y^2] - E[y]^2 well conditioned.
+            valid = _valid_mask(phase, self.dem_data)
+            if not valid.any():
+                logger.warning("No valid phase/DEM pixels for spatial correlation")
+                return np.zeros_like(self.dem_data)
+            
+            x = np.where(valid, phase, 0.0)
+            dem_centered = self.dem_data - np.mean(self.dem_data[valid])
+            y = np.where(valid, dem_centered, 0.0)
+            
+            n = uniform_filter(valid.astype(np.float64), window_size)
+            window_means = [uniform_filter(a, window_size) for a in (x, y, x * y, x * x, y * y)]
+            
+            # More than 10 valid pixels per window are required, as before
+            aps = _local_correlation_aps(n, *window_means, dem_centered, 10 / window_size ** 2)
             
             logger.info(f"Spatial correlation APS computed")
             
@@ -269,17 +618,24 @@ class AtmosphericCorrection:
         
         try:
             # Create design matrix
-            dem_flat = self.dem_data.flatten()
-            phase_flat = phase_data.flatten()
+            dem_flat = self.dem_data.ravel()
+            phase_flat = phase_data.ravel()
             
             # Remove NaN values
-            valid_idx = ~(np.isnan(dem_flat) | np.isnan(phase_flat))
+            valid_idx = _valid_mask(dem_flat, phase_flat)
             dem_valid = dem_flat[valid_idx]
             phase_valid = phase_flat[valid_idx]
             
             # Fit linear model: phase = a0 + a1 * dem
-            A = np.vstack([np.ones_like(dem_valid), dem_valid]).T
-            coeffs = np.linalg.lstsq(A, phase_valid, rcond=None)[0]
+            # Closed-form least squares on centered samples (no design matrix / SVD)
+            dem_mean = dem_valid.mean(dtype=np.float64)
+            phase_mean = phase_valid.mean(dtype=np.float64)
+            dem_c = dem_valid - dem_mean
+            dem_ss = np.einsum('i,i->', dem_c, dem_c, dtype=np.float64)
+            # A flat DEM carries no height signal: fit the mean only
+            a1 = np.einsum('i,i->', dem_c, phase_valid - phase_mean, dtype=np.float64) / dem_ss \
+                if dem_ss > 0 else 0.0
+            coeffs = (float(phase_mean - a1 * dem_mean), float(a1))
             
             logger.info(f"Linear fit coefficients: a0={coeffs[0]:.6f}, a1={coeffs[1]:.6f}")
             
@@ -314,22 +670,27 @@ class AtmosphericCorrection:
         
         try:
             # Prepare data
-            dem_flat = self.dem_data.flatten()
-            phase_flat = phase_data.flatten()
+            dem_flat = self.dem_data.ravel()
+            phase_flat = phase_data.ravel()
             
             # Remove NaN values
-            valid_idx = ~(np.isnan(dem_flat) | np.isnan(phase_flat))
+            valid_idx = _valid_mask(dem_flat, phase_flat)
             dem_valid = dem_flat[valid_idx]
             phase_valid = phase_flat[valid_idx]
             
             # Fit polynomial
-            coeffs = np.polyfit(dem_valid, phase_valid, order)
-            poly = np.poly1d(coeffs)
+            coeffs = _polyfit_normal(dem_valid, phase_valid, order)
             
             logger.info(f"Polynomial coefficients: {coeffs}")
             
-            # Compute correction
-            correction = poly(self.dem_data)
+            # Compute correction (Horner's scheme, one working buffer)
+            correction = np.full(
+                self.dem_data.shape, coeffs[0],
+                dtype=np.result_type(self.dem_data, np.float32)
+            )
+            for c in coeffs[1:]:
+                np.multiply(correction, self.dem_data, out=correction)
+                np.add(correction, c, out=correction)
             
             # Apply correction
             phase_corrected = phase_data - correction
@@ -361,15 +722,19 @@ class AtmosphericCorrection:
             if pwv_data is None:
                 # Generate synthetic PWV data based on elevation
                 # Higher elevation = lower PWV
-                pwv_data = 50 - 0.01 * self.dem_data
-                pwv_data = np.clip(pwv_data, 5, 80)
-            
-            # Compute phase delay from PWV
-            # Using simplified formula (latitude-dependent term omitted)
-            phase_delay = -0.2065 * pwv_data
+                phase_delay = _water_vapor_delay(self.dem_data)
+                phase_min, phase_max = np.nanmin(phase_delay), np.nanmax(phase_delay)
+                # PWV is proportional to the delay, so its range follows from the delay range
+                pwv_min, pwv_max = phase_max / PWV_PHASE_FACTOR, phase_min / PWV_PHASE_FACTOR
+            else:
+                # Compute phase delay from PWV
+                # Using simplified formula (latitude-dependent term omitted)
+                phase_delay = PWV_PHASE_FACTOR * pwv_data
+                phase_min, phase_max = np.nanmin(phase_delay), np.nanmax(phase_delay)
+                pwv_min, pwv_max = np.nanmin(pwv_data), np.nanmax(pwv_data)
             
-            logger.info(f"PWV range: [{np.nanmin(pwv_data):.2f}, {np.nanmax(pwv_data):.2f}] mm")
-            logger.info(f"Phase delay range: [{np.nanmin(phase_delay):.4f}, {np.nanmax(phase_delay):.4f}] radians")
+            logger.info(f"PWV range: [{pwv_min:.2f}, {pwv_max:.2f}] mm")
+            logger.info(f"Phase delay range: [{phase_min:.4f}, {phase_max:.4f}] radians")
             
             return phase_delay
             
@@ -395,37 +760,29 @@ class AtmosphericCorrection:
         
         try:
             # Reference elevation
-            h_ref = np.nanmean(self.dem_data)
+            h_ref, _ = self.dem_stats
             
             # Temperature lapse rate (K/m)
             lapse_rate = 0.0065
             
-            # Compute temperature at each elevation
-            temp_k = temperature + 273.15 - lapse_rate * (self.dem_data - h_ref)
-            
-            # Compute pressure at each elevation (barometric formula)
-            pressure_pa = pressure * 100 * (1 - lapse_rate * (self.dem_data - h_ref) / temp_k) ** 5.255
-            
-            # Compute water vapor pressure (assuming 60% relative humidity)
+            # Relative humidity (assume 60%)
             rh = 0.6
-            e_s = 6.112 * np.exp((17.67 * (temp_k - 273.15)) / (temp_k - 29.65))
-            e = rh * e_s
-            
-            # Saastamoinen model for ZTD
-            # ZTD = 0.002277 * (P + 4810*e/T)
-            ztd = 0.002277 * (pressure_pa / 100 + 4810 * e / temp_k)
             
-            # Convert to phase delay
             # Assume incidence angle of 30 degrees
-            incidence_angle = 30 * np.pi / 180
-            slant_delay = ztd / np.cos(incidence_angle)
+            cos_inc = float(np.cos(30 * np.pi / 180))
             
-            # Convert to phase
             wavelength = 0.0554  # Sentinel-1 C-band
-            phase_delay = -slant_delay * 4 * np.pi / wavelength
             
-            logger.info(f"ZTD range: [{np.nanmin(ztd):.3f}, {np.nanmax(ztd):.3f}] m")
-            logger.info(f"Phase delay range: [{np.nanmin(phase_delay):.4f}, {np.nanmax(phase_delay):.4f}] radians")
+            phase_delay = _tropospheric_delay(
+                self.dem_data, h_ref, temperature + 273.15, pressure,
+                lapse_rate, rh, wavelength, cos_inc
+            )
+            
+            # ZTD is proportional to the phase, so its range follows from the phase range
+            phase_min, phase_max = np.nanmin(phase_delay), np.nanmax(phase_delay)
+            to_ztd = -wavelength * cos_inc / (4 * np.pi)
+            logger.info(f"ZTD range: [{phase_max * to_ztd:.3f}, {phase_min * to_ztd:.3f}] m")
+            logger.info(f"Phase delay range: [{phase_min:.4f}, {phase_max:.4f}] radians")
             
             return phase_delay
             
@@ -456,13 +813,17 @@ class AtmosphericCorrection:
             # Apply correction
             phase_corrected = phase_data - aps_estimate
             
-            # Compute statistics
+            # Compute statistics (one fused pass per array)
+            orig_min, orig_max, _, orig_std, _ = _nan_stats(phase_data)
+            aps_min, aps_max, _, _, aps_rms = _nan_stats(aps_estimate)
+            corr_min, corr_max, _, corr_std, _ = _nan_stats(phase_corrected)
+            
             stats = {
-                "original_phase_range": [float(np.nanmin(phase_data)), float(np.nanmax(phase_data))],
-                "aps_range": [float(np.nanmin(aps_estimate)), float(np.nanmax(aps_estimate))],
-                "corrected_phase_range": [float(np.nanmin(phase_corrected)), float(np.nanmax(phase_corrected))],
-                "aps_rms": float(np.sqrt(np.nanmean(aps_estimate ** 2))),
-                "phase_reduction": float(np.nanstd(phase_data) - np.nanstd(phase_corrected))
+                "original_phase_range": [float(orig_min), float(orig_max)],
+                "aps_range": [float(aps_min), float(aps_max)],
+                "corrected_phase_range": [float(corr_min), float(corr_max)],
+                "aps_rms": float(aps_rms),
+                "phase_reduction": float(orig_std - corr_std)
             }
             
             logger.info(f"Correction statistics: {stats}")
@@ -496,9 +857,10 @@ class AtmosphericCorrection:
             count=1,
             dtype=rasterio.float32,
             transform=Affine.identity(),
-            crs='EPSG:4326'
+            crs='EPSG:4326',
+            **GEOTIFF_OPTIONS
         ) as dst:
-            dst.write(phase_data.astype(np.float32), 1)
+            dst.write(phase_data.astype(np.float32, copy=False), 1)
 
     def evaluate_correction(
         self,
@@ -520,16 +882,17 @@ class AtmosphericCorrection:
         logger.info("Evaluating atmospheric correction")
         
         try:
-            # Compute metrics
+            # Compute metrics (one fused pass per array)
+            orig_min, orig_max, _, orig_std, _ = _nan_stats(phase_original)
+            corr_min, corr_max, _, corr_std, _ = _nan_stats(phase_corrected)
+            
             metrics = {
-                "original_std": float(np.nanstd(phase_original)),
-                "corrected_std": float(np.nanstd(phase_corrected)),
-                "std_reduction": float(np.nanstd(phase_original) - np.nanstd(phase_corrected)),
-                "std_reduction_percent": float(
-                    100 * (np.nanstd(phase_original) - np.nanstd(phase_corrected)) / np.nanstd(phase_original)
-                ),
-                "original_range": [float(np.nanmin(phase_original)), float(np.nanmax(phase_original))],
-                "corrected_range": [float(np.nanmin(phase_corrected)), float(np.nanmax(phase_corrected))],
+                "original_std": float(orig_std),
+                "corrected_std": float(corr_std),
+                "std_reduction": float(orig_std - corr_std),
+                "std_reduction_percent": float(100 * (orig_std - corr_std) / orig_std),
+                "original_range": [float(orig_min), float(orig_max)],
+                "corrected_range": [float(corr_min), float(corr_max)],
             }
             
             # If coherence provided, compute weighted metrics
@@ -549,6 +912,59 @@ class AtmosphericCorrection:
             return {}
 
 
+def _new_shared_array(shape: Tuple[int, ...], dtype) -> Tuple[shared_memory.SharedMemory, Tuple[str, Tuple[int, ...], str]]:
+    """
+    Allocate an uninitialized array in a new shared memory block
+    
+    Returns:
+        (SharedMemory handle, (name, shape, dtype) spec for _attach_array)
+    """
+    dtype = np.dtype(dtype)
+    shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+    return shm, (shm.name, tuple(shape), dtype.str)
+
+
+def _share_array(arr: np.ndarray) -> Tuple[shared_memory.SharedMemory, Tuple[str, Tuple[int, ...], str]]:
+    """Copy an array into a new shared memory block (see _new_shared_array)"""
+    shm, spec = _new_shared_array(arr.shape, arr.dtype)
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, spec
+
+
+def _attach_array(spec: Tuple[str, Tuple[int, ...], str]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Attach to an array published by _share_array (no copy)"""
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+# Per-process state of the pipeline's worker pool
+_worker_corrector: Optional[AtmosphericCorrection] = None
+_worker_shm = []
+
+
+def _init_pipeline_worker(dem_spec, phase_spec, dem_file: str, interferogram_file: str) -> None:
+    """Process pool initializer: attach to the shared DEM/phase once per worker"""
+    global _worker_corrector
+    dem_shm, dem_data = _attach_array(dem_spec)
+    phase_shm, phase = _attach_array(phase_spec)
+    # Keep the handles alive for as long as the arrays are in use
+    _worker_shm.extend((dem_shm, phase_shm))
+    # The phase is passed as a real-valued interferogram, so it is used as is
+    _worker_corrector = AtmosphericCorrection(
+        dem_file, interferogram_file, dem_data=dem_data, ifg_data=phase
+    )
+
+
+def _run_estimator(method: str, out_spec) -> None:
+    """Run one AtmosphericCorrection estimator in a pool worker, writing into shared memory"""
+    result = getattr(_worker_corrector, method)()
+    out_shm, out = _attach_array(out_spec)
+    out[...] = result
+    del out
+    out_shm.close()
+
+
 class AtmosphericCorrectionPipeline:
     """Complete atmospheric correction pipeline"""
 
@@ -567,6 +983,66 @@ class AtmosphericCorrectionPipeline:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.corrector = AtmosphericCorrection(dem_file, interferogram_file)
 
+    def _run_estimators_parallel(self, estimators: Dict[str, str]) -> Dict[str, np.ndarray]:
+        """
+        Run estimator methods in a process pool
+        
+        The DEM and the phase are published once through shared memory, so
+        workers attach to them instead of unpickling copies, and each worker
+        writes its estimate into a preallocated shared block instead of
+        pickling it back. Workers are spawned rather than forked: forking
+        after numba's parallel kernels have started threads in this process
+        can deadlock the children.
+        
+        Args:
+            estimators: Mapping of result name to AtmosphericCorrection method name
+            
+        Returns:
+            Mapping of result name to estimated array
+        """
+        dem_data = self.corrector.dem_data
+        phase = self.corrector.phase
+        out_dtype = np.result_type(dem_data, phase, np.float32)
+        
+        blocks = []
+        try:
+            dem_shm, dem_spec = _share_array(dem_data)
+            blocks.append(dem_shm)
+            phase_shm, phase_spec = _share_array(phase)
+            blocks.append(phase_shm)
+            
+            out_specs = {}
+            for name in estimators:
+                out_shm, out_specs[name] = _new_shared_array(dem_data.shape, out_dtype)
+                blocks.append(out_shm)
+            
+            with ProcessPoolExecutor(
+                max_workers=PIPELINE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_pipeline_worker,
+                initargs=(dem_spec, phase_spec, str(self.dem_file), str(self.interferogram_file))
+            ) as executor:
+                futures = [
+                    executor.submit(_run_estimator, method, out_specs[name])
+                    for name, method in estimators.items()
+                ]
+                for future in futures:
+                    future.result()
+            
+            # One memcpy per result out of shared memory, so the blocks can be
+            # released here rather than tied to the lifetime of the arrays
+            estimates = {}
+            for name, spec in out_specs.items():
+                out_shm, out = _attach_array(spec)
+                estimates[name] = out.copy()
+                del out
+                out_shm.close()
+            return estimates
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
     def run_full_correction(self) -> Dict[str, Any]:
         """
         Run complete atmospheric correction pipeline
@@ -577,11 +1053,7 @@ class AtmosphericCorrectionPipeline:
         logger.info("Starting full atmospheric correction pipeline")
         
         try:
-            # Extract phase
-            if np.iscomplexobj(self.corrector.ifg_data):
-                phase = np.angle(self.corrector.ifg_data)
-            else:
-                phase = self.corrector.ifg_data
+            phase = self.corrector.phase
             
             results = {
                 "original_phase_file": str(self.interferogram_file),
@@ -589,42 +1061,58 @@ class AtmosphericCorrectionPipeline:
                 "corrections": {}
             }
             
-            # 1. DEM correlation APS
-            logger.info("Step 1: DEM correlation APS estimation")
-            aps_dem = self.corrector.estimate_aps_dem_correlation()
-            phase_corrected_dem = self.corrector.linear_height_correction(phase)
-            
-            output_file_dem = self.output_dir / "phase_corrected_dem.tif"
-            correction_result_dem = self.corrector.apply_correction(phase, aps_dem, str(output_file_dem))
-            results["corrections"]["dem_correlation"] = correction_result_dem
-            
-            # 2. High-pass filter APS
-            logger.info("Step 2: High-pass filter APS estimation")
-            aps_hp = self.corrector.estimate_aps_high_pass_filter()
-            output_file_hp = self.output_dir / "phase_corrected_hp.tif"
-            correction_result_hp = self.corrector.apply_correction(phase, aps_hp, str(output_file_hp))
-            results["corrections"]["high_pass_filter"] = correction_result_hp
-            
-            # 3. Height-dependent model
-            logger.info("Step 3: Height-dependent APS estimation")
-            aps_height = self.corrector.estimate_aps_height_dependent()
-            output_file_height = self.output_dir / "phase_corrected_height.tif"
-            correction_result_height = self.corrector.apply_correction(phase, aps_height, str(output_file_height))
-            results["corrections"]["height_dependent"] = correction_result_height
-            
-            # 4. Water vapor correction
-            logger.info("Step 4: Water vapor correction")
-            pwd_correction = self.corrector.water_vapor_correction()
-            
-            # 5. Tropospheric delay correction
-            logger.info("Step 5: Tropospheric delay correction")
-            ztd_correction = self.corrector.tropospheric_delay_correction()
-            
-            # Combined correction
-            combined_correction = aps_dem + pwd_correction + ztd_correction
-            output_file_combined = self.output_dir / "phase_corrected_combined.tif"
-            correction_result_combined = self.corrector.apply_correction(phase, combined_correction, str(output_file_combined))
-            results["corrections"]["combined"] = correction_result_combined
+            # The five estimators are independent; large scenes run them in worker processes
+            logger.info("Steps 1-5: APS and tropospheric correction estimation")
+            estimators = {
+                "dem": "estimate_aps_dem_correlation",
+                "hp": "estimate_aps_high_pass_filter",
+                "height": "estimate_aps_height_dependent",
+                "pwv": "water_vapor_correction",
+                "ztd": "tropospheric_delay_correction",
+            }
+            if self.corrector.dem_data.size >= PIPELINE_MIN_PIXELS:
+                estimates = self._run_estimators_parallel(estimators)
+            else:
+                estimates = {
+                    name: getattr(self.corrector, method)()
+                    for name, method in estimators.items()
+                }
+            
+            aps_dem = estimates["dem"]
+            aps_hp = estimates["hp"]
+            aps_height = estimates["height"]
+            pwd_correction = estimates["pwv"]
+            ztd_correction = estimates["ztd"]
+            
+            # Combined correction, accumulated in a single buffer tile by tile
+            # so each tile of the sum is still in cache for the second add
+            combined_correction = np.empty(
+                aps_dem.shape, dtype=np.result_type(aps_dem, pwd_correction, ztd_correction)
+            )
+            for _, tile, _ in _tile_iter(combined_correction.shape):
+                np.add(aps_dem[tile], pwd_correction[tile], out=combined_correction[tile])
+                np.add(combined_correction[tile], ztd_correction[tile], out=combined_correction[tile])
+            
+            # Apply and save the corrections concurrently; GDAL releases the GIL
+            # while compressing and writing, so the outputs overlap on disk I/O
+            corrections = {
+                # 1. DEM correlation APS
+                "dem_correlation": (aps_dem, "phase_corrected_dem.tif"),
+                # 2. High-pass filter APS
+                "high_pass_filter": (aps_hp, "phase_corrected_hp.tif"),
+                # 3. Height-dependent model
+                "height_dependent": (aps_height, "phase_corrected_height.tif"),
+                "combined": (combined_correction, "phase_corrected_combined.tif"),
+            }
+            with ThreadPoolExecutor(max_workers=len(corrections)) as executor:
+                futures = {
+                    name: executor.submit(
+                        self.corrector.apply_correction, phase, aps, str(self.output_dir / file_name)
+                    )
+                    for name, (aps, file_name) in corrections.items()
+                }
+                for name, future in futures.items():
+                    results["corrections"][name] = future.result()
             
             logger.info("Atmospheric correction pipeline completed successfully")
             
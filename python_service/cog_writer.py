@@ -0,0 +1,57 @@
+"""
+Cloud-Optimized GeoTIFF Output
+Rasters are streamed tile by tile into a staging GeoTIFF, then laid out as a
+COG (tiles, internal overviews, header first) so consumers can fetch subsets
+and previews with HTTP range requests
+"""
+
+import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+import rasterio.shutil
+
+logger = logging.getLogger(__name__)
+
+COG_BLOCKSIZE = 512  # Tile edge (pixels) of the full-resolution image and overviews
+
+# GDAL COG driver options for float32 outputs: DEFLATE with the floating-point
+# predictor, overviews averaged down until they fit in a single tile
+COG_OPTIONS = {
+    "compress": "deflate",
+    "level": 5,
+    "predictor": "YES",
+    "resampling": "average",
+    "overviews": "AUTO",
+    "bigtiff": "IF_SAFER",
+}
+
+
+@contextmanager
+def staged_cog(output_file: Union[str, Path], blocksize: int = COG_BLOCKSIZE) -> Iterator[Path]:
+    """
+    Yield a staging path to write a GeoTIFF to, published as a COG on exit
+
+    The staging file sits next to the output and is always removed; the COG
+    replaces output_file atomically, so readers never see a partial file.
+
+    Args:
+        output_file: Final COG path
+        blocksize: Tile edge of the COG (a multiple of 16)
+
+    Yields:
+        Path of the staging GeoTIFF
+    """
+    output_file = Path(output_file)
+    staging_file = output_file.with_name(f".{output_file.stem}.staging.tif")
+    cog_file = output_file.with_name(f".{output_file.stem}.cog.tif")
+    try:
+        yield staging_file
+        rasterio.shutil.copy(staging_file, cog_file, driver="COG", blocksize=blocksize, **COG_OPTIONS)
+        os.replace(cog_file, output_file)
+        logger.debug(f"Wrote COG {output_file}")
+    finally:
+        staging_file.unlink(missing_ok=True)
+        cog_file.unlink(missing_ok=True)
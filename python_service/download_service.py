@@ -8,39 +8,189 @@ import os
 import json
 import time
 import hashlib
+import tempfile
+import atexit
 import asyncio
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from pathlib import Path
 from datetime import datetime
 import requests
-from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import httpx
 import threading
+from collections import OrderedDict
+
+try:
+    import h2  # noqa: F401 - required by httpx for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+MAX_CONCURRENT_DOWNLOADS = 16  # Transfers allowed in flight at once
+MAX_TRACKED_DOWNLOADS = 1000  # Finished downloads beyond this are forgotten, oldest first
+_FINISHED_STATUSES = ("completed", "failed")
+PROGRESS_INTERVAL = 0.1  # seconds between progress notifications per download
+CACHE_FLUSH_DELAY = 1.0  # seconds; cache index writes within this window coalesce
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB; also the pause-check granularity
+WRITE_BATCH_SIZE = DOWNLOAD_CHUNK_SIZE  # Buffered chunks are flushed with one writev
+
+
+def _short_id(key: str) -> str:
+    """Return a 12 hex digit identifier for a URL or path (not a security hash)"""
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_hexdigest(key.encode())[:12]
+    return hashlib.blake2b(key.encode(), digest_size=6).hexdigest()
+
+
+def _existing_size(path: Path) -> int:
+    """Return the size of a partially downloaded file, or 0 if there is none"""
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _range_validator(headers) -> Optional[str]:
+    """Return a validator usable in If-Range (weak ETags are not allowed there)"""
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("last-modified")
+
+
+# Display templates indexed by binary magnitude: (bit_length - 1) // 10
+# selects B, KB, MB, GB without a comparison chain
+_SIZE_FORMATS = ("{:.0f} B", "{:.1f} KB", "{:.1f} MB", "{:.2f} GB")
+_SPEED_FORMATS = ("{:.1f} B/s", "{:.1f} KB/s", "{:.1f} MB/s")
+
+
+def _format_size(size: int) -> str:
+    """Format file size for display"""
+    unit = min((int(size).bit_length() - 1) // 10, len(_SIZE_FORMATS) - 1) if size > 0 else 0
+    return _SIZE_FORMATS[unit].format(size / (1 << (10 * unit)))
+
+
+def _format_speed(speed: int) -> str:
+    """Format a transfer rate in bytes per second for display"""
+    unit = min((int(speed).bit_length() - 1) // 10, len(_SPEED_FORMATS) - 1) if speed > 0 else 0
+    return _SPEED_FORMATS[unit].format(speed / (1 << (10 * unit)))
+
+
+def _format_eta(eta: int) -> str:
+    """Format remaining seconds for display"""
+    if eta < 60:
+        return f"{eta}s"
+    minutes, seconds = divmod(eta, 60)
+    if eta < 3600:
+        return f"{minutes}m {seconds}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m"
+
+
+def _dumps_index(index: Dict[str, Any]) -> bytes:
+    """Serialize the cache index as indented JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(index, option=orjson.OPT_INDENT_2)
+    return json.dumps(index, indent=2).encode()
+
+
+def _loads_index(data: bytes) -> Dict[str, Any]:
+    """Parse cache index JSON bytes"""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _open_preallocated(path: Path, size: int, offset: int = 0) -> int:
+    """Open path for writing at offset and reserve up to size bytes so the file is laid out contiguously"""
+    if offset:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+        os.lseek(fd, offset, os.SEEK_SET)
+    else:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    if size > offset and hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, offset, size - offset)
+        except OSError:
+            pass  # Filesystem without fallocate support; extend as we write
+    return fd
+
+
+def _writev_all(fd: int, buffers: List[bytes]):
+    """Write all buffers with as few syscalls as possible"""
+    written = os.writev(fd, buffers)
+    if written < sum(len(b) for b in buffers):
+        # Short write; finish the remainder byte-wise
+        view = memoryview(b"".join(buffers))[written:]
+        while view:
+            view = view[os.write(fd, view):]
+
+
+def _finish_file(fd: int, pending: List[bytes], size: int, sync: bool):
+    """Flush pending buffers, trim unused preallocation and close the file"""
+    try:
+        if pending:
+            _writev_all(fd, pending)
+        os.ftruncate(fd, size)
+        if sync:
+            getattr(os, "fdatasync", os.fsync)(fd)
+    finally:
+        os.close(fd)
+
 
 class DownloadProgress:
     """Track download progress for a single file"""
     
-    def __init__(self, file_id: str, filename: str, total_size: int):
+    __slots__ = (
+        "file_id", "filename", "url", "validator", "total_size", "downloaded_size",
+        "start_time_ns", "status", "error_message", "speed", "eta",
+        "_base_size", "_dict", "_dict_key"
+    )
+    
+    def __init__(self, file_id: str, filename: str, total_size: int, url: str = None):
         self.file_id = file_id
         self.filename = filename
+        self.url = url
+        self.validator = None  # Strong ETag or Last-Modified, sent as If-Range on resume
         self.total_size = total_size
         self.downloaded_size = 0
-        self.start_time = time.time()
+        self.start_time_ns = time.monotonic_ns()
         self.status = "pending"  # pending, downloading, paused, completed, failed
         self.error_message = None
-        self.speed = 0.0  # bytes per second
+        self.speed = 0  # bytes per second
         self.eta = 0  # estimated time remaining in seconds
-        
+        self._base_size = 0  # bytes already on disk when the transfer (re)started
+        self._dict = None
+        self._dict_key = None
+    
+    def begin(self, downloaded: int = 0):
+        """Restart the rate clock, e.g. when a paused transfer resumes at downloaded bytes"""
+        self.start_time_ns = time.monotonic_ns()
+        self._base_size = downloaded
+        self.downloaded_size = downloaded
+    
     def update(self, downloaded: int):
         """Update download progress"""
         self.downloaded_size = downloaded
-        elapsed = time.time() - self.start_time
-        if elapsed > 0:
-            self.speed = downloaded / elapsed
-            remaining = self.total_size - downloaded
-            self.eta = int(remaining / self.speed) if self.speed > 0 else 0
+        elapsed_ns = time.monotonic_ns() - self.start_time_ns
+        transferred = downloaded - self._base_size
+        if elapsed_ns > 0 and transferred > 0:
+            self.speed = transferred * 1_000_000_000 // elapsed_ns
+            remaining = max(0, self.total_size - downloaded)
+            self.eta = remaining * elapsed_ns // (transferred * 1_000_000_000)
     
     @property
     def progress_percent(self) -> float:
@@ -49,37 +199,35 @@ class DownloadProgress:
         return (self.downloaded_size / self.total_size) * 100
     
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        """Return a progress snapshot
+        
+        The dict is rebuilt only when the status changes or progress moves
+        by at least 0.1%; otherwise the previous snapshot is returned, so
+        callers must treat it as read-only.
+        """
+        if self.total_size:
+            permille = self.downloaded_size * 1000 // self.total_size
+        else:
+            permille = -self.downloaded_size  # Unknown size; track raw bytes
+        key = (self.status, permille, self.total_size, self.error_message)
+        if key == self._dict_key:
+            return self._dict
+        
+        self._dict_key = key
+        self._dict = {
             "file_id": self.file_id,
             "filename": self.filename,
             "total_size": self.total_size,
             "downloaded_size": self.downloaded_size,
-            "progress_percent": round(self.progress_percent, 2),
+            "progress_percent": max(permille, 0) / 10,
             "speed": self.speed,
-            "speed_formatted": self._format_speed(),
+            "speed_formatted": _format_speed(self.speed),
             "eta": self.eta,
-            "eta_formatted": self._format_eta(),
+            "eta_formatted": _format_eta(self.eta),
             "status": self.status,
             "error_message": self.error_message
         }
-    
-    def _format_speed(self) -> str:
-        if self.speed < 1024:
-            return f"{self.speed:.1f} B/s"
-        elif self.speed < 1024 * 1024:
-            return f"{self.speed / 1024:.1f} KB/s"
-        else:
-            return f"{self.speed / (1024 * 1024):.1f} MB/s"
-    
-    def _format_eta(self) -> str:
-        if self.eta < 60:
-            return f"{self.eta}s"
-        elif self.eta < 3600:
-            return f"{self.eta // 60}m {self.eta % 60}s"
-        else:
-            hours = self.eta // 3600
-            minutes = (self.eta % 3600) // 60
-            return f"{hours}h {minutes}m"
+        return self._dict
 
 
 class DownloadManager:
@@ -89,28 +237,98 @@ class DownloadManager:
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(parents=True, exist_ok=True)
         
-        self.downloads: Dict[str, DownloadProgress] = {}
+        # Insertion ordered so the oldest finished entries are evicted first
+        self.downloads: "OrderedDict[str, DownloadProgress]" = OrderedDict()
         self.callbacks: List[Callable] = []
         self._lock = threading.Lock()
-        self._executor = ThreadPoolExecutor(max_workers=3)
         self._paused_downloads = set()
         
+        # Downloads run as tasks on a dedicated event loop thread, started on
+        # first use and sharing one keep-alive HTTP client
+        self._loop = None
+        self._loop_thread = None
+        self._client = None
+        self._download_slots = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        
         # ASF API configuration
         self.asf_token = os.environ.get("ASF_API_TOKEN")
         self.asf_search_url = "https://api.daac.asf.alaska.edu/services/search/param"
         self.asf_download_url = "https://datapool.asf.alaska.edu"
         
+        # Pooled keep-alive session for search calls, with retry on throttling
+        # and transient server errors
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=64,
+            max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Authorization"] = f"Bearer {self.asf_token}"
+        
         logger.info(f"DownloadManager initialized, download_dir: {self.download_dir}")
     
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the download event loop thread if it is not running"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="download-loop",
+                    daemon=True
+                )
+                self._loop_thread.start()
+        return self._loop
+    
+    async def start(self):
+        """Create the shared HTTP client on the running loop"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                headers={"Authorization": f"Bearer {self.asf_token}"},
+                timeout=httpx.Timeout(300, connect=30),
+                limits=httpx.Limits(
+                    max_connections=MAX_CONCURRENT_DOWNLOADS,
+                    max_keepalive_connections=MAX_CONCURRENT_DOWNLOADS
+                ),
+                follow_redirects=True
+            )
+            self._download_slots = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    
+    async def _aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def close(self):
+        """Close the HTTP clients and stop the download loop"""
+        self.session.close()
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        self._loop = None
+        self._loop_thread = None
+    
     def add_progress_callback(self, callback: Callable):
         """Add callback for progress updates"""
         self.callbacks.append(callback)
     
     def _notify_progress(self, progress: DownloadProgress):
         """Notify all callbacks of progress update"""
+        if not self.callbacks:
+            return
+        
+        # Serialize once; every callback receives the same snapshot
+        data = progress.to_dict()
         for callback in self.callbacks:
             try:
-                callback(progress.to_dict())
+                callback(data)
             except Exception as e:
                 logger.error(f"Progress callback error: {e}")
     
@@ -145,15 +363,10 @@ class DownloadManager:
                 "output": "json"
             }
             
-            headers = {
-                "Authorization": f"Bearer {self.asf_token}",
-                "Accept": "application/json"
-            }
-            
-            response = requests.get(
+            response = self.session.get(
                 self.asf_search_url,
                 params=params,
-                headers=headers,
+                headers={"Accept": "application/json"},
                 timeout=60
             )
             
@@ -220,75 +433,195 @@ class DownloadManager:
         Returns:
             Download ID for tracking
         """
+        file_id = self._register(download_url, filename, file_id)
+        
+        # Start download in background
+        asyncio.run_coroutine_threadsafe(
+            self._download_file_async(file_id, download_url, filename),
+            self._ensure_loop()
+        )
+        
+        return file_id
+    
+    async def start_download_async(
+        self,
+        download_url: str,
+        filename: str,
+        file_id: str = None
+    ) -> str:
+        """
+        Download a file and wait for it to finish
+        
+        The transfer always runs on the manager's download loop, which owns
+        the shared HTTP client, so this can be awaited from any event loop.
+        
+        Args:
+            download_url: URL to download from
+            filename: Name for the downloaded file
+            file_id: Optional unique ID for tracking
+            
+        Returns:
+            Download ID; see get_download_status for the outcome
+        """
+        file_id = self._register(download_url, filename, file_id)
+        future = asyncio.run_coroutine_threadsafe(
+            self._download_file_async(file_id, download_url, filename),
+            self._ensure_loop()
+        )
+        await asyncio.wrap_future(future)
+        return file_id
+    
+    async def download_many(self, items: List[Tuple[str, str]]) -> List[str]:
+        """
+        Download several files concurrently
+        
+        Args:
+            items: (download_url, filename) pairs
+            
+        Returns:
+            Download IDs in input order
+        """
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(self.start_download_async(url, filename))
+                for url, filename in items
+            ]
+        return [task.result() for task in tasks]
+    
+    def _register(self, download_url: str, filename: str, file_id: Optional[str]) -> str:
+        """Create the progress tracker for a new download"""
         if file_id is None:
-            file_id = hashlib.md5(download_url.encode()).hexdigest()[:12]
+            file_id = _short_id(download_url)
         
         # Create progress tracker
-        progress = DownloadProgress(file_id, filename, 0)
+        progress = DownloadProgress(file_id, filename, 0, url=download_url)
         progress.status = "pending"
         
         with self._lock:
             self.downloads[file_id] = progress
-        
-        # Start download in background
-        self._executor.submit(self._download_file, file_id, download_url, filename)
+            self.downloads.move_to_end(file_id)
+            self._evict_finished()
         
         return file_id
     
-    def _download_file(self, file_id: str, url: str, filename: str):
-        """Download file with progress tracking"""
+    def _evict_finished(self):
+        """Drop the oldest finished downloads beyond MAX_TRACKED_DOWNLOADS; call with _lock held
+        
+        Pending, running and paused downloads are never evicted, so the
+        table can exceed the limit while that many are still active.
+        """
+        excess = len(self.downloads) - MAX_TRACKED_DOWNLOADS
+        if excess <= 0:
+            return
+        
+        evicted = []
+        for file_id, progress in self.downloads.items():
+            if progress.status in _FINISHED_STATUSES:
+                evicted.append(file_id)
+                if len(evicted) == excess:
+                    break
+        for file_id in evicted:
+            del self.downloads[file_id]
+            self._paused_downloads.discard(file_id)
+    
+    async def _download_file_async(
+        self,
+        file_id: str,
+        url: str,
+        filename: str,
+        resume: bool = False
+    ):
+        """Download file with progress tracking
+        
+        With resume set, bytes already on disk are kept and only the remainder
+        is requested with a Range header; a server that ignores the range or
+        reports a changed file (If-Range) sends the whole body instead.
+        """
         progress = self.downloads.get(file_id)
         if not progress:
             return
         
+        self._tasks[file_id] = asyncio.current_task()
+        await self.start()
+        loop = asyncio.get_running_loop()
+        file_path = self.download_dir / filename
+        
         try:
-            progress.status = "downloading"
-            self._notify_progress(progress)
-            
-            # Setup headers with auth
-            headers = {
-                "Authorization": f"Bearer {self.asf_token}"
-            }
-            
-            # Start download with streaming
-            response = requests.get(
-                url,
-                headers=headers,
-                stream=True,
-                timeout=300
-            )
-            
-            if response.status_code != 200:
-                progress.status = "failed"
-                progress.error_message = f"HTTP {response.status_code}"
+            async with self._download_slots:
+                progress.status = "downloading"
                 self._notify_progress(progress)
-                return
-            
-            # Get total size
-            total_size = int(response.headers.get('content-length', 0))
-            progress.total_size = total_size
-            
-            # Download file
-            file_path = self.download_dir / filename
-            downloaded = 0
-            chunk_size = 1024 * 1024  # 1MB chunks
-            
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    # Check if paused
-                    if file_id in self._paused_downloads:
-                        progress.status = "paused"
+                
+                headers = {}
+                offset = 0
+                if resume:
+                    offset = await loop.run_in_executor(None, _existing_size, file_path)
+                    if offset:
+                        headers["Range"] = f"bytes={offset}-"
+                        if progress.validator:
+                            headers["If-Range"] = progress.validator
+                
+                # Start download with streaming
+                async with self._client.stream("GET", url, headers=headers) as response:
+                    if response.status_code == 200:
+                        offset = 0
+                    elif response.status_code != 206 or not offset:
+                        progress.status = "failed"
+                        progress.error_message = f"HTTP {response.status_code}"
                         self._notify_progress(progress)
                         return
                     
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        progress.update(downloaded)
-                        self._notify_progress(progress)
+                    # Get total size
+                    length = int(response.headers.get('content-length', 0))
+                    total_size = offset + length if length else 0
+                    progress.total_size = total_size
+                    progress.validator = _range_validator(response.headers)
+                    
+                    # Download file; disk writes are blocking, so they go to
+                    # the default executor instead of stalling the loop, and
+                    # are batched into one writev per WRITE_BATCH_SIZE
+                    downloaded = offset
+                    progress.begin(offset)
+                    next_emit = time.monotonic() + PROGRESS_INTERVAL
+                    pending = []
+                    pending_size = 0
+                    completed = False
+                    
+                    fd = await loop.run_in_executor(
+                        None, _open_preallocated, file_path, total_size, offset
+                    )
+                    try:
+                        async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                            # Check if paused
+                            if file_id in self._paused_downloads:
+                                progress.status = "paused"
+                                progress.update(downloaded)
+                                self._notify_progress(progress)
+                                return
+                            
+                            if chunk:
+                                pending.append(chunk)
+                                pending_size += len(chunk)
+                                downloaded += len(chunk)
+                                if pending_size >= WRITE_BATCH_SIZE:
+                                    await loop.run_in_executor(None, _writev_all, fd, pending)
+                                    pending = []
+                                    pending_size = 0
+                                
+                                # Throttle updates; completion always reports below
+                                now = time.monotonic()
+                                if now >= next_emit:
+                                    next_emit = now + PROGRESS_INTERVAL
+                                    progress.update(downloaded)
+                                    self._notify_progress(progress)
+                        completed = True
+                    finally:
+                        # Sync once on completion rather than per chunk
+                        await loop.run_in_executor(
+                            None, _finish_file, fd, pending, downloaded, completed
+                        )
             
             progress.status = "completed"
-            progress.downloaded_size = total_size
+            progress.update(downloaded)
             self._notify_progress(progress)
             
             logger.info(f"Download completed: {filename}")
@@ -298,6 +631,24 @@ class DownloadManager:
             progress.status = "failed"
             progress.error_message = str(e)
             self._notify_progress(progress)
+        finally:
+            if self._tasks.get(file_id) is asyncio.current_task():
+                del self._tasks[file_id]
+    
+    async def _resume_async(self, file_id: str):
+        """Continue a paused download from the bytes already on disk"""
+        self._paused_downloads.discard(file_id)
+        progress = self.downloads.get(file_id)
+        if not progress:
+            return
+        
+        task = self._tasks.get(file_id)
+        if task is not None and not task.done():
+            if progress.status != "paused":
+                return  # The pause was not observed yet; the transfer continues
+            await task  # Let the paused transfer flush and close its file
+        
+        await self._download_file_async(file_id, progress.url, progress.filename, resume=True)
     
     def pause_download(self, file_id: str) -> bool:
         """Pause a download"""
@@ -307,14 +658,10 @@ class DownloadManager:
         return False
     
     def resume_download(self, file_id: str) -> bool:
-        """Resume a paused download"""
+        """Resume a paused download with an HTTP Range request"""
         if file_id in self._paused_downloads:
-            self._paused_downloads.discard(file_id)
-            progress = self.downloads.get(file_id)
-            if progress:
-                # TODO: Implement resume with range headers
-                progress.status = "downloading"
-                self._notify_progress(progress)
+            # Runs on the download loop so it cannot race the pause check
+            asyncio.run_coroutine_threadsafe(self._resume_async(file_id), self._ensure_loop())
             return True
         return False
     
@@ -338,7 +685,9 @@ class DownloadManager:
     
     def get_all_downloads(self) -> List[Dict[str, Any]]:
         """Get status of all downloads"""
-        return [p.to_dict() for p in self.downloads.values()]
+        with self._lock:
+            progresses = list(self.downloads.values())
+        return [p.to_dict() for p in progresses]
 
 
 class DataCacheManager:
@@ -351,25 +700,76 @@ class DataCacheManager:
         self.cache_index_file = self.cache_dir / "cache_index.json"
         self.cache_index = self._load_cache_index()
         
+        # Reverse index for file_exists; a filename may be cached from
+        # several directories, so each maps to the set of its cache ids
+        self._by_filename: Dict[str, set] = {}
+        for cache_id, file_info in self.cache_index["files"].items():
+            self._by_filename.setdefault(file_info["filename"], set()).add(cache_id)
+        
+        # Mutations hold _lock; index writes are deferred and coalesced by a
+        # timer, and _flush_lock keeps concurrent flushes in snapshot order
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._flush_timer = None
+        atexit.register(self.flush)
+        
         logger.info(f"DataCacheManager initialized, cache_dir: {self.cache_dir}")
     
     def _load_cache_index(self) -> Dict[str, Any]:
         """Load cache index from file"""
         if self.cache_index_file.exists():
             try:
-                with open(self.cache_index_file, 'r') as f:
-                    return json.load(f)
+                with open(self.cache_index_file, 'rb') as f:
+                    return _loads_index(f.read())
             except Exception as e:
                 logger.error(f"Failed to load cache index: {e}")
         return {"files": {}, "total_size": 0}
     
-    def _save_cache_index(self):
-        """Save cache index to file"""
+    def _save_cache_index(self, data: bytes) -> bool:
+        """Save serialized cache index to file
+        
+        Writes to a temporary file in the cache directory and renames it over
+        the index, so a crash mid-write never leaves a truncated index.
+        """
+        tmp_path = None
         try:
-            with open(self.cache_index_file, 'w') as f:
-                json.dump(self.cache_index, f, indent=2)
+            with tempfile.NamedTemporaryFile(
+                'wb', dir=self.cache_dir, prefix=".cache_index.", suffix=".tmp", delete=False
+            ) as f:
+                tmp_path = f.name
+                f.write(data)
+            os.replace(tmp_path, self.cache_index_file)
+            return True
         except Exception as e:
             logger.error(f"Failed to save cache index: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return False
+    
+    def _mark_dirty(self):
+        """Schedule a coalesced index write; call with _lock held"""
+        self._dirty = True
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(CACHE_FLUSH_DELAY, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def flush(self):
+        """Write pending cache index changes to disk now"""
+        with self._flush_lock:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if not self._dirty:
+                    return
+                self._dirty = False
+                data = _dumps_index(self.cache_index)
+            
+            if not self._save_cache_index(data):
+                with self._lock:
+                    self._mark_dirty()
     
     def add_to_cache(
         self,
@@ -391,22 +791,27 @@ class DataCacheManager:
             raise FileNotFoundError(f"File not found: {file_path}")
         
         file_size = path.stat().st_size
-        cache_id = hashlib.md5(str(path).encode()).hexdigest()[:12]
-        
-        self.cache_index["files"][cache_id] = {
+        cache_id = _short_id(str(path))
+        entry = {
             "path": str(path),
             "filename": path.name,
             "size": file_size,
-            "size_formatted": self._format_size(file_size),
+            "size_formatted": _format_size(file_size),
             "added_at": datetime.now().isoformat(),
             "metadata": metadata or {}
         }
         
-        self.cache_index["total_size"] = sum(
-            f["size"] for f in self.cache_index["files"].values()
-        )
+        with self._lock:
+            # Re-adding a path replaces its entry, so drop the old size first
+            previous = self.cache_index["files"].get(cache_id)
+            if previous is not None:
+                self.cache_index["total_size"] -= previous["size"]
+            
+            self.cache_index["files"][cache_id] = entry
+            self.cache_index["total_size"] += file_size
+            self._by_filename.setdefault(path.name, set()).add(cache_id)
+            self._mark_dirty()
         
-        self._save_cache_index()
         return cache_id
     
     def remove_from_cache(self, cache_id: str, delete_file: bool = True) -> bool:
@@ -420,10 +825,20 @@ class DataCacheManager:
         Returns:
             True if successful
         """
-        if cache_id not in self.cache_index["files"]:
-            return False
-        
-        file_info = self.cache_index["files"][cache_id]
+        with self._lock:
+            file_info = self.cache_index["files"].pop(cache_id, None)
+            if file_info is None:
+                return False
+            
+            self.cache_index["total_size"] -= file_info["size"]
+            
+            cache_ids = self._by_filename.get(file_info["filename"])
+            if cache_ids is not None:
+                cache_ids.discard(cache_id)
+                if not cache_ids:
+                    del self._by_filename[file_info["filename"]]
+            
+            self._mark_dirty()
         
         if delete_file:
             try:
@@ -433,12 +848,6 @@ class DataCacheManager:
             except Exception as e:
                 logger.error(f"Failed to delete file: {e}")
         
-        del self.cache_index["files"][cache_id]
-        self.cache_index["total_size"] = sum(
-            f["size"] for f in self.cache_index["files"].values()
-        )
-        
-        self._save_cache_index()
         return True
     
     def clear_cache(self, delete_files: bool = True) -> int:
@@ -451,10 +860,14 @@ class DataCacheManager:
         Returns:
             Number of files cleared
         """
-        count = len(self.cache_index["files"])
+        with self._lock:
+            files = self.cache_index["files"]
+            self.cache_index = {"files": {}, "total_size": 0}
+            self._by_filename.clear()
+            self._mark_dirty()
         
         if delete_files:
-            for file_info in self.cache_index["files"].values():
+            for file_info in files.values():
                 try:
                     path = Path(file_info["path"])
                     if path.exists():
@@ -462,18 +875,18 @@ class DataCacheManager:
                 except Exception as e:
                     logger.error(f"Failed to delete file: {e}")
         
-        self.cache_index = {"files": {}, "total_size": 0}
-        self._save_cache_index()
-        
-        return count
+        return len(files)
     
     def get_cache_info(self) -> Dict[str, Any]:
         """Get cache information"""
+        with self._lock:
+            files = list(self.cache_index["files"].values())
+            total_size = self.cache_index["total_size"]
         return {
-            "total_files": len(self.cache_index["files"]),
-            "total_size": self.cache_index["total_size"],
-            "total_size_formatted": self._format_size(self.cache_index["total_size"]),
-            "files": list(self.cache_index["files"].values())
+            "total_files": len(files),
+            "total_size": total_size,
+            "total_size_formatted": _format_size(total_size),
+            "files": files
         }
     
     def get_file_info(self, cache_id: str) -> Optional[Dict[str, Any]]:
@@ -482,21 +895,7 @@ class DataCacheManager:
     
     def file_exists(self, filename: str) -> bool:
         """Check if a file is already cached"""
-        for file_info in self.cache_index["files"].values():
-            if file_info["filename"] == filename:
-                return True
-        return False
-    
-    def _format_size(self, size: int) -> str:
-        """Format file size for display"""
-        if size < 1024:
-            return f"{size} B"
-        elif size < 1024 * 1024:
-            return f"{size / 1024:.1f} KB"
-        elif size < 1024 * 1024 * 1024:
-            return f"{size / (1024 * 1024):.1f} MB"
-        else:
-            return f"{size / (1024 * 1024 * 1024):.2f} GB"
+        return filename in self._by_filename
 
 
 # Global instances
@@ -4,16 +4,388 @@ Downloads and processes ERA5 weather data for atmospheric correction
 """
 
 import logging
+import hashlib
+import os
+import pickle
+import shutil
+import subprocess
+import tempfile
 import numpy as np
 import requests
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Tuple, Optional, NamedTuple
 from pathlib import Path
 from datetime import datetime, timedelta
 import json
-import cdsapi
+
+from cog_writer import staged_cog
+from raster_stats import OnlineMoments
+
+try:
+    import cdsapi
+    CDSAPI_AVAILABLE = True
+except ImportError:
+    CDSAPI_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import xarray as xr
+    XARRAY_AVAILABLE = True
+except ImportError:
+    XARRAY_AVAILABLE = False
+
+try:
+    import dask  # noqa: F401  (enables chunked xarray datasets)
+    DASK_AVAILABLE = True
+except ImportError:
+    DASK_AVAILABLE = False
+
+try:
+    import netCDF4
+    NETCDF4_AVAILABLE = True
+except ImportError:
+    NETCDF4_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# One epoch per dask chunk: corrections read a single time slice over the full area
+ERA5_CHUNKS = {"time": 1, "valid_time": 1, "latitude": -1, "longitude": -1}
+# nccopy chunk spec for rewriting contiguous netCDF-3 downloads
+NCCOPY_CHUNKS = "longitude/4,latitude/4,level/all,time/{ntime}"
+HDF5_CHUNK_CACHE = 128 * 1024 * 1024  # Bytes of HDF5 chunk cache for netCDF-4 reads
+TRI_CACHE_DIR = Path("./data/tri_cache")  # Pickled Delaunay triangulations, reused across runs
+# Magnus saturation vapor pressure es = ES0 * exp(A * t / (B + t)), t in degrees C.
+# numba freezes these module globals into the compiled kernels as constants
+MAGNUS_A = 17.27
+MAGNUS_B = 237.7  # degrees C
+MAGNUS_ES0 = 6.1078  # hPa
+SIMULATION_SEED = 42  # Seed for simulated ERA5 fields, so runs are reproducible
+INTERP_CACHE_SIZE = 8  # Interpolated fields kept per corrector (FIFO)
+INTERP_HASH_MAX_BYTES = 4 * 1024 * 1024  # Inputs up to this size are keyed by content, larger by identity
+
+# Creation options for the staging GeoTIFFs of float32 ZTD/PWV outputs (published
+# as COGs with the same tiling): 512-pixel tiles plus floating-point predictor + DEFLATE
+GEOTIFF_OPTIONS = {
+    "tiled": True,
+    "blockxsize": 512,
+    "blockysize": 512,
+    "compress": "deflate",
+    "zlevel": 5,
+    "predictor": 3,
+    "BIGTIFF": "IF_SAFER",
+}
+
+
+def _is_monotonic(values: np.ndarray) -> bool:
+    """Check a 1-D coordinate vector is strictly increasing or decreasing"""
+    steps = np.diff(values)
+    return bool(np.all(steps > 0) or np.all(steps < 0))
+
+
+def _pixel_centers(transform, height: int, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """1-D x (column) and y (row) pixel-centre coordinates of a north-up geotransform"""
+    xs = transform.c + (np.arange(width) + 0.5) * transform.a
+    ys = transform.f + (np.arange(height) + 0.5) * transform.e
+    return xs, ys
+
+
+def _axis_weights(source: np.ndarray, target: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Linear interpolation indices and weights along one monotonic axis
+    
+    Args:
+        source: Strictly monotonic source coordinates (length >= 2)
+        target: Coordinates to sample
+        
+    Returns:
+        Tuple of (lower source index i, weight of index i + 1); the weight
+        is NaN for targets outside the source range
+    """
+    descending = source[0] > source[-1]
+    ascending_source = source[::-1] if descending else source
+    
+    i = np.searchsorted(ascending_source, target, side="right") - 1
+    i = np.clip(i, 0, source.size - 2)
+    lower = ascending_source[i]
+    weight = (target - lower) / (ascending_source[i + 1] - lower)
+    weight[(target < ascending_source[0]) | (target > ascending_source[-1])] = np.nan
+    
+    if descending:
+        # Bracket [i, i + 1] of the reversed axis is [n - 2 - i, n - 1 - i] of the original
+        return source.size - 2 - i, 1 - weight
+    return i, weight
+
+
+def _simulated_field(rng: np.random.Generator, shape: Tuple[int, ...], mean: float, scale: float) -> np.ndarray:
+    """Gaussian stand-in for an ERA5 field, drawn and scaled in place as float32"""
+    field = rng.standard_normal(shape, dtype=np.float32)
+    field *= scale
+    field += mean
+    return field
+
+
+def _vapor_pressure(temperature, humidity):
+    """Water vapor pressure (hPa) from temperature (K) and relative humidity (%), Magnus formula"""
+    # Convert temperature to Celsius
+    temp_c = temperature - 273.15
+    
+    # Saturation vapor pressure
+    es = MAGNUS_ES0 * np.exp((MAGNUS_A * temp_c) / (MAGNUS_B + temp_c))
+    
+    # Actual vapor pressure
+    return (humidity / 100.0) * es
+
+
+def _latitude_factor(latitude):
+    """Saastamoinen gravity term 1 - 0.00266 cos(2 * latitude), latitude in degrees"""
+    return 1.0 - 0.00266 * np.cos(2 * np.radians(latitude))
+
+
+def _saastamoinen(pressure, temperature, vapor_pressure, elevation, lat_factor):
+    """
+    Saastamoinen ZTD (m) from pressure (Pa), temperature (K), vapor pressure (hPa), elevation (m)
+    
+    lat_factor is _latitude_factor of the pixel latitudes; a 1-D vector
+    against 2-D fields holds one value per row.
+    """
+    k2 = 71.97  # K/hPa
+    k3 = 375463  # K^2/hPa
+    
+    if np.ndim(lat_factor) == 1 and np.ndim(elevation) == 2:
+        lat_factor = lat_factor[:, None]
+    
+    # Convert pressure to hPa
+    p = pressure / 100.0
+    
+    # Hydrostatic delay
+    zhd = (0.0022768 * p) / (lat_factor - 0.00028 * elevation / 1000.0)
+    
+    # Wet delay
+    zwd = (0.002277 * (k2 + k3 / (temperature - 273.15)) * vapor_pressure) / (temperature - 273.15)
+    
+    return zhd + zwd
+
+
+def _ztd_numpy(temperature, pressure, humidity, elevation, lat_factor):
+    """Zenith tropospheric delay (m) on the DEM grid"""
+    e = _vapor_pressure(temperature, humidity)
+    return _saastamoinen(pressure, temperature, e, elevation, lat_factor)
+
+
+def _ztd_pwv_numpy(temperature, pressure, humidity, elevation, lat_factor):
+    """ZTD (m) and PWV (kg/m^2) sharing one vapor-pressure evaluation"""
+    e = _vapor_pressure(temperature, humidity)
+    return _saastamoinen(pressure, temperature, e, elevation, lat_factor), 0.14 * e + 2.1
+
+
+if NUMBA_AVAILABLE:
+    # fastmath without 'nnan'/'ninf' so NaN pixels outside ERA5 coverage propagate.
+    # The Pa -> hPa conversion is folded into the hydrostatic coefficient and the
+    # latitude term is read once per row
+    @njit(parallel=True, cache=True, fastmath={"contract", "afn", "arcp", "reassoc"})
+    def _ztd_numba(temperature, pressure, humidity, elevation, lat_factor):
+        """Fused single-pass version of _ztd_numpy for 2-D arrays"""
+        ztd = np.empty_like(elevation)
+        for i in prange(elevation.shape[0]):
+            row_factor = lat_factor[i]
+            for j in range(elevation.shape[1]):
+                temp_c = temperature[i, j] - 273.15
+                e = humidity[i, j] * (0.01 * MAGNUS_ES0) * np.exp(MAGNUS_A * temp_c / (MAGNUS_B + temp_c))
+                zhd = 2.2768e-5 * pressure[i, j] / (row_factor - 2.8e-7 * elevation[i, j])
+                zwd = 0.002277 * (71.97 + 375463 / temp_c) * e / temp_c
+                ztd[i, j] = zhd + zwd
+        return ztd
+
+    @njit(parallel=True, cache=True, fastmath={"contract", "afn", "arcp", "reassoc"})
+    def _ztd_pwv_numba(temperature, pressure, humidity, elevation, lat_factor):
+        """Fused single-pass version of _ztd_pwv_numpy for 2-D arrays"""
+        ztd = np.empty_like(elevation)
+        pwv = np.empty_like(elevation)
+        for i in prange(elevation.shape[0]):
+            row_factor = lat_factor[i]
+            for j in range(elevation.shape[1]):
+                temp_c = temperature[i, j] - 273.15
+                e = humidity[i, j] * (0.01 * MAGNUS_ES0) * np.exp(MAGNUS_A * temp_c / (MAGNUS_B + temp_c))
+                zhd = 2.2768e-5 * pressure[i, j] / (row_factor - 2.8e-7 * elevation[i, j])
+                zwd = 0.002277 * (71.97 + 375463 / temp_c) * e / temp_c
+                ztd[i, j] = zhd + zwd
+                pwv[i, j] = 0.14 * e + 2.1
+        return ztd, pwv
+
+
+def _blend_columns_numpy(rows, c0, wc):
+    """Linear blend of columns c0 and c0 + 1 of rows with weights wc"""
+    result = rows[:, c0]
+    result *= 1 - wc
+    result += rows[:, c0 + 1] * wc
+    return result
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True, fastmath={"contract", "afn", "arcp", "reassoc"})
+    def _blend_columns_numba(rows, c0, wc):
+        """Single-pass version of _blend_columns_numpy"""
+        result = np.empty((rows.shape[0], c0.size), dtype=rows.dtype)
+        for i in prange(rows.shape[0]):
+            for j in range(c0.size):
+                k = c0[j]
+                result[i, j] = rows[i, k] + wc[j] * (rows[i, k + 1] - rows[i, k])
+        return result
+
+
+def _blend_columns(rows, c0, wc):
+    """Column step of the separable bilinear interpolation, fused when numba is available"""
+    if NUMBA_AVAILABLE:
+        return _blend_columns_numba(rows, c0, wc.astype(rows.dtype, copy=False))
+    return _blend_columns_numpy(rows, c0, wc)
+
+
+def _kernel_arrays(fields, elevation, lat_factor):
+    """
+    Arrays for the numba kernels, or None when the NumPy path should be used
+    
+    Not downcast: the wet term divides by T - 273.15, which amplifies
+    float32 rounding of the temperature near 0 degrees C. Scalar fields
+    become zero-stride views rather than full arrays.
+    """
+    fields = (*fields, elevation)
+    if (not NUMBA_AVAILABLE or np.ndim(elevation) != 2
+            or np.broadcast_shapes(*(np.shape(a) for a in fields)) != elevation.shape):
+        return None
+    dtype = np.result_type(*fields, np.float32)
+    arrays = [np.broadcast_to(np.asarray(a, dtype=dtype), elevation.shape) for a in fields]
+    arrays.append(np.broadcast_to(np.asarray(lat_factor, dtype=dtype), elevation.shape[:1]))
+    return arrays
+
+
+def _ztd(temperature, pressure, humidity, elevation, lat_factor):
+    """Zenith tropospheric delay, fused into one pass when numba is available"""
+    arrays = _kernel_arrays((temperature, pressure, humidity), elevation, lat_factor)
+    if arrays is not None:
+        return _ztd_numba(*arrays)
+    return _ztd_numpy(temperature, pressure, humidity, elevation, lat_factor)
+
+
+def _ztd_pwv(temperature, pressure, humidity, elevation, lat_factor):
+    """ZTD and PWV, fused into one pass when numba is available"""
+    arrays = _kernel_arrays((temperature, pressure, humidity), elevation, lat_factor)
+    if arrays is not None:
+        return _ztd_pwv_numba(*arrays)
+    return _ztd_pwv_numpy(temperature, pressure, humidity, elevation, lat_factor)
+
+
+class AtmosphericState(NamedTuple):
+    """ERA5 fields interpolated onto the DEM grid"""
+    temperature: np.ndarray  # K
+    pressure: np.ndarray  # Pa
+    humidity: np.ndarray  # %
+
+
+def _is_netcdf3(path: Path) -> bool:
+    """Check for the classic netCDF magic number (contiguous, unchunked storage)"""
+    with open(path, "rb") as f:
+        return f.read(3) == b"CDF"
+
+
+def _rechunk_era5(path: Path, ntime: int) -> Path:
+    """
+    Rewrite a classic netCDF file as chunked, compressed netCDF-4 with nccopy
+    
+    The rewritten copy is kept next to the original and reused while it is
+    newer. Without nccopy, or for files that are already netCDF-4, the
+    original path is returned.
+    
+    Args:
+        path: Downloaded ERA5 file
+        ntime: Number of epochs in the file
+        
+    Returns:
+        Path to read from
+    """
+    if not _is_netcdf3(path) or shutil.which("nccopy") is None:
+        return path
+    
+    target = path.with_suffix(".chunked.nc")
+    if target.exists() and target.stat().st_mtime >= path.stat().st_mtime:
+        return target
+    
+    tmp = target.with_suffix(".tmp")
+    subprocess.run(
+        ["nccopy", "-k", "4", "-d", "4", "-w", "-h", "100M",
+         "-c", NCCOPY_CHUNKS.format(ntime=ntime), str(path), str(tmp)],
+        check=True,
+        capture_output=True
+    )
+    os.replace(tmp, target)
+    logger.info(f"Rechunked {path.name} to {target.name}")
+    return target
+
+
+def _load_era5(path: str) -> "xr.Dataset":
+    """
+    Open an ERA5 netCDF file lazily, one epoch per chunk
+    
+    Args:
+        path: Downloaded ERA5 file
+        
+    Returns:
+        xarray Dataset (dask-backed when dask is installed)
+    """
+    if not XARRAY_AVAILABLE:
+        raise ImportError("xarray is required to read ERA5 netCDF files")
+    if NETCDF4_AVAILABLE:
+        netCDF4.set_chunk_cache(HDF5_CHUNK_CACHE)
+    
+    path = Path(path)
+    if _is_netcdf3(path):
+        with xr.open_dataset(path) as ds:
+            ntime = ds.sizes.get("time", 1)
+        path = _rechunk_era5(path, ntime)
+    
+    ds = xr.open_dataset(path)
+    if DASK_AVAILABLE:
+        ds = ds.chunk({dim: size for dim, size in ERA5_CHUNKS.items() if dim in ds.dims})
+    return ds
+
+
+def _era5_surface_fields(ds: "xr.Dataset", time_index: int = 0):
+    """
+    Extract the fields used by the ZTD kernel at one epoch
+    
+    Pressure-level variables are taken at the highest-pressure (lowest)
+    level. Surface pressure ``sp`` is used when present, otherwise the
+    level pressure itself.
+    
+    Args:
+        ds: ERA5 dataset with ``t`` (K) and ``r`` (%) variables
+        time_index: Epoch to read
+        
+    Returns:
+        Tuple of (temperature K, relative humidity %, pressure Pa, latitude, longitude)
+    """
+    time_dim = next((dim for dim in ("time", "valid_time") if dim in ds.dims), None)
+    if time_dim is not None:
+        ds = ds.isel({time_dim: time_index})
+    
+    level_dim = next((dim for dim in ("level", "pressure_level") if dim in ds.dims), None)
+    if level_dim is not None:
+        ds = ds.isel({level_dim: int(ds[level_dim].argmax())})
+    
+    temperature = ds["t"].values
+    humidity = ds["r"].values
+    if "sp" in ds:
+        pressure = ds["sp"].values
+    elif level_dim is not None:
+        pressure = np.float32(float(ds[level_dim]) * 100)  # hPa -> Pa
+    else:
+        raise KeyError("ERA5 dataset has neither surface pressure nor pressure levels")
+    
+    return temperature, humidity, pressure, ds["latitude"].values, ds["longitude"].values
+
 
 class ERA5DataDownloader:
     """Download ERA5 meteorological data from Copernicus Climate Data Store"""
@@ -25,7 +397,9 @@ class ERA5DataDownloader:
         Args:
             cds_api_key: CDS API key (if None, will use ~/.cdsapirc)
         """
-        self.client = cdsapi.Client()
+        # Downloads are simulated until CDS retrieval is enabled, so the
+        # client is optional
+        self.client = cdsapi.Client() if CDSAPI_AVAILABLE else None
         self.cache_dir = Path("./data/era5_cache")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         logger.info("ERA5DataDownloader initialized")
@@ -61,8 +435,10 @@ class ERA5DataDownloader:
         
         try:
             # Check cache first
-            cache_key = f"{start_date}_{end_date}_{bbox}"
-            cache_file = self.cache_dir / f"era5_{hash(cache_key)}.nc"
+            # Content hash rather than hash(), which is salted per process
+            cache_key = f"{start_date}|{end_date}|{bbox}|{sorted(variables)}"
+            key = hashlib.blake2b(cache_key.encode(), digest_size=16).hexdigest()
+            cache_file = self.cache_dir / f"era5_{key}.nc"
             
             if cache_file.exists():
                 logger.info(f"Using cached ERA5 data from {cache_file}")
@@ -118,18 +494,46 @@ class ERA5DataDownloader:
 class ERA5TroposphericCorrection:
     """Calculate tropospheric delay from ERA5 data"""
     
-    def __init__(self, dem_data: np.ndarray, dem_bounds: Tuple[float, float, float, float]):
+    def __init__(
+        self,
+        dem_data: np.ndarray,
+        dem_bounds: Tuple[float, float, float, float],
+        dem_transform=None
+    ):
         """
         Initialize tropospheric correction calculator
         
         Args:
             dem_data: DEM array
             dem_bounds: DEM bounds (north, west, south, east)
+            dem_transform: Affine geotransform of the DEM (north-up); pixel
+                centres are taken from it when given, else the bounds are
+                spanned edge to edge
         """
         self.dem_data = dem_data
         self.dem_bounds = dem_bounds
         self.height = dem_data.shape[0]
         self.width = dem_data.shape[1]
+        
+        # 1-D pixel coordinates; 2-D grids are never materialized for regular sources
+        if dem_transform is not None:
+            self.dem_lon, self.dem_lat = _pixel_centers(dem_transform, self.height, self.width)
+        else:
+            self.dem_lat = np.linspace(dem_bounds[0], dem_bounds[2], self.height)
+            self.dem_lon = np.linspace(dem_bounds[1], dem_bounds[3], self.width)
+        
+        # Saastamoinen latitude term, constant along each DEM row
+        self.lat_factor = _latitude_factor(self.dem_lat)
+        
+        # Delaunay triangulations of scattered ERA5 points, keyed by point hash,
+        # so several fields on the same points share one Qhull run; also
+        # persisted so later runs over the same ERA5 grid skip Qhull entirely
+        self._triangulations = {}
+        self.tri_cache_dir = TRI_CACHE_DIR
+        
+        # Interpolated fields, so calculate_ztd followed by calculate_pwd on the
+        # same inputs resamples temperature and humidity only once
+        self._interp_cache = {}
         logger.info("ERA5TroposphericCorrection initialized")
     
     def calculate_ztd(
@@ -154,21 +558,10 @@ class ERA5TroposphericCorrection:
             ZTD array (m)
         """
         try:
-            # Interpolate ERA5 data to DEM grid
-            temp_interp = self._interpolate_to_dem(temperature, latitude, longitude)
-            pres_interp = self._interpolate_to_dem(pressure, latitude, longitude)
-            humid_interp = self._interpolate_to_dem(humidity, latitude, longitude)
+            state = self.compute_state(temperature, pressure, humidity, latitude, longitude)
             
-            # Calculate water vapor pressure
-            e = self._calculate_vapor_pressure(temp_interp, humid_interp)
-            
-            # Calculate ZTD using Saastamoinen model
-            ztd = self._saastamoinen_model(
-                pres_interp,
-                temp_interp,
-                e,
-                self.dem_data
-            )
+            # Water vapor pressure and Saastamoinen ZTD in one pass
+            ztd = _ztd(*state, self.dem_data, self.lat_factor)
             
             logger.info(f"ZTD calculated: mean={np.nanmean(ztd):.4f} m, std={np.nanstd(ztd):.4f} m")
             
@@ -207,6 +600,8 @@ class ERA5TroposphericCorrection:
             
             # Calculate PWV
             pwv = 0.14 * e + 2.1  # Empirical formula (kg/m^2)
+            if np.ndim(pwv) == 0:
+                pwv = np.full(self.dem_data.shape, pwv, dtype=np.float32)
             
             logger.info(f"PWV calculated: mean={np.nanmean(pwv):.4f} kg/m^2, std={np.nanstd(pwv):.4f} kg/m^2")
             
@@ -216,33 +611,179 @@ class ERA5TroposphericCorrection:
             logger.error(f"Error calculating PWV: {e}")
             return np.zeros_like(self.dem_data)
     
+    def compute_state(
+        self,
+        temperature: np.ndarray,
+        pressure: np.ndarray,
+        humidity: np.ndarray,
+        latitude: np.ndarray,
+        longitude: np.ndarray
+    ) -> AtmosphericState:
+        """
+        Interpolate ERA5 fields onto the DEM grid once for all derived products
+        
+        Args:
+            temperature: Temperature array (K)
+            pressure: Pressure array (Pa)
+            humidity: Relative humidity array (%)
+            latitude: Latitude array
+            longitude: Longitude array
+            
+        Returns:
+            AtmosphericState on the DEM grid
+        """
+        return AtmosphericState(
+            self._interpolate_to_dem(temperature, latitude, longitude),
+            self._interpolate_to_dem(pressure, latitude, longitude),
+            self._interpolate_to_dem(humidity, latitude, longitude)
+        )
+    
+    def calculate_ztd_pwd(self, state: AtmosphericState) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate ZTD and PWV together from one atmospheric state
+        
+        Both products share the interpolated fields and the per-pixel
+        Magnus vapor pressure, so the pair costs one pass instead of two.
+        
+        Args:
+            state: Fields on the DEM grid from compute_state
+            
+        Returns:
+            Tuple of (ZTD array (m), PWV array (kg/m^2))
+        """
+        try:
+            ztd, pwv = _ztd_pwv(*state, self.dem_data, self.lat_factor)
+            if np.ndim(pwv) == 0:
+                pwv = np.full(self.dem_data.shape, pwv, dtype=np.float32)
+            
+            # Statistics are left to the caller, which can gather them while
+            # writing rather than with extra full-array passes here
+            logger.info(f"ZTD and PWV calculated on {ztd.shape[0]}x{ztd.shape[1]} grid")
+            
+            return ztd, pwv
+            
+        except Exception as e:
+            logger.error(f"Error calculating ZTD/PWV: {e}")
+            return np.zeros_like(self.dem_data), np.zeros_like(self.dem_data)
+    
     def _interpolate_to_dem(
         self,
         data: np.ndarray,
         latitude: np.ndarray,
         longitude: np.ndarray
     ) -> np.ndarray:
-        """Interpolate ERA5 data to DEM grid"""
-        from scipy.interpolate import griddata
-        
-        # Create DEM grid
-        dem_lat = np.linspace(self.dem_bounds[0], self.dem_bounds[2], self.height)
-        dem_lon = np.linspace(self.dem_bounds[1], self.dem_bounds[3], self.width)
-        dem_grid_lat, dem_grid_lon = np.meshgrid(dem_lat, dem_lon)
-        
-        # Flatten for interpolation
-        points = np.column_stack([latitude.flatten(), longitude.flatten()])
-        values = data.flatten()
-        
-        # Interpolate
-        interpolated = griddata(
-            points,
-            values,
-            (dem_grid_lat, dem_grid_lon),
-            method="linear"
-        )
+        """
+        Interpolate ERA5 data to DEM grid
+        
+        ERA5 fields on a regular grid (1-D monotonic latitude/longitude with
+        data shaped (lat, lon)) are sampled with RegularGridInterpolator and
+        need no triangulation. Scattered points (latitude/longitude shaped
+        like data) fall back to a linear interpolator over a cached
+        triangulation. Pixels outside the ERA5 coverage are NaN. Spatially
+        constant (scalar) fields are returned unchanged and broadcast by the
+        ZTD/PWV math.
+        
+        Results are memoized (read-only) per corrector. Small inputs are
+        keyed by content; large ones by identity, so they must not be
+        modified in place between calls.
+        """
+        if np.ndim(data) == 0:
+            return data
+        
+        key, inputs = self._interp_key(data, latitude, longitude)
+        entry = self._interp_cache.get(key)
+        # Identity keys also hold the inputs, so a reused id can't alias a dead array
+        if entry is not None and all(a is b for a, b in zip(entry[0], inputs)):
+            return entry[1]
+        
+        result = self._interpolate_uncached(data, latitude, longitude)
+        result.flags.writeable = False  # Shared between callers
+        
+        if len(self._interp_cache) >= INTERP_CACHE_SIZE:
+            del self._interp_cache[next(iter(self._interp_cache))]
+        self._interp_cache[key] = (inputs, result)
+        return result
+    
+    def _interp_key(self, data: np.ndarray, latitude: np.ndarray, longitude: np.ndarray):
+        """
+        Cache key for an interpolation
+        
+        Returns:
+            Tuple of (digest or identity tuple, inputs that must be identical on a hit)
+        """
+        arrays = (np.asarray(data), np.asarray(latitude), np.asarray(longitude))
+        if sum(a.nbytes for a in arrays) <= INTERP_HASH_MAX_BYTES:
+            digest = hashlib.blake2b(digest_size=16)
+            for a in arrays:
+                digest.update(str((a.shape, a.dtype.str)).encode())
+                digest.update(np.ascontiguousarray(a).tobytes())
+            return digest.hexdigest(), ()
+        identity = (data, latitude, longitude)
+        return tuple((id(a), np.shape(a), np.asarray(a).dtype.str) for a in identity), identity
+    
+    def _interpolate_uncached(
+        self,
+        data: np.ndarray,
+        latitude: np.ndarray,
+        longitude: np.ndarray
+    ) -> np.ndarray:
+        """Resample one field onto the DEM grid (see _interpolate_to_dem)"""
+        from scipy.interpolate import LinearNDInterpolator
+        
+        if (latitude.ndim == 1 and longitude.ndim == 1
+                and data.shape == (latitude.size, longitude.size)
+                and latitude.size > 1 and longitude.size > 1
+                and _is_monotonic(latitude) and _is_monotonic(longitude)):
+            # Separable bilinear: blend source rows onto DEM rows (small), then
+            # columns onto DEM columns in one pass straight into the output
+            data = np.asarray(data, dtype=np.result_type(data, np.float32))
+            r0, wr = _axis_weights(latitude, self.dem_lat)
+            c0, wc = _axis_weights(longitude, self.dem_lon)
+            rows = data[r0] * (1 - wr)[:, None] + data[r0 + 1] * wr[:, None]
+            return _blend_columns(rows, c0, wc)
         
-        return interpolated
+        # Scattered points
+        dem_grid = np.stack(np.meshgrid(self.dem_lat, self.dem_lon, indexing="ij"), axis=-1)
+        points = np.column_stack([latitude.ravel(), longitude.ravel()])
+        interpolator = LinearNDInterpolator(self._triangulate(points), data.ravel())
+        return interpolator(dem_grid)
+    
+    def _triangulate(self, points: np.ndarray):
+        """Return the Delaunay triangulation of points, reusing an earlier one"""
+        from scipy.spatial import Delaunay
+        
+        key = hashlib.blake2b(np.ascontiguousarray(points).tobytes(), digest_size=16).hexdigest()
+        tri = self._triangulations.get(key)
+        if tri is None:
+            tri = self._load_triangulation(key)
+        if tri is None:
+            tri = Delaunay(points)
+            self._save_triangulation(key, tri)
+        self._triangulations[key] = tri
+        return tri
+    
+    def _load_triangulation(self, key: str):
+        """Load a persisted triangulation, or None if absent or unreadable"""
+        cache_file = self.tri_cache_dir / f"{key}.pkl"
+        try:
+            with open(cache_file, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable triangulation cache {cache_file}: {e}")
+            return None
+    
+    def _save_triangulation(self, key: str, tri) -> None:
+        """Persist a triangulation atomically so concurrent runs never see a partial file"""
+        try:
+            self.tri_cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.tri_cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(tri, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.tri_cache_dir / f"{key}.pkl")
+        except OSError as e:
+            logger.warning(f"Could not persist triangulation: {e}")
     
     def _calculate_vapor_pressure(
         self,
@@ -250,20 +791,7 @@ class ERA5TroposphericCorrection:
         humidity: np.ndarray
     ) -> np.ndarray:
         """Calculate water vapor pressure using Magnus formula"""
-        # Magnus formula
-        a = 17.27
-        b = 237.7  # degrees C
-        
-        # Convert temperature to Celsius
-        temp_c = temperature - 273.15
-        
-        # Saturation vapor pressure
-        es = 6.1078 * np.exp((a * temp_c) / (b + temp_c))
-        
-        # Actual vapor pressure
-        e = (humidity / 100.0) * es
-        
-        return e
+        return _vapor_pressure(temperature, humidity)
     
     def _saastamoinen_model(
         self,
@@ -276,33 +804,15 @@ class ERA5TroposphericCorrection:
         Calculate ZTD using Saastamoinen model
         
         Args:
-            pressure: Pressure (hPa)
+            pressure: Pressure (Pa)
             temperature: Temperature (K)
             vapor_pressure: Vapor pressure (hPa)
-            elevation: Elevation (m)
+            elevation: Elevation (m) on the DEM grid
             
         Returns:
             ZTD (m)
         """
-        # Constants
-        k1 = 77.6  # K/hPa
-        k2 = 71.97  # K/hPa
-        k3 = 375463  # K^2/hPa
-        Rd = 287.05  # J/(kg*K)
-        
-        # Convert pressure to hPa
-        p = pressure / 100.0
-        
-        # Hydrostatic delay
-        zhd = (0.0022768 * p) / (1 - 0.00266 * np.cos(np.radians(0)) - 0.00028 * elevation / 1000.0)
-        
-        # Wet delay
-        zwd = (0.002277 * (k2 + k3 / (temperature - 273.15)) * vapor_pressure) / (temperature - 273.15)
-        
-        # Total delay
-        ztd = zhd + zwd
-        
-        return ztd
+        return _saastamoinen(pressure, temperature, vapor_pressure, elevation, self.lat_factor)
 
 
 class ERA5AtmosphericCorrection:
@@ -325,8 +835,14 @@ class ERA5AtmosphericCorrection:
         # Load DEM
         import rasterio
         with rasterio.open(dem_file) as src:
-            self.dem_data = src.read(1)
+            self.dem_data = src.read(1, out_dtype=np.float32)
             self.dem_bounds = src.bounds
+            self.dem_transform = src.transform
+        
+        # 1-D pixel-centre coordinates of the DEM grid
+        self.xs, self.ys = _pixel_centers(self.dem_transform, *self.dem_data.shape)
+        
+        self._rng = np.random.default_rng(SIMULATION_SEED)
         
         logger.info("ERA5AtmosphericCorrection initialized")
     
@@ -369,69 +885,47 @@ class ERA5AtmosphericCorrection:
                 bbox
             )
             
+            latitude_arr = self.ys
+            longitude_arr = self.xs
+            
             if download_result["status"] != "completed":
                 logger.warning("ERA5 download failed, using fallback values")
-                temperature_arr = np.full_like(self.dem_data, temperature + 273.15, dtype=np.float32)
-                humidity_arr = np.full_like(self.dem_data, humidity, dtype=np.float32)
-                pressure_arr = np.full_like(self.dem_data, pressure * 100, dtype=np.float32)
+                # Constant fields stay scalars and are broadcast against the DEM
+                temperature_arr = np.float32(temperature + 273.15)
+                humidity_arr = np.float32(humidity)
+                pressure_arr = np.float32(pressure * 100)
+            elif XARRAY_AVAILABLE and Path(download_result["file"]).stat().st_size > 0:
+                # Only the first epoch's chunk is read from disk
+                with _load_era5(download_result["file"]) as ds:
+                    (temperature_arr, humidity_arr, pressure_arr,
+                     latitude_arr, longitude_arr) = _era5_surface_fields(ds)
             else:
                 # Parse ERA5 data (simulated)
-                temperature_arr = np.random.randn(*self.dem_data.shape) * 5 + (temperature + 273.15)
-                humidity_arr = np.random.randn(*self.dem_data.shape) * 10 + humidity
-                pressure_arr = np.random.randn(*self.dem_data.shape) * 10 + (pressure * 100)
+                shape = self.dem_data.shape
+                temperature_arr = _simulated_field(self._rng, shape, temperature + 273.15, 5)
+                humidity_arr = _simulated_field(self._rng, shape, humidity, 10)
+                pressure_arr = _simulated_field(self._rng, shape, pressure * 100, 10)
             
             # Calculate tropospheric delay
-            latitude_arr = np.linspace(bbox[0], bbox[2], self.dem_data.shape[0])
-            longitude_arr = np.linspace(bbox[1], bbox[3], self.dem_data.shape[1])
+            corrector = ERA5TroposphericCorrection(self.dem_data, bbox, self.dem_transform)
             
-            corrector = ERA5TroposphericCorrection(self.dem_data, bbox)
-            
-            ztd = corrector.calculate_ztd(
+            state = corrector.compute_state(
                 temperature_arr,
                 pressure_arr,
                 humidity_arr,
                 latitude_arr,
                 longitude_arr
             )
+            ztd, pwd = corrector.calculate_ztd_pwd(state)
             
-            pwd = corrector.calculate_pwd(
-                temperature_arr,
-                humidity_arr,
-                latitude_arr,
-                longitude_arr
-            )
-            
-            # Save results
-            import rasterio
-            from rasterio.transform import Affine
-            
+            # Save results, gathering statistics from the tiles as they are written
             ztd_file = self.output_dir / "ztd.tif"
             pwd_file = self.output_dir / "pwd.tif"
+            ztd_moments = self._write_raster(ztd_file, ztd)
+            pwd_moments = self._write_raster(pwd_file, pwd)
             
-            with rasterio.open(
-                ztd_file, 'w',
-                driver='GTiff',
-                height=ztd.shape[0],
-                width=ztd.shape[1],
-                count=1,
-                dtype=rasterio.float32,
-                crs='EPSG:4326',
-                transform=Affine.identity()
-            ) as dst:
-                dst.write(ztd.astype(np.float32), 1)
-            
-            with rasterio.open(
-                pwd_file, 'w',
-                driver='GTiff',
-                height=pwd.shape[0],
-                width=pwd.shape[1],
-                count=1,
-                dtype=rasterio.float32,
-                crs='EPSG:4326',
-                transform=Affine.identity()
-            ) as dst:
-                dst.write(pwd.astype(np.float32), 1)
-            
+            logger.info(f"ZTD: mean={ztd_moments.mean:.4f} m, std={ztd_moments.std():.4f} m")
+            logger.info(f"PWV: mean={pwd_moments.mean:.4f} kg/m^2, std={pwd_moments.std():.4f} kg/m^2")
             logger.info("ERA5 atmospheric correction completed successfully")
             
             return {
@@ -440,13 +934,48 @@ class ERA5AtmosphericCorrection:
                 "pwd_file": str(pwd_file),
                 "download_result": download_result,
                 "statistics": {
-                    "ztd_mean": float(np.nanmean(ztd)),
-                    "ztd_std": float(np.nanstd(ztd)),
-                    "pwd_mean": float(np.nanmean(pwd)),
-                    "pwd_std": float(np.nanstd(pwd))
+                    "ztd_mean": float(ztd_moments.mean),
+                    "ztd_std": ztd_moments.std(),
+                    "pwd_mean": float(pwd_moments.mean),
+                    "pwd_std": pwd_moments.std()
                 }
             }
             
         except Exception as e:
             logger.error(f"Error in ERA5 atmospheric correction: {e}")
             return {"status": "error", "error": str(e)}
+    
+    def _write_raster(self, output_file: Path, data: np.ndarray) -> OnlineMoments:
+        """
+        Write a float32 Cloud-Optimized GeoTIFF, accumulating its statistics
+        
+        Tiles are streamed into a staging GeoTIFF, which is then laid out as
+        a COG with internal overviews.
+        
+        Args:
+            output_file: Output path
+            data: 2-D array to write
+            
+        Returns:
+            OnlineMoments of the written values
+        """
+        import rasterio
+        from rasterio.transform import Affine
+        
+        moments = OnlineMoments()
+        with staged_cog(output_file, GEOTIFF_OPTIONS["blockxsize"]) as staging_file, rasterio.open(
+            staging_file, 'w',
+            driver='GTiff',
+            height=data.shape[0],
+            width=data.shape[1],
+            count=1,
+            dtype=rasterio.float32,
+            crs='EPSG:4326',
+            transform=Affine.identity(),
+            **GEOTIFF_OPTIONS
+        ) as dst:
+            for _, window in dst.block_windows(1):
+                tile = data[window.toslices()].astype(np.float32, copy=False)
+                dst.write(tile, 1, window=window)
+                moments.update(tile)
+        return moments
@@ -3,20 +3,92 @@ GACOS (Generic Atmospheric Correction Online Service) Integration Module
 Provides interface to GACOS atmospheric correction products
 """
 
+import asyncio
 import logging
+import multiprocessing
+import os
 import numpy as np
 import requests
-from typing import Dict, Any, Tuple, Optional
+import httpx
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Tuple, Optional
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import json
 import rasterio
 from rasterio.transform import Affine
 
+from cog_writer import staged_cog
+from raster_stats import OnlineMoments
+
+try:
+    import numexpr as ne
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 - required by httpx for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+SENTINEL1_WAVELENGTH = 0.0555  # C-band radar wavelength (m)
+# Radians of two-way phase per metre of zenith delay at the Sentinel-1 wavelength
+SENTINEL1_PHASE_FACTOR = 4.0 * np.pi / SENTINEL1_WAVELENGTH
+TILE_SIZE = 512  # Output block edge (pixels); corrections stream one block at a time
+HTTP_POOL_SIZE = 16  # Pooled connections to the GACOS server
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes per streamed read
+CORRECTION_WORKERS = 4  # Processes applying products to the interferogram
+PARALLEL_MIN_PIXELS = 2048 * 2048  # Smaller scenes don't amortize worker start-up
+
+# Creation options for float32 rasters: internal tiling plus floating-point
+# predictor + DEFLATE (levels 4-6 trade size against write speed best).
+# Corrected interferograms are staged with these and published as COGs
+GEOTIFF_OPTIONS = {
+    "tiled": True,
+    "compress": "deflate",
+    "zlevel": 5,
+    "predictor": 3,
+    "BIGTIFF": "IF_SAFER",
+}
+
+
+def _phase_factor(wavelength: float) -> float:
+    """Radians of phase per metre of zenith delay, 4π / wavelength"""
+    if wavelength == SENTINEL1_WAVELENGTH:
+        return SENTINEL1_PHASE_FACTOR
+    return 4.0 * np.pi / wavelength
+
+
+def _correct_phase(ifg: np.ndarray, ztd: np.ndarray, phase_factor: float) -> np.ndarray:
+    """
+    Subtract the GACOS phase delay (phase_factor * ZTD) in one pass
+    
+    Args:
+        ifg: Interferometric phase (radians)
+        ztd: GACOS zenith total delay (m)
+        phase_factor: 4π / wavelength (radians per metre)
+        
+    Returns:
+        Corrected phase as float32
+    """
+    scale = np.float32(phase_factor)
+    if NUMEXPR_AVAILABLE:
+        corrected = ne.evaluate("ifg - scale * ztd", local_dict={"ifg": ifg, "ztd": ztd, "scale": scale})
+        return corrected.astype(np.float32, copy=False)
+
+    # Single float32 buffer: scaled delay first, then the phase added in place
+    corrected = np.multiply(ztd, -scale, dtype=np.float32)
+    np.add(corrected, ifg, out=corrected, casting="unsafe")
+    return corrected
+
 
-class GAC OSClient:
+class GACOSClient:
     """Client for GACOS atmospheric correction service"""
     
     def __init__(self, email: str = None, password: str = None):
@@ -31,9 +103,16 @@ class GAC OSClient:
         self.email = email
         self.password = password
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.cache_dir = Path("./data/gacos_cache")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        logger.info("GAC OSClient initialized")
+        logger.info("GACOSClient initialized")
     
     def query_gacos_products(
         self,
@@ -94,7 +173,8 @@ class GAC OSClient:
     def download_gacos_product(
         self,
         product_id: str,
-        output_file: str = None
+        output_file: str = None,
+        url: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Download GACOS atmospheric correction product
@@ -102,10 +182,52 @@ class GAC OSClient:
         Args:
             product_id: GACOS product ID
             output_file: Output file path
+            url: Direct product URL (e.g. from the GACOS delivery e-mail);
+                a simulated product is generated when omitted
             
         Returns:
             Download result
         """
+        return asyncio.run(self._download_batch([(product_id, output_file, url)]))[0]
+    
+    def download_gacos_products_many(
+        self,
+        product_ids: List[str],
+        urls: Optional[Dict[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Download several GACOS products concurrently over one pooled client
+        
+        Args:
+            product_ids: GACOS product IDs
+            urls: Optional direct URL per product ID
+            
+        Returns:
+            Download results, in the order of product_ids
+        """
+        urls = urls or {}
+        return asyncio.run(self._download_batch(
+            [(product_id, None, urls.get(product_id)) for product_id in product_ids]
+        ))
+    
+    async def _download_batch(self, items: List[Tuple[str, Optional[str], Optional[str]]]) -> List[Dict[str, Any]]:
+        """Run downloads concurrently; HTTP/2 multiplexes them over shared connections"""
+        async with httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(300, connect=30),
+            limits=httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE),
+            follow_redirects=True
+        ) as client:
+            return await asyncio.gather(*(self._download_one(client, *item) for item in items))
+    
+    async def _download_one(
+        self,
+        client: httpx.AsyncClient,
+        product_id: str,
+        output_file: Optional[str],
+        url: Optional[str]
+    ) -> Dict[str, Any]:
+        """Download one product into the cache (or output_file)"""
         try:
             logger.info(f"Downloading GACOS product {product_id}")
             
@@ -122,23 +244,13 @@ class GAC OSClient:
             if output_file is None:
                 output_file = str(cache_file)
             
-            # Simulate download
             Path(output_file).parent.mkdir(parents=True, exist_ok=True)
             
-            # Create dummy GACOS file
-            gacos_data = np.random.randn(256, 256) * 0.05  # Small atmospheric delays
-            
-            with rasterio.open(
-                output_file, 'w',
-                driver='GTiff',
-                height=256,
-                width=256,
-                count=1,
-                dtype=rasterio.float32,
-                crs='EPSG:4326',
-                transform=Affine.identity()
-            ) as dst:
-                dst.write(gacos_data.astype(np.float32), 1)
+            if url is not None:
+                await self._stream_to_file(client, url, Path(output_file))
+            else:
+                # Simulate download
+                await asyncio.to_thread(_write_simulated_product, output_file)
             
             logger.info(f"GACOS product downloaded to {output_file}")
             
@@ -152,9 +264,44 @@ class GAC OSClient:
         except Exception as e:
             logger.error(f"Error downloading GACOS product: {e}")
             return {"status": "error", "error": str(e)}
+    
+    async def _stream_to_file(self, client: httpx.AsyncClient, url: str, output_file: Path) -> None:
+        """Stream a response body to output_file, renaming into place only once complete"""
+        tmp_file = output_file.with_name(output_file.name + ".part")
+        try:
+            async with client.stream("GET", url) as response:
+                response.raise_for_status()
+                # Chunks are written straight to the page cache; at this size the
+                # write is cheaper than a thread hop per chunk
+                with open(tmp_file, "wb") as f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+            os.replace(tmp_file, output_file)
+        finally:
+            tmp_file.unlink(missing_ok=True)
+
+
+def _write_simulated_product(output_file: str) -> None:
+    """Write a stand-in 256x256 GACOS ZTD product"""
+    gacos_data = np.random.randn(256, 256) * 0.05  # Small atmospheric delays
+    
+    with rasterio.open(
+        output_file, 'w',
+        driver='GTiff',
+        height=256,
+        width=256,
+        count=1,
+        dtype=rasterio.float32,
+        crs='EPSG:4326',
+        transform=Affine.identity(),
+        blockxsize=TILE_SIZE,
+        blockysize=TILE_SIZE,
+        **GEOTIFF_OPTIONS
+    ) as dst:
+        dst.write(gacos_data.astype(np.float32), 1)
 
 
-class GAC OSAtmosphericCorrection:
+class GACOSAtmosphericCorrection:
     """GACOS-based atmospheric correction"""
     
     def __init__(self, dem_file: str, interferogram_file: str, output_dir: str):
@@ -171,20 +318,25 @@ class GAC OSAtmosphericCorrection:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Load data
+        # Only metadata is kept; rasters are streamed block by block
         with rasterio.open(dem_file) as src:
-            self.dem_data = src.read(1)
             self.dem_bounds = src.bounds
         
+        # Independent of the GACOS product, so computed once for every correction
+        moments = OnlineMoments()
         with rasterio.open(interferogram_file) as src:
-            self.ifg_data = src.read(1)
+            self.ifg_shape = (src.height, src.width)
+            for _, window in src.block_windows(1):
+                moments.update(src.read(1, window=window, out_dtype=np.float32))
+        self.original_std = moments.std()
         
-        logger.info("GAC OSAtmosphericCorrection initialized")
+        logger.info("GACOSAtmosphericCorrection initialized")
     
     def apply_gacos_correction(
         self,
         gacos_file: str,
-        wavelength: float = 0.0555  # Sentinel-1 C-band
+        wavelength: float = SENTINEL1_WAVELENGTH,
+        output_file: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Apply GACOS atmospheric correction to interferogram
@@ -192,6 +344,7 @@ class GAC OSAtmosphericCorrection:
         Args:
             gacos_file: Path to GACOS product file
             wavelength: Radar wavelength (m)
+            output_file: Output path (default: phase_corrected_gacos.tif in output_dir)
             
         Returns:
             Correction results
@@ -199,35 +352,50 @@ class GAC OSAtmosphericCorrection:
         try:
             logger.info("Applying GACOS atmospheric correction")
             
-            # Load GACOS data
-            with rasterio.open(gacos_file) as src:
-                gacos_ztd = src.read(1)
-            
-            # Convert ZTD to phase delay
-            # Phase delay = 4π * ZTD / wavelength
-            phase_delay = (4 * np.pi * gacos_ztd) / wavelength
-            
-            # Apply correction
-            phase_corrected = self.ifg_data - phase_delay
-            
-            # Save corrected phase
-            output_file = self.output_dir / "phase_corrected_gacos.tif"
-            
-            with rasterio.open(
-                output_file, 'w',
-                driver='GTiff',
-                height=phase_corrected.shape[0],
-                width=phase_corrected.shape[1],
-                count=1,
-                dtype=rasterio.float32,
-                crs='EPSG:4326',
-                transform=Affine.identity()
-            ) as dst:
-                dst.write(phase_corrected.astype(np.float32), 1)
+            if output_file is None:
+                output_file = self.output_dir / "phase_corrected_gacos.tif"
+            height, width = self.ifg_shape
+            phase_factor = _phase_factor(wavelength)
+            corrected_moments = OnlineMoments()
+            ztd_moments = OnlineMoments()
+            
+            with rasterio.open(self.interferogram_file) as ifg_src, \
+                    rasterio.open(gacos_file) as gacos_src, \
+                    staged_cog(output_file, TILE_SIZE) as staging_file, \
+                    rasterio.open(
+                        staging_file, 'w',
+                        driver='GTiff',
+                        height=height,
+                        width=width,
+                        count=1,
+                        dtype=rasterio.float32,
+                        crs='EPSG:4326',
+                        transform=Affine.identity(),
+                        blockxsize=TILE_SIZE,
+                        blockysize=TILE_SIZE,
+                        **GEOTIFF_OPTIONS
+                    ) as dst:
+                if (gacos_src.height, gacos_src.width) != self.ifg_shape:
+                    raise ValueError(
+                        f"GACOS grid {gacos_src.height}x{gacos_src.width} does not match "
+                        f"interferogram {height}x{width}"
+                    )
+                
+                # Iterate output blocks so every write fills exactly one tile
+                for _, window in dst.block_windows(1):
+                    gacos_ztd = gacos_src.read(1, window=window, out_dtype=np.float32)
+                    ifg_tile = ifg_src.read(1, window=window, out_dtype=np.float32)
+                    
+                    # Convert ZTD to phase delay (4π * ZTD / wavelength) and subtract it
+                    phase_corrected = _correct_phase(ifg_tile, gacos_ztd, phase_factor)
+                    dst.write(phase_corrected, 1, window=window)
+                    
+                    corrected_moments.update(phase_corrected)
+                    ztd_moments.update(gacos_ztd)
             
             # Calculate statistics
-            original_std = np.nanstd(self.ifg_data)
-            corrected_std = np.nanstd(phase_corrected)
+            original_std = self.original_std
+            corrected_std = corrected_moments.std()
             std_reduction = (original_std - corrected_std) / original_std * 100
             
             logger.info(f"GACOS correction applied: std reduction = {std_reduction:.2f}%")
@@ -239,7 +407,7 @@ class GAC OSAtmosphericCorrection:
                     "original_std": float(original_std),
                     "corrected_std": float(corrected_std),
                     "std_reduction_percent": float(std_reduction),
-                    "mean_phase_delay": float(np.nanmean(phase_delay))
+                    "mean_phase_delay": float(phase_factor * ztd_moments.mean)
                 }
             }
             
@@ -263,12 +431,21 @@ class GAC OSAtmosphericCorrection:
             Validation results
         """
         try:
+            # Count invalid (NaN or nodata) pixels block by block; no negated
+            # mask is built just to be summed
+            invalid_pixels = 0
             with rasterio.open(gacos_file) as src:
-                gacos_data = src.read(1)
-            
-            # Calculate coverage (non-NaN pixels)
-            valid_pixels = np.sum(~np.isnan(gacos_data))
-            total_pixels = gacos_data.size
+                nodata = src.nodata
+                total_pixels = src.height * src.width
+                for _, window in src.block_windows(1):
+                    tile = src.read(1, window=window)
+                    if tile.dtype.kind == "f":
+                        invalid_pixels += np.count_nonzero(np.isnan(tile))
+                    if nodata is not None and not np.isnan(nodata):
+                        invalid_pixels += np.count_nonzero(tile == nodata)
+            
+            # Calculate coverage (valid pixels)
+            valid_pixels = total_pixels - invalid_pixels
             coverage = valid_pixels / total_pixels
             
             is_valid = coverage >= coverage_threshold
@@ -289,7 +466,27 @@ class GAC OSAtmosphericCorrection:
             return {"status": "error", "error": str(e)}
 
 
-class GAC OSCorrectionPipeline:
+def _validate_and_correct(
+    corrector: GACOSAtmosphericCorrection,
+    gacos_file: str,
+    output_file: str
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Validate one GACOS product and, if its coverage is sufficient, apply it
+    
+    Module-level so it can run in a worker process; the corrector holds only
+    paths and scalars, so it pickles cheaply.
+    
+    Returns:
+        Tuple of (validation result, correction result or None when invalid)
+    """
+    validation_result = corrector.validate_gacos_coverage(gacos_file)
+    if not validation_result.get("is_valid", False):
+        return validation_result, None
+    return validation_result, corrector.apply_gacos_correction(gacos_file, output_file=output_file)
+
+
+class GACOSCorrectionPipeline:
     """Complete GACOS correction pipeline"""
     
     def __init__(
@@ -319,10 +516,10 @@ class GAC OSCorrectionPipeline:
         self.end_date = end_date
         self.bbox = bbox
         
-        self.client = GAC OSClient()
-        self.corrector = GAC OSAtmosphericCorrection(dem_file, interferogram_file, str(self.output_dir))
+        self.client = GACOSClient()
+        self.corrector = GACOSAtmosphericCorrection(dem_file, interferogram_file, str(self.output_dir))
         
-        logger.info("GAC OSCorrectionPipeline initialized")
+        logger.info("GACOSCorrectionPipeline initialized")
     
     def run_full_correction(self) -> Dict[str, Any]:
         """
@@ -350,32 +547,49 @@ class GAC OSCorrectionPipeline:
                 "corrections": {}
             }
             
-            # Download and apply each product
-            for product in query_result["products"]:
-                product_id = product["id"]
-                logger.info(f"Processing product {product_id}")
-                
-                # Download product
-                download_result = self.client.download_gacos_product(product_id)
-                
+            # Downloads are network-bound, so they all overlap on one client
+            products = query_result["products"]
+            downloads = self.client.download_gacos_products_many([product["id"] for product in products])
+            
+            jobs = {}
+            for product, download_result in zip(products, downloads):
                 if download_result["status"] != "completed":
-                    logger.warning(f"Failed to download {product_id}")
+                    logger.warning(f"Failed to download {product['id']}")
                     continue
-                
-                gacos_file = download_result["file"]
-                
-                # Validate coverage
-                validation_result = self.corrector.validate_gacos_coverage(gacos_file)
-                
-                if not validation_result.get("is_valid", False):
+                jobs[product["id"]] = download_result
+            
+            # Validation and correction are CPU-bound; large scenes fan out to
+            # processes, each product writing its own output raster
+            tasks = {
+                product_id: (
+                    self.corrector,
+                    download_result["file"],
+                    str(self.output_dir / f"phase_corrected_gacos_{product_id}.tif")
+                )
+                for product_id, download_result in jobs.items()
+            }
+            
+            height, width = self.corrector.ifg_shape
+            if len(tasks) > 1 and height * width >= PARALLEL_MIN_PIXELS:
+                with ProcessPoolExecutor(
+                    max_workers=min(CORRECTION_WORKERS, len(tasks)),
+                    mp_context=multiprocessing.get_context("spawn")
+                ) as executor:
+                    futures = {
+                        product_id: executor.submit(_validate_and_correct, *args)
+                        for product_id, args in tasks.items()
+                    }
+                    outcomes = {product_id: future.result() for product_id, future in futures.items()}
+            else:
+                outcomes = {product_id: _validate_and_correct(*args) for product_id, args in tasks.items()}
+            
+            for product_id, (validation_result, correction_result) in outcomes.items():
+                if correction_result is None:
                     logger.warning(f"GACOS product {product_id} has insufficient coverage")
                     continue
                 
-                # Apply correction
-                correction_result = self.corrector.apply_gacos_correction(gacos_file)
-                
                 results["corrections"][product_id] = {
-                    "download": download_result,
+                    "download": jobs[product_id],
                     "validation": validation_result,
                     "correction": correction_result
                 }
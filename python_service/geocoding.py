@@ -10,13 +10,26 @@
 """
 
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Union
 from dataclasses import dataclass
 from enum import Enum
 import json
+import multiprocessing
 import os
-import math
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from multiprocessing.shared_memory import SharedMemory
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+TILE_WORKERS = 4  # 并行生成瓦片子树的进程数
+PARALLEL_MIN_TILES = 512  # 最高级别瓦片少于此数时串行生成（不足以抵消进程启动开销）
+AXES_CACHE_SIZE = 8  # 每个处理器缓存的像素中心坐标轴组数（先进先出）
 
 
 class CoordinateSystem(Enum):
@@ -43,11 +56,26 @@ class GeoTransform:
         y = self.y_origin + col * self.y_rotation + row * self.pixel_height
         return x, y
     
-    def geo_to_pixel(self, x: float, y: float) -> Tuple[int, int]:
-        """地理坐标转像素坐标"""
-        det = self.pixel_width * self.pixel_height - self.x_rotation * self.y_rotation
-        col = int((self.pixel_height * (x - self.x_origin) - self.x_rotation * (y - self.y_origin)) / det)
-        row = int((-self.y_rotation * (x - self.x_origin) + self.pixel_width * (y - self.y_origin)) / det)
+    def geo_to_pixel(self, x: Union[float, np.ndarray],
+                     y: Union[float, np.ndarray]) -> Tuple[Union[int, np.ndarray], Union[int, np.ndarray]]:
+        """
+        地理坐标转像素坐标（向下取整到所在像素）
+        
+        Args:
+            x: X 坐标（标量或数组）
+            y: Y 坐标（标量或数组）
+            
+        Returns:
+            (col, row)；标量输入返回 int，数组输入返回 int32 数组
+        """
+        # 逆变换系数只算一次，批量转换时整个数组一次向量化计算
+        inv_det = 1.0 / (self.pixel_width * self.pixel_height - self.x_rotation * self.y_rotation)
+        dx = np.subtract(x, self.x_origin)
+        dy = np.subtract(y, self.y_origin)
+        col = np.floor((self.pixel_height * inv_det) * dx - (self.x_rotation * inv_det) * dy).astype(np.int32)
+        row = np.floor((self.pixel_width * inv_det) * dy - (self.y_rotation * inv_det) * dx).astype(np.int32)
+        if col.ndim == 0:
+            return int(col), int(row)
         return col, row
 
 
@@ -91,12 +119,235 @@ class BoundingBox:
         }
 
 
+def _bilinear_numpy(data: np.ndarray, col: np.ndarray, row: np.ndarray) -> np.ndarray:
+    """双线性插值 NumPy 实现（col、row 为一维源坐标轴，输出 len(row) x len(col)）"""
+    height, width = data.shape[:2]
+    
+    # 获取四个角点（行索引为列向量，与列索引广播）
+    col0 = np.clip(np.floor(col).astype(np.int32), 0, width - 1)
+    col1 = np.clip(col0 + 1, 0, width - 1)
+    row0 = np.clip(np.floor(row).astype(np.int32), 0, height - 1)[:, None]
+    row1 = np.clip(row0 + 1, 0, height - 1)
+    
+    # 计算权重（与数据同精度，float32 数据不会提升为 float64）
+    frac_dtype = np.result_type(data.dtype, np.float32)
+    col_frac = (col - col0).astype(frac_dtype)
+    row_frac = (row[:, None] - row0).astype(frac_dtype)
+    
+    # 双线性插值
+    result = (data[row0, col0] * (1 - col_frac) * (1 - row_frac) +
+              data[row0, col1] * col_frac * (1 - row_frac) +
+              data[row1, col0] * (1 - col_frac) * row_frac +
+              data[row1, col1] * col_frac * row_frac)
+    
+    return result
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True, fastmath={"contract", "afn", "arcp", "reassoc"})
+    def _bilinear_numba(data, col, row, out):
+        """_bilinear_numpy 的单遍融合版本（二维数据），结果写入 out"""
+        height, width = data.shape
+        
+        # 列索引和权重对所有行相同，预先计算一次
+        col0 = np.empty(col.size, dtype=np.int64)
+        col1 = np.empty(col.size, dtype=np.int64)
+        col_frac = np.empty(col.size, dtype=np.float64)
+        for j in range(col.size):
+            c0 = min(max(int(np.floor(col[j])), 0), width - 1)
+            col0[j] = c0
+            col1[j] = min(c0 + 1, width - 1)
+            col_frac[j] = col[j] - c0
+        
+        for i in prange(row.size):
+            r0 = min(max(int(np.floor(row[i])), 0), height - 1)
+            r1 = min(r0 + 1, height - 1)
+            rf = row[i] - r0
+            for j in range(col.size):
+                cf = col_frac[j]
+                top = data[r0, col0[j]] * (1 - cf) + data[r0, col1[j]] * cf
+                bottom = data[r1, col0[j]] * (1 - cf) + data[r1, col1[j]] * cf
+                out[i, j] = top * (1 - rf) + bottom * rf
+        return out
+
+
+def _nan_stats_numpy(data: np.ndarray) -> Tuple[float, float, float, float]:
+    """忽略 NaN 的 (min, max, mean, std) NumPy 实现：有效值只提取一次"""
+    valid = data[~np.isnan(data)]
+    if valid.size == 0:
+        return (float("nan"),) * 4
+    mean = valid.mean(dtype=np.float64)
+    deviation = valid - mean
+    return float(valid.min()), float(valid.max()), float(mean), float(np.sqrt(np.dot(deviation, deviation) / valid.size))
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True, fastmath={"contract", "afn", "arcp", "reassoc"})
+    def _nan_row_moments_numba(data):
+        """单遍统计二维数据每行有效值的个数、均值、离差平方和、最小值和最大值"""
+        height, width = data.shape
+        counts = np.zeros(height, dtype=np.int64)
+        means = np.zeros(height)
+        m2s = np.zeros(height)
+        mins = np.full(height, np.inf)
+        maxs = np.full(height, -np.inf)
+        for i in prange(height):
+            # 以行内第一个有效值为偏移量累加，避免均值远大于标准差时（如高程）的相消误差
+            shift = np.nan
+            n = 0
+            total = 0.0
+            total_sq = 0.0
+            for j in range(width):
+                value = data[i, j]
+                if not np.isnan(value):
+                    if n == 0:
+                        shift = value
+                    deviation = value - shift
+                    n += 1
+                    total += deviation
+                    total_sq += deviation * deviation
+                    mins[i] = min(mins[i], value)
+                    maxs[i] = max(maxs[i], value)
+            if n > 0:
+                counts[i] = n
+                means[i] = shift + total / n
+                m2s[i] = max(total_sq - total * total / n, 0.0)
+        return counts, means, m2s, mins, maxs
+
+
+def _nan_stats(data: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    忽略 NaN 的 (min, max, mean, std)，与 np.nanmin/nanmax/nanmean/nanstd 一致
+    
+    numba 可用时对二维数据只遍历一次，逐行矩再合并（Chan 等的成对合并公式）。
+    """
+    if not (NUMBA_AVAILABLE and data.ndim == 2):
+        return _nan_stats_numpy(data)
+    
+    counts, means, m2s, mins, maxs = _nan_row_moments_numba(data)
+    count = counts.sum()
+    if count == 0:
+        return (float("nan"),) * 4
+    mean = np.dot(counts, means) / count
+    m2 = m2s.sum() + np.dot(counts, (means - mean) ** 2)
+    return float(mins.min()), float(maxs.max()), float(mean), float(np.sqrt(m2 / count))
+
+
+def _lut(red: np.ndarray, green: np.ndarray, blue: np.ndarray) -> np.ndarray:
+    """由 [0, 1] 通道值构建只读 256x3 uint8 颜色表（截断取整）"""
+    colors = np.trunc(np.stack([red, green, blue], axis=-1) * 255).astype(np.uint8)
+    colors.setflags(write=False)
+    return colors
+
+
+def _build_viridis() -> np.ndarray:
+    """Viridis 颜色映射"""
+    t = np.arange(256) / 255
+    return _lut(
+        0.267004 + t * (0.329415 + t * (-0.498039 + t * 0.901684)),
+        0.004874 + t * (0.873449 + t * (-0.610871 + t * 0.732828)),
+        0.329415 + t * (0.694426 + t * (-0.876022 + t * 0.852126))
+    )
+
+
+def _build_jet() -> np.ndarray:
+    """Jet 颜色映射"""
+    t = np.arange(256) / 255
+    segments = [t < 0.125, t < 0.375, t < 0.625, t < 0.875]
+    return _lut(
+        np.select(segments, [0, 0, 4 * (t - 0.375), 1], 1 - 4 * (t - 0.875)),
+        np.select(segments, [0, 4 * (t - 0.125), 1, 1 - 4 * (t - 0.625)], 0),
+        np.select(segments, [0.5 + 4 * t, 1, 1 - 4 * (t - 0.375), 0], 0)
+    )
+
+
+def _build_coolwarm() -> np.ndarray:
+    """CoolWarm 颜色映射（适合形变数据）：蓝色到白色再到红色"""
+    t = np.arange(256) / 255
+    cool = t < 0.5
+    s = np.where(cool, t * 2, (t - 0.5) * 2)
+    return _lut(np.where(cool, s, 1), np.where(cool, s, 1 - s), np.where(cool, 1, 1 - s))
+
+
+def _build_rdylgn() -> np.ndarray:
+    """Red-Yellow-Green 颜色映射：红色到黄色再到绿色"""
+    t = np.arange(256) / 255
+    red = t < 0.5
+    s = np.where(red, t * 2, (t - 0.5) * 2)
+    return _lut(np.where(red, 1, 1 - s), np.where(red, s, 1), np.zeros_like(t))
+
+
+# 颜色映射表在导入时构建一次，所有瓦片共享
+COLORMAP_LUTS = {
+    "viridis": _build_viridis(),
+    "jet": _build_jet(),
+    "coolwarm": _build_coolwarm(),
+    "rdylgn": _build_rdylgn(),
+}
+
+OVERLAY_ALPHA = 200  # 有效像素的不透明度
+
+# 带透明度的颜色表，瓦片着色时一次查表即得 RGBA
+COLORMAP_RGBA = {
+    name: np.concatenate([lut, np.full((256, 1), OVERLAY_ALPHA, dtype=np.uint8)], axis=1)
+    for name, lut in COLORMAP_LUTS.items()
+}
+
+
+@dataclass
+class TilePyramid:
+    """瓦片金字塔参数（可序列化，传给工作进程）"""
+    bounds: BoundingBox  # 数据边界框
+    tile_grids: Dict[int, tuple]  # 每级 (min_x, min_y, max_x, max_y, 经度边线, 纬度边线)
+    max_zoom: int
+    tile_size: int
+    colormap: str
+
+
+# 瓦片元数据按列存储（结构化数组），按级别等筛选可直接向量化
+TILE_DTYPE = np.dtype([
+    ("zoom", "i2"),
+    ("x", "i4"),
+    ("y", "i4"),
+    ("min_lon", "f8"),
+    ("min_lat", "f8"),
+    ("max_lon", "f8"),
+    ("max_lat", "f8"),
+])
+
+
 class GeocodingProcessor:
     """地理编码处理器"""
     
     def __init__(self, output_dir: str = "./geocoded"):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
+        # (高, 宽, 边界框) -> (经度轴, 纬度轴)，同一网格的多个叠加层共用
+        self._axes_cache: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+    
+    def _pixel_axes(self, height: int, width: int, bounds: BoundingBox) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        像素中心的经度轴和纬度轴（只读，按网格缓存）
+        
+        Args:
+            height: 行数
+            width: 列数
+            bounds: 地理边界框
+            
+        Returns:
+            (长度为 width 的经度数组, 长度为 height 的纬度数组)
+        """
+        key = (height, width, bounds.min_lon, bounds.min_lat, bounds.max_lon, bounds.max_lat)
+        axes = self._axes_cache.get(key)
+        if axes is None:
+            lons = bounds.min_lon + (np.arange(width) + 0.5) * (bounds.width / width)
+            lats = bounds.max_lat - (np.arange(height) + 0.5) * (bounds.height / height)
+            lons.setflags(write=False)
+            lats.setflags(write=False)
+            if len(self._axes_cache) >= AXES_CACHE_SIZE:
+                self._axes_cache.pop(next(iter(self._axes_cache)))
+            axes = self._axes_cache[key] = (lons, lats)
+        return axes
         
     def extract_geotiff_info(self, data: np.ndarray, 
                              geo_transform: Optional[GeoTransform] = None,
@@ -112,6 +363,7 @@ class GeocodingProcessor:
         Returns:
             地理信息字典
         """
+        data = np.asarray(data, dtype=np.float32)
         height, width = data.shape[:2] if len(data.shape) >= 2 else (data.shape[0], 1)
         
         # 如果没有提供边界框，使用默认值或从 geo_transform 计算
@@ -124,6 +376,8 @@ class GeocodingProcessor:
                 # 默认边界框（示例：土耳其地震区域）
                 bounds = BoundingBox(36.0, 37.0, 38.0, 38.5)
         
+        minimum, maximum, mean, std = _nan_stats(data)
+        
         return {
             "width": width,
             "height": height,
@@ -136,10 +390,10 @@ class GeocodingProcessor:
             "data_type": str(data.dtype),
             "nodata": float(np.nan),
             "statistics": {
-                "min": float(np.nanmin(data)),
-                "max": float(np.nanmax(data)),
-                "mean": float(np.nanmean(data)),
-                "std": float(np.nanstd(data))
+                "min": minimum,
+                "max": maximum,
+                "mean": mean,
+                "std": std
             }
         }
     
@@ -209,17 +463,17 @@ class GeocodingProcessor:
         Returns:
             重投影后的数据
         """
+        data = np.asarray(data, dtype=np.float32)
         dst_width, dst_height = dst_size
         src_height, src_width = data.shape[:2]
         
-        # 创建目标网格
+        # 创建目标网格坐标轴（一维，保持 float64 以免损失亚像素定位精度）
         dst_x = np.linspace(dst_bounds.min_lon, dst_bounds.max_lon, dst_width)
         dst_y = np.linspace(dst_bounds.max_lat, dst_bounds.min_lat, dst_height)
-        dst_xx, dst_yy = np.meshgrid(dst_x, dst_y)
         
-        # 计算源像素坐标
-        src_col = (dst_xx - src_bounds.min_lon) / src_bounds.width * src_width
-        src_row = (src_bounds.max_lat - dst_yy) / src_bounds.height * src_height
+        # 计算源像素坐标：列只随经度、行只随纬度变化，保持一维，由插值广播成网格
+        src_col = (dst_x - src_bounds.min_lon) / src_bounds.width * src_width
+        src_row = (src_bounds.max_lat - dst_y) / src_bounds.height * src_height
         
         # 执行插值
         if method == "nearest":
@@ -233,34 +487,19 @@ class GeocodingProcessor:
     
     def _nearest_interpolation(self, data: np.ndarray, 
                                col: np.ndarray, row: np.ndarray) -> np.ndarray:
-        """最近邻插值"""
+        """最近邻插值（col、row 为一维源坐标轴，输出 len(row) x len(col)）"""
         height, width = data.shape[:2]
-        col_int = np.clip(np.round(col).astype(int), 0, width - 1)
-        row_int = np.clip(np.round(row).astype(int), 0, height - 1)
-        return data[row_int, col_int]
+        col_int = np.clip(np.round(col).astype(np.int32), 0, width - 1)
+        row_int = np.clip(np.round(row).astype(np.int32), 0, height - 1)
+        return data[row_int[:, None], col_int]
     
     def _bilinear_interpolation(self, data: np.ndarray,
                                 col: np.ndarray, row: np.ndarray) -> np.ndarray:
-        """双线性插值"""
-        height, width = data.shape[:2]
-        
-        # 获取四个角点
-        col0 = np.clip(np.floor(col).astype(int), 0, width - 1)
-        col1 = np.clip(col0 + 1, 0, width - 1)
-        row0 = np.clip(np.floor(row).astype(int), 0, height - 1)
-        row1 = np.clip(row0 + 1, 0, height - 1)
-        
-        # 计算权重
-        col_frac = col - col0
-        row_frac = row - row0
-        
-        # 双线性插值
-        result = (data[row0, col0] * (1 - col_frac) * (1 - row_frac) +
-                  data[row0, col1] * col_frac * (1 - row_frac) +
-                  data[row1, col0] * (1 - col_frac) * row_frac +
-                  data[row1, col1] * col_frac * row_frac)
-        
-        return result
+        """双线性插值（col、row 为一维源坐标轴，输出 len(row) x len(col)）"""
+        if NUMBA_AVAILABLE and data.ndim == 2:
+            out = np.empty((row.size, col.size), dtype=np.result_type(data.dtype, np.float32))
+            return _bilinear_numba(data, col, row, out)
+        return _bilinear_numpy(data, col, row)
     
     def _cubic_interpolation(self, data: np.ndarray,
                              col: np.ndarray, row: np.ndarray) -> np.ndarray:
@@ -278,6 +517,10 @@ class GeocodingProcessor:
         """
         生成地图瓦片
         
+        采用影像金字塔：只有最高缩放级别从原始数据重采样，较低级别由四个子瓦片
+        2x2 平均得到。按四叉树深度优先生成，每级同时驻留的瓦片不超过四个；
+        瓦片较多时各子树分给多个进程并行生成。
+        
         Args:
             data: 栅格数据
             bounds: 地理边界框
@@ -287,94 +530,243 @@ class GeocodingProcessor:
             colormap: 颜色映射
             
         Returns:
-            瓦片信息字典
+            瓦片信息字典，其中 "tiles" 为 TILE_DTYPE 结构化数组（按级别、x、y 排序）
         """
+        # 只转换一次，之后每个瓦片的重采样都不再复制栅格
+        data = np.asarray(data, dtype=np.float32)
         tiles_info = {
             "bounds": bounds.to_dict(),
             "min_zoom": min_zoom,
             "max_zoom": max_zoom,
             "tile_size": tile_size,
             "colormap": colormap,
-            "tiles": []
+            "tiles": np.empty(0, dtype=TILE_DTYPE)
         }
         
-        # 为每个缩放级别生成瓦片
+        # 每个缩放级别的瓦片范围及其边线经纬度（整级一次向量化计算）
+        tile_grids = {}
         for zoom in range(min_zoom, max_zoom + 1):
-            zoom_tiles = self._generate_zoom_level_tiles(
-                data, bounds, zoom, tile_size, colormap
+            min_tile_x, min_tile_y, max_tile_x, max_tile_y = self._tile_range(bounds, zoom)
+            tile_grids[zoom] = (
+                min_tile_x, min_tile_y, max_tile_x, max_tile_y,
+                self._tile_lon(np.arange(min_tile_x, max_tile_x + 2), zoom).tolist(),
+                self._tile_lat(np.arange(min_tile_y, max_tile_y + 2), zoom).tolist()
             )
-            tiles_info["tiles"].extend(zoom_tiles)
+        pyramid = TilePyramid(bounds, tile_grids, max_zoom, tile_size, colormap)
+        
+        # 从分割级别起的子树互相独立：瓦片足够多时分给多个进程，各自生成整棵子树
+        split_zoom = self._split_zoom(tile_grids, min_zoom, max_zoom)
+        min_tile_x, min_tile_y, max_tile_x, max_tile_y = tile_grids[split_zoom][:4]
+        roots = [(tile_x, tile_y) for tile_x in range(min_tile_x, max_tile_x + 1)
+                 for tile_y in range(min_tile_y, max_tile_y + 1)]
+        
+        if len(roots) > 1 and self._leaf_count(tile_grids[max_zoom]) >= PARALLEL_MIN_TILES:
+            subtrees = self._build_subtrees_parallel(data, pyramid, split_zoom, roots)
+        else:
+            subtrees = [self._build_subtree(data, pyramid, split_zoom, tile_x, tile_y) for tile_x, tile_y in roots]
+        
+        tiles = []
+        level_data = {}
+        for (tile_x, tile_y), (tile_data, subtree_tiles) in zip(roots, subtrees):
+            tiles.extend(subtree_tiles)
+            if tile_data is not None:
+                level_data[tile_x, tile_y] = tile_data
+        
+        # 分割级别以上的少量瓦片在主进程中由子瓦片平均得到
+        for zoom in range(split_zoom - 1, min_zoom - 1, -1):
+            min_tile_x, min_tile_y, max_tile_x, max_tile_y, lon_edges, lat_edges = tile_grids[zoom]
+            parent_data = {}
+            for tile_x in range(min_tile_x, max_tile_x + 1):
+                for tile_y in range(min_tile_y, max_tile_y + 1):
+                    children = [[level_data.get((2 * tile_x + dx, 2 * tile_y + dy)) for dx in (0, 1)]
+                                for dy in (0, 1)]
+                    tile_data = self._downsample_tiles(children, tile_size)
+                    if tile_data is None:
+                        continue
+                    i, j = tile_x - min_tile_x, tile_y - min_tile_y
+                    self._save_tile(tile_data, zoom, tile_x, tile_y, colormap)
+                    tiles.append((zoom, tile_x, tile_y, lon_edges[i], lat_edges[j + 1], lon_edges[i + 1], lat_edges[j]))
+                    parent_data[tile_x, tile_y] = tile_data
+            level_data = parent_data
+        
+        # 按缩放级别、再按 (x, y) 输出
+        tiles_info["tiles"] = np.sort(np.array(tiles, dtype=TILE_DTYPE), order=["zoom", "x", "y"])
         
         return tiles_info
     
-    def _generate_zoom_level_tiles(self,
-                                   data: np.ndarray,
-                                   bounds: BoundingBox,
-                                   zoom: int,
-                                   tile_size: int,
-                                   colormap: str) -> List[Dict]:
-        """生成指定缩放级别的瓦片"""
+    def _leaf_count(self, tile_grid: tuple) -> int:
+        """一个级别的瓦片数"""
+        min_tile_x, min_tile_y, max_tile_x, max_tile_y = tile_grid[:4]
+        return (max_tile_x - min_tile_x + 1) * (max_tile_y - min_tile_y + 1)
+    
+    def _split_zoom(self, tile_grids: Dict[int, tuple], min_zoom: int, max_zoom: int) -> int:
+        """
+        选择子树分割级别
+        
+        最高级别瓦片足够多时，返回第一个瓦片数不少于 4 * TILE_WORKERS 的级别
+        （任务足够多以均衡负载）；否则返回 min_zoom，整棵树串行生成。
+        """
+        if self._leaf_count(tile_grids[max_zoom]) < PARALLEL_MIN_TILES:
+            return min_zoom
+        for zoom in range(min_zoom, max_zoom + 1):
+            if self._leaf_count(tile_grids[zoom]) >= 4 * TILE_WORKERS:
+                return zoom
+        return max_zoom
+    
+    def _build_subtrees_parallel(self, data: np.ndarray, pyramid: TilePyramid,
+                                 zoom: int, roots: List[Tuple[int, int]]) -> List[Tuple[Optional[np.ndarray], List[tuple]]]:
+        """在工作进程中生成各子树，栅格通过共享内存传递，不逐任务序列化"""
+        data = np.ascontiguousarray(data)
+        shm = SharedMemory(create=True, size=max(data.nbytes, 1))
+        try:
+            shared = np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)
+            shared[...] = data
+            del shared
+            
+            with ProcessPoolExecutor(
+                max_workers=min(TILE_WORKERS, len(roots)),
+                mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                return list(executor.map(
+                    _build_shared_subtree,
+                    *zip(*[(self.output_dir, shm.name, data.shape, data.dtype.str, pyramid, zoom, tile_x, tile_y)
+                           for tile_x, tile_y in roots])
+                ))
+        finally:
+            shm.close()
+            shm.unlink()
+    
+    def _build_subtree(self, data: np.ndarray, pyramid: TilePyramid,
+                       zoom: int, tile_x: int, tile_y: int) -> Tuple[Optional[np.ndarray], List[tuple]]:
+        """
+        生成一个瓦片及其全部子孙瓦片
+        
+        Returns:
+            (该瓦片数据或 None, 子树中全部瓦片的元数据元组)
+        """
         tiles = []
+        tile_data = self._build_tile(data, pyramid, zoom, tile_x, tile_y, tiles)
+        return tile_data, tiles
+    
+    def _build_tile(self, data: np.ndarray, pyramid: TilePyramid,
+                    zoom: int, tile_x: int, tile_y: int, tiles: List[tuple]) -> Optional[np.ndarray]:
+        """深度优先生成瓦片，元数据追加到 tiles，返回瓦片数据（无数据时返回 None）"""
+        # 瓦片范围由数据边界框导出，范围内的瓦片必与数据相交，无需逐个检查
+        min_tile_x, min_tile_y, max_tile_x, max_tile_y, lon_edges, lat_edges = pyramid.tile_grids[zoom]
+        if not (min_tile_x <= tile_x <= max_tile_x and min_tile_y <= tile_y <= max_tile_y):
+            return None
+        
+        i, j = tile_x - min_tile_x, tile_y - min_tile_y
+        tile_bounds = BoundingBox(lon_edges[i], lat_edges[j + 1], lon_edges[i + 1], lat_edges[j])
         
-        # 计算瓦片范围
+        if zoom == pyramid.max_zoom:
+            tile_data = self._extract_tile_data(data, pyramid.bounds, tile_bounds, pyramid.tile_size)
+        else:
+            children = [[self._build_tile(data, pyramid, zoom + 1, 2 * tile_x + dx, 2 * tile_y + dy, tiles)
+                         for dx in (0, 1)] for dy in (0, 1)]
+            tile_data = self._downsample_tiles(children, pyramid.tile_size)
+        
+        if tile_data is not None:
+            self._save_tile(tile_data, zoom, tile_x, tile_y, pyramid.colormap)
+            tiles.append((zoom, tile_x, tile_y, tile_bounds.min_lon, tile_bounds.min_lat,
+                          tile_bounds.max_lon, tile_bounds.max_lat))
+        return tile_data
+    
+    def tile_records(self, tiles: np.ndarray) -> List[Dict]:
+        """
+        瓦片元数据转换为字典列表（仅在 JSON 序列化时使用）
+        
+        Args:
+            tiles: generate_tiles 返回的 TILE_DTYPE 结构化数组
+            
+        Returns:
+            每个瓦片的 zoom、x、y、path 和 bounds 字典
+        """
+        return [
+            {
+                "zoom": zoom,
+                "x": tile_x,
+                "y": tile_y,
+                "path": self._tile_path(zoom, tile_x, tile_y),
+                "bounds": BoundingBox(min_lon, min_lat, max_lon, max_lat).to_dict()
+            }
+            for zoom, tile_x, tile_y, min_lon, min_lat, max_lon, max_lat in tiles.tolist()
+        ]
+    
+    def _tile_range(self, bounds: BoundingBox, zoom: int) -> Tuple[int, int, int, int]:
+        """计算覆盖边界框的瓦片范围 (min_x, min_y, max_x, max_y)"""
         min_tile_x, min_tile_y = self._lon_lat_to_tile(bounds.min_lon, bounds.max_lat, zoom)
         max_tile_x, max_tile_y = self._lon_lat_to_tile(bounds.max_lon, bounds.min_lat, zoom)
+        return min_tile_x, min_tile_y, max_tile_x, max_tile_y
+    
+    def _downsample_tiles(self, children: List[List[Optional[np.ndarray]]],
+                          tile_size: int) -> Optional[np.ndarray]:
+        """
+        由 2x2 子瓦片平均得到父瓦片（每四个像素平均为一个，忽略 NaN）
         
-        for tile_x in range(min_tile_x, max_tile_x + 1):
-            for tile_y in range(min_tile_y, max_tile_y + 1):
-                tile_bounds = self._tile_to_bounds(tile_x, tile_y, zoom)
-                
-                # 检查瓦片是否与数据范围相交
-                if self._bounds_intersect(bounds, tile_bounds):
-                    tile_data = self._extract_tile_data(
-                        data, bounds, tile_bounds, tile_size
-                    )
-                    
-                    if tile_data is not None:
-                        # 应用颜色映射
-                        colored_tile = self._apply_colormap(tile_data, colormap)
-                        
-                        # 保存瓦片
-                        tile_path = os.path.join(
-                            self.output_dir, 
-                            f"tiles/{zoom}/{tile_x}/{tile_y}.png"
-                        )
-                        os.makedirs(os.path.dirname(tile_path), exist_ok=True)
-                        
-                        tiles.append({
-                            "zoom": zoom,
-                            "x": tile_x,
-                            "y": tile_y,
-                            "path": tile_path,
-                            "bounds": tile_bounds.to_dict()
-                        })
-        
-        return tiles
-    
-    def _lon_lat_to_tile(self, lon: float, lat: float, zoom: int) -> Tuple[int, int]:
-        """经纬度转瓦片坐标"""
+        Args:
+            children: [[左上, 右上], [左下, 右下]] 子瓦片数据，缺失为 None
+            tile_size: 瓦片尺寸
+            
+        Returns:
+            父瓦片数据，四个子瓦片都缺失时返回 None
+        """
+        if all(child is None for row in children for child in row):
+            return None
+        
+        # 拼接子瓦片，缺失部分视为无数据
+        mosaic = np.full((2 * tile_size, 2 * tile_size), np.nan, dtype=np.float32)
+        for dy, row in enumerate(children):
+            for dx, child in enumerate(row):
+                if child is not None:
+                    mosaic[dy * tile_size:(dy + 1) * tile_size, dx * tile_size:(dx + 1) * tile_size] = child
+        
+        # 四个相邻像素用步长切片相加，比在 reshape 后的轴上归约快得多
+        valid = (~np.isnan(mosaic)).view(np.uint8)
+        np.nan_to_num(mosaic, copy=False, nan=0.0)
+        total = mosaic[0::2, 0::2] + mosaic[0::2, 1::2] + mosaic[1::2, 0::2] + mosaic[1::2, 1::2]
+        count = valid[0::2, 0::2] + valid[0::2, 1::2] + valid[1::2, 0::2] + valid[1::2, 1::2]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return total / count
+    
+    def _tile_path(self, zoom: int, tile_x: int, tile_y: int) -> str:
+        """瓦片文件路径"""
+        return os.path.join(self.output_dir, f"tiles/{zoom}/{tile_x}/{tile_y}.png")
+    
+    def _save_tile(self, tile_data: np.ndarray, zoom: int, tile_x: int, tile_y: int, colormap: str) -> None:
+        """着色并保存瓦片"""
+        # 应用颜色映射
+        colored_tile = self._apply_colormap(tile_data, colormap)
+        
+        # 保存瓦片
+        tile_path = self._tile_path(zoom, tile_x, tile_y)
+        os.makedirs(os.path.dirname(tile_path), exist_ok=True)
+    
+    def _lon_lat_to_tile(self, lon: Union[float, np.ndarray], lat: Union[float, np.ndarray],
+                         zoom: int) -> Tuple[Union[int, np.ndarray], Union[int, np.ndarray]]:
+        """经纬度转瓦片坐标（支持数组；标量输入返回 int）"""
         n = 2 ** zoom
-        tile_x = int((lon + 180) / 360 * n)
-        tile_y = int((1 - math.log(math.tan(math.radians(lat)) + 
-                                    1 / math.cos(math.radians(lat))) / math.pi) / 2 * n)
+        lat_rad = np.radians(lat)
+        tile_x = np.asarray(np.add(lon, 180) / 360 * n).astype(np.int64)
+        tile_y = np.asarray((1 - np.log(np.tan(lat_rad) + 1 / np.cos(lat_rad)) / np.pi) / 2 * n).astype(np.int64)
+        if tile_x.ndim == 0:
+            return int(tile_x), int(tile_y)
         return tile_x, tile_y
     
+    def _tile_lon(self, tile_x: Union[int, np.ndarray], zoom: int) -> Union[float, np.ndarray]:
+        """瓦片西边线经度（tile_x + 1 即东边线，支持数组）"""
+        return np.asarray(tile_x) / 2 ** zoom * 360 - 180
+    
+    def _tile_lat(self, tile_y: Union[int, np.ndarray], zoom: int) -> Union[float, np.ndarray]:
+        """瓦片北边线纬度（tile_y + 1 即南边线，支持数组）"""
+        return np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * np.asarray(tile_y) / 2 ** zoom))))
+    
     def _tile_to_bounds(self, tile_x: int, tile_y: int, zoom: int) -> BoundingBox:
         """瓦片坐标转边界框"""
-        n = 2 ** zoom
-        min_lon = tile_x / n * 360 - 180
-        max_lon = (tile_x + 1) / n * 360 - 180
-        max_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
-        min_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (tile_y + 1) / n))))
+        min_lon, max_lon = self._tile_lon(np.array([tile_x, tile_x + 1]), zoom).tolist()
+        max_lat, min_lat = self._tile_lat(np.array([tile_y, tile_y + 1]), zoom).tolist()
         return BoundingBox(min_lon, min_lat, max_lon, max_lat)
     
-    def _bounds_intersect(self, bounds1: BoundingBox, bounds2: BoundingBox) -> bool:
-        """检查两个边界框是否相交"""
-        return not (bounds1.max_lon < bounds2.min_lon or
-                    bounds1.min_lon > bounds2.max_lon or
-                    bounds1.max_lat < bounds2.min_lat or
-                    bounds1.min_lat > bounds2.max_lat)
-    
     def _extract_tile_data(self,
                            data: np.ndarray,
                            data_bounds: BoundingBox,
@@ -392,104 +784,35 @@ class GeocodingProcessor:
     
     def _apply_colormap(self, data: np.ndarray, colormap: str) -> np.ndarray:
         """应用颜色映射"""
-        # 归一化数据
+        data = np.asarray(data, dtype=np.float32)
         valid_mask = ~np.isnan(data)
         if not np.any(valid_mask):
             return np.zeros((*data.shape, 4), dtype=np.uint8)
         
+        # 归一化到颜色表索引，原地计算只保留一个临时数组
         vmin = np.nanmin(data)
         vmax = np.nanmax(data)
         if vmax == vmin:
-            normalized = np.zeros_like(data)
+            indices = np.zeros(data.shape, dtype=np.uint8)
         else:
-            normalized = (data - vmin) / (vmax - vmin)
-        
-        # 获取颜色映射
-        colors = self._get_colormap(colormap)
+            scaled = data - vmin
+            scaled /= vmax - vmin
+            scaled *= 255
+            np.clip(scaled, 0, 255, out=scaled)
+            scaled[~valid_mask] = 0
+            indices = scaled.astype(np.uint8)
         
-        # 应用颜色映射
-        indices = np.clip((normalized * 255).astype(int), 0, 255)
-        rgba = np.zeros((*data.shape, 4), dtype=np.uint8)
-        
-        for i in range(3):
-            rgba[..., i] = colors[indices, i]
-        
-        # 设置透明度（无效值为透明）
-        rgba[..., 3] = np.where(valid_mask, 200, 0)
+        # 一次查表得到 RGBA：每个颜色作为一个 uint32 读取，比按通道的高级索引快得多；
+        # 无效值设为透明
+        colors = COLORMAP_RGBA.get(colormap, COLORMAP_RGBA["viridis"])
+        rgba = colors.view(np.uint32)[:, 0][indices].view(np.uint8).reshape(*data.shape, 4)
+        rgba[~valid_mask, 3] = 0
         
         return rgba
     
     def _get_colormap(self, name: str) -> np.ndarray:
-        """获取颜色映射表"""
-        if name == "viridis":
-            return self._viridis_colormap()
-        elif name == "jet":
-            return self._jet_colormap()
-        elif name == "coolwarm":
-            return self._coolwarm_colormap()
-        elif name == "rdylgn":
-            return self._rdylgn_colormap()
-        else:
-            return self._viridis_colormap()
-    
-    def _viridis_colormap(self) -> np.ndarray:
-        """Viridis 颜色映射"""
-        colors = np.zeros((256, 3), dtype=np.uint8)
-        for i in range(256):
-            t = i / 255
-            colors[i] = [
-                int(255 * (0.267004 + t * (0.329415 + t * (-0.498039 + t * 0.901684)))),
-                int(255 * (0.004874 + t * (0.873449 + t * (-0.610871 + t * 0.732828)))),
-                int(255 * (0.329415 + t * (0.694426 + t * (-0.876022 + t * 0.852126))))
-            ]
-        return colors
-    
-    def _jet_colormap(self) -> np.ndarray:
-        """Jet 颜色映射"""
-        colors = np.zeros((256, 3), dtype=np.uint8)
-        for i in range(256):
-            t = i / 255
-            if t < 0.125:
-                colors[i] = [0, 0, int(255 * (0.5 + 4 * t))]
-            elif t < 0.375:
-                colors[i] = [0, int(255 * (4 * (t - 0.125))), 255]
-            elif t < 0.625:
-                colors[i] = [int(255 * (4 * (t - 0.375))), 255, int(255 * (1 - 4 * (t - 0.375)))]
-            elif t < 0.875:
-                colors[i] = [255, int(255 * (1 - 4 * (t - 0.625))), 0]
-            else:
-                colors[i] = [int(255 * (1 - 4 * (t - 0.875))), 0, 0]
-        return colors
-    
-    def _coolwarm_colormap(self) -> np.ndarray:
-        """CoolWarm 颜色映射（适合形变数据）"""
-        colors = np.zeros((256, 3), dtype=np.uint8)
-        for i in range(256):
-            t = i / 255
-            if t < 0.5:
-                # 蓝色到白色
-                s = t * 2
-                colors[i] = [int(255 * s), int(255 * s), 255]
-            else:
-                # 白色到红色
-                s = (t - 0.5) * 2
-                colors[i] = [255, int(255 * (1 - s)), int(255 * (1 - s))]
-        return colors
-    
-    def _rdylgn_colormap(self) -> np.ndarray:
-        """Red-Yellow-Green 颜色映射"""
-        colors = np.zeros((256, 3), dtype=np.uint8)
-        for i in range(256):
-            t = i / 255
-            if t < 0.5:
-                # 红色到黄色
-                s = t * 2
-                colors[i] = [255, int(255 * s), 0]
-            else:
-                # 黄色到绿色
-                s = (t - 0.5) * 2
-                colors[i] = [int(255 * (1 - s)), 255, 0]
-        return colors
+        """获取颜色映射表（未知名称返回 viridis）"""
+        return COLORMAP_LUTS.get(name, COLORMAP_LUTS["viridis"])
     
     def create_geojson_overlay(self,
                                data: np.ndarray,
@@ -510,39 +833,36 @@ class GeocodingProcessor:
         """
         height, width = data.shape[:2]
         
-        features = []
+        # 一次性筛选有效像素（非 NaN 且超过阈值）
+        mask = ~np.isnan(data)
+        if threshold is not None:
+            mask &= np.abs(data) >= threshold
+        rows, cols = np.nonzero(mask)
         
-        # 计算像素尺寸
-        pixel_width = bounds.width / width
-        pixel_height = bounds.height / height
+        # 从共用的坐标轴取像素中心坐标
+        lon_axis, lat_axis = self._pixel_axes(height, width, bounds)
+        lons = lon_axis[cols]
+        lats = lat_axis[rows]
+        values = data[rows, cols].astype(np.float64)
         
-        # 创建网格点
-        for row in range(height):
-            for col in range(width):
-                value = data[row, col]
-                
-                if np.isnan(value):
-                    continue
-                
-                if threshold is not None and abs(value) < threshold:
-                    continue
-                
-                # 计算像素中心坐标
-                lon = bounds.min_lon + (col + 0.5) * pixel_width
-                lat = bounds.max_lat - (row + 0.5) * pixel_height
-                
-                features.append({
-                    "type": "Feature",
-                    "geometry": {
-                        "type": "Point",
-                        "coordinates": [lon, lat]
-                    },
-                    "properties": {
-                        "value": float(value),
-                        "row": row,
-                        "col": col
-                    }
-                })
+        # tolist() 一次转换为 Python 标量，避免逐元素装箱
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [lon, lat]
+                },
+                "properties": {
+                    "value": value,
+                    "row": row,
+                    "col": col
+                }
+            }
+            for lon, lat, value, row, col in zip(
+                lons.tolist(), lats.tolist(), values.tolist(), rows.tolist(), cols.tolist()
+            )
+        ]
         
         return {
             "type": "FeatureCollection",
@@ -573,6 +893,8 @@ class GeocodingProcessor:
         Returns:
             地理编码结果
         """
+        # InSAR 结果无需双精度：float32 使内存带宽和占用减半
+        data = np.asarray(data, dtype=np.float32)
         result = {
             "timestamp": datetime.now().isoformat(),
             "result_type": result_type,
@@ -589,16 +911,37 @@ class GeocodingProcessor:
         threshold = np.nanstd(data) * 2 if result_type == "velocity" else None
         result["geojson"] = self.create_geojson_overlay(data, bounds, threshold)
         
-        # 保存结果
+        # 保存结果（瓦片元数据在此才转换为字典列表）
+        serializable = dict(result)
+        if "tiles" in result:
+            serializable["tiles"] = {**result["tiles"], "tiles": self.tile_records(result["tiles"]["tiles"])}
         output_path = os.path.join(self.output_dir, f"{result_type}_geocoded.json")
         with open(output_path, 'w') as f:
-            json.dump(result, f, indent=2, default=str)
+            json.dump(serializable, f, indent=2, default=str)
         
         result["output_path"] = output_path
         
         return result
 
 
+def _build_shared_subtree(output_dir: str, shm_name: str, shape: Tuple[int, ...], dtype: str,
+                          pyramid: TilePyramid, zoom: int, tile_x: int,
+                          tile_y: int) -> Tuple[Optional[np.ndarray], List[tuple]]:
+    """
+    在工作进程中生成一棵瓦片子树
+    
+    模块级函数以便进程池调用；栅格从共享内存映射，不经过序列化。
+    """
+    shm = SharedMemory(name=shm_name)
+    try:
+        data = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        result = GeocodingProcessor(output_dir)._build_subtree(data, pyramid, zoom, tile_x, tile_y)
+        del data
+        return result
+    finally:
+        shm.close()
+
+
 class MapOverlayGenerator:
     """地图叠加层生成器"""
     
@@ -121,16 +121,16 @@ async def get_status():
 async def search_sentinel1(request: ASFSearchRequest):
     """Search for Sentinel-1 data"""
     try:
-        client = ASFAPIClient()
-        result = client.search_sentinel1(
-            start_date=request.start_date,
-            end_date=request.end_date,
-            bbox=tuple(request.bbox),
-            platform=request.platform,
-            beam_mode=request.beam_mode,
-            processing_level=request.processing_level,
-            max_results=request.max_results
-        )
+        with ASFAPIClient() as client:
+            result = client.search_sentinel1(
+                start_date=request.start_date,
+                end_date=request.end_date,
+                bbox=tuple(request.bbox),
+                platform=request.platform,
+                beam_mode=request.beam_mode,
+                processing_level=request.processing_level,
+                max_results=request.max_results
+            )
         return result
     except Exception as e:
         logger.error(f"ASF search error: {e}")
@@ -170,15 +170,14 @@ async def download_sentinel1(
 async def _download_product_task(task_id: str, product_url: str):
     """Background task for downloading product"""
     try:
-        client = ASFAPIClient()
-        
         def progress_callback(progress, downloaded, total):
             processing_tasks[task_id]["progress"] = progress
         
-        result = client.download_product(
-            {"url": product_url, "file_name": product_url.split("/")[-1]},
-            progress_callback=progress_callback
-        )
+        with ASFAPIClient() as client:
+            result = client.download_product(
+                {"url": product_url, "file_name": product_url.split("/")[-1]},
+                progress_callback=progress_callback
+            )
         
         processing_tasks[task_id]["status"] = "completed"
         processing_tasks[task_id]["result"] = result
@@ -240,13 +239,13 @@ async def _run_insar_processing(task_id: str, request: ProcessingRequest):
         task["progress"] = 10
         log("开始下载 Sentinel-1 数据...")
         
-        data_manager = Sentinel1DataManager()
-        acquisition_result = data_manager.acquire_data(
-            start_date=request.start_date,
-            end_date=request.end_date,
-            bbox=tuple(request.bbox),
-            max_products=2
-        )
+        with Sentinel1DataManager() as data_manager:
+            acquisition_result = data_manager.acquire_data(
+                start_date=request.start_date,
+                end_date=request.end_date,
+                bbox=tuple(request.bbox),
+                max_products=2
+            )
         
         log(f"数据下载完成: {acquisition_result.get('total_products', 0)} 个产品")
         
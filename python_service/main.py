@@ -216,11 +216,11 @@ async def process_insar_task(task_id: str, request: ProcessingRequest):
             "Starting data download from Copernicus Data Hub"
         )
         
-        downloader = DataDownloader(request)
-        data_files = await downloader.download_sentinel1_data(
-            request.start_date, request.end_date,
-            request.orbit_direction, request.polarization
-        )
+        async with DataDownloader(request) as downloader:
+            data_files = await downloader.download_sentinel1_data(
+                request.start_date, request.end_date,
+                request.orbit_direction, request.polarization
+            )
         
         await log_task(task_id, "info", f"Downloaded {len(data_files)} Sentinel-1 products")
         
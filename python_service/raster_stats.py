@@ -0,0 +1,64 @@
+"""
+Streaming Raster Statistics
+Mean and standard deviation accumulated tile by tile, so statistics ride along
+with the pass that reads or writes each tile instead of re-walking full arrays
+"""
+
+import numpy as np
+
+
+class OnlineMoments:
+    """Running count, mean and variance of non-NaN values"""
+
+    __slots__ = ("count", "_mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0  # Sum of squared deviations from the mean
+
+    def update(self, values) -> None:
+        """
+        Merge a tile's non-NaN values into the running moments
+
+        Each tile is reduced on its own (in float64) and merged with the
+        pairwise update of Chan et al., the batched form of Welford's
+        algorithm, so long streams don't lose precision to cancellation.
+
+        Args:
+            values: Tile values (array or scalar); NaN is ignored
+        """
+        values = np.asarray(values)
+        valid = ~np.isnan(values)
+        n = int(np.count_nonzero(valid))
+        if n == 0:
+            return
+
+        tile_mean = np.add.reduce(values, where=valid, axis=None, dtype=np.float64) / n
+        deviation = np.subtract(values, tile_mean, dtype=np.float64)
+        tile_m2 = np.add.reduce(deviation * deviation, where=valid, axis=None)
+
+        total = self.count + n
+        delta = tile_mean - self._mean
+        self._mean += delta * n / total
+        self._m2 += tile_m2 + delta * delta * self.count * n / total
+        self.count = total
+
+    @property
+    def mean(self) -> float:
+        """Mean of the values seen so far (NaN if none), as np.nanmean"""
+        return self._mean if self.count else float("nan")
+
+    def std(self, ddof: int = 0) -> float:
+        """
+        Standard deviation of the values seen so far, as np.nanstd
+
+        Args:
+            ddof: Delta degrees of freedom (0 for population std)
+
+        Returns:
+            Standard deviation, NaN if there are not more than ddof values
+        """
+        if self.count <= ddof:
+            return float("nan")
+        return float(np.sqrt(self._m2 / (self.count - ddof)))
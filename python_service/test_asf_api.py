@@ -0,0 +1,223 @@
+"""
+Unit tests for ASF API download/extract paths (no network access)
+"""
+
+import hashlib
+import io
+import shutil
+import zipfile
+from pathlib import Path
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import asf_api
+from asf_api import ASFAPIClient, products_to_pylist
+
+
+class FakeResponse:
+    """Minimal streamed requests.Response stand-in"""
+
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.raw = io.BytesIO(body)
+        self._body = body
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self._body), chunk_size):
+            yield self._body[start:start + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Serves one payload, optionally honouring Range requests"""
+
+    def __init__(self, data, ranges=True, fail_offset=None, content_length=None):
+        self.data = data
+        self.ranges = ranges
+        self.fail_offset = fail_offset
+        self.content_length = len(data) if content_length is None else content_length
+        self.range_requests = []
+
+    def head(self, url, **kwargs):
+        headers = {"content-length": str(self.content_length)}
+        if self.ranges:
+            headers["accept-ranges"] = "bytes"
+        return FakeResponse(200, headers=headers)
+
+    def get(self, url, headers=None, **kwargs):
+        range_header = (headers or {}).get("Range")
+        if range_header and self.ranges:
+            start, end = map(int, range_header[len("bytes="):].split("-"))
+            self.range_requests.append((start, end))
+            if start == self.fail_offset:
+                raise requests.ConnectionError("connection reset")
+            body = self.data[start:end + 1]
+            return FakeResponse(206, body, {"content-length": str(len(body))})
+        return FakeResponse(200, self.data, {"content-length": str(self.content_length)})
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Client whose download directory lives under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(asf_api, "RANGE_MIN_SIZE", 1)
+    monkeypatch.setattr(asf_api, "RANGE_CONNECTIONS", 4)
+    with ASFAPIClient() as client:
+        yield client
+
+
+@pytest.fixture
+def payload():
+    """Deterministic download payload"""
+    return bytes(range(256)) * 40
+
+
+def _product(payload, md5=True):
+    return {
+        "file_name": "product.zip",
+        "url": "https://example.invalid/product.zip",
+        "md5sum": hashlib.md5(payload).hexdigest() if md5 else None
+    }
+
+
+class TestDownload:
+    """Test ranged and single-stream downloads"""
+
+    def test_ranged_download(self, client, payload, tmp_path):
+        """Test file is assembled from parallel Range requests"""
+        client.session = FakeSession(payload)
+
+        result = client.download_product(_product(payload), output_dir=str(tmp_path))
+
+        assert result["status"] == "completed"
+        assert len(client.session.range_requests) == 4
+        assert (tmp_path / "product.zip").read_bytes() == payload
+
+    def test_range_ignored_falls_back(self, client, payload, tmp_path):
+        """Test servers without Range support get a single stream"""
+        client.session = FakeSession(payload, ranges=False)
+
+        result = client.download_product(_product(payload), output_dir=str(tmp_path))
+
+        assert result["status"] == "completed"
+        assert (tmp_path / "product.zip").read_bytes() == payload
+
+    def test_partial_range_failure_removes_file(self, client, payload, tmp_path):
+        """Test a failed range leaves no preallocated file behind"""
+        client.session = FakeSession(payload, fail_offset=0)
+
+        result = client.download_product(_product(payload, md5=False), output_dir=str(tmp_path))
+
+        assert result["status"] == "error"
+        assert not (tmp_path / "product.zip").exists()
+
+    def test_truncated_stream_removes_file(self, client, payload, tmp_path):
+        """Test a body shorter than Content-Length is reported as an error"""
+        client.session = FakeSession(payload, ranges=False, content_length=len(payload) * 2)
+
+        result = client.download_product(_product(payload, md5=False), output_dir=str(tmp_path))
+
+        assert result["status"] == "error"
+        assert not (tmp_path / "product.zip").exists()
+
+    def test_md5_marker_skips_rehash(self, client, payload, tmp_path, monkeypatch):
+        """Test the streamed MD5 is recorded and reused on the next call"""
+        client.session = FakeSession(payload, ranges=False)
+
+        result = client.download_product(_product(payload), output_dir=str(tmp_path))
+
+        assert result["status"] == "completed"
+        assert (tmp_path / "product.zip.md5.ok").exists()
+
+        def fail_hash(*args):
+            raise AssertionError("file was re-hashed")
+
+        monkeypatch.setattr(client, "_hash_matches", fail_hash)
+        result = client.download_product(_product(payload), output_dir=str(tmp_path))
+
+        assert result["source"] == "cache"
+
+    def test_md5_mismatch(self, client, payload, tmp_path):
+        """Test a corrupted download fails verification"""
+        client.session = FakeSession(payload, ranges=False)
+        product = _product(payload)
+        product["md5sum"] = "0" * 32
+
+        result = client.download_product(product, output_dir=str(tmp_path))
+
+        assert result["status"] == "error"
+
+
+class TestExtract:
+    """Test parallel extraction and the blob store"""
+
+    @pytest.fixture
+    def archive(self, tmp_path):
+        """Small SAFE-like archive"""
+        zip_file = tmp_path / "product.zip"
+        with zipfile.ZipFile(zip_file, "w", zipfile.ZIP_DEFLATED) as zf:
+            for i in range(40):
+                zf.writestr(f"S1A_TEST.SAFE/measurement/m{i}.tiff", bytes([i]) * (1000 + i))
+            zf.writestr("S1A_TEST.SAFE/manifest.safe", b"<xml/>")
+        return zip_file
+
+    def _assert_extracted(self, archive, output_dir):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                assert (output_dir / info.filename).read_bytes() == zf.read(info)
+
+    def test_parallel_extract(self, client, archive, tmp_path):
+        """Test every member is extracted intact"""
+        result = client.extract_product(str(archive), str(tmp_path / "out"))
+
+        assert result["status"] == "completed"
+        assert result["safe_dir"].endswith("S1A_TEST.SAFE")
+        self._assert_extracted(archive, tmp_path / "out")
+
+    def test_dedupe_links_and_prunes(self, client, archive, tmp_path):
+        """Test deduplicated extraction hard-links from the store"""
+        client.extract_product(str(archive), str(tmp_path / "a"), dedupe=True)
+        client.extract_product(str(archive), str(tmp_path / "b"), dedupe=True)
+
+        self._assert_extracted(archive, tmp_path / "b")
+        member = tmp_path / "b" / "S1A_TEST.SAFE" / "measurement" / "m1.tiff"
+        assert member.stat().st_nlink == 3
+
+        shutil.rmtree(tmp_path / "a")
+        shutil.rmtree(tmp_path / "b")
+        assert client.prune_blob_store() > 0
+        assert not any((client.download_dir / ".blobs").iterdir())
+
+
+class TestSearchResults:
+    """Test columnar search results"""
+
+    def test_records_to_array_round_trip(self):
+        """Test long strings survive and empty numbers map to fill values"""
+        records = [
+            {"granuleName": "S1A_IW", "beamModeType": "EW_LONGMODE", "pathNumber": "", "sizeMB": 4321.125},
+            {"granuleName": "S1B_IW", "processingLevel": "METADATA_SLC", "pathNumber": 42, "frameNumber": "7"},
+        ]
+
+        products = asf_api._records_to_array(records)
+
+        assert products["beam_mode"][0] == "EW_LONGMODE"
+        assert products["processing_level"][1] == "METADATA_SLC"
+        assert products["path"].tolist() == [-1, 42]
+        assert products["file_size"][0] == 4321.125
+
+        rows = products_to_pylist(products)
+        assert rows[0]["path"] is None
+        assert rows[1]["frame"] == 7
+        assert rows[1]["file_size"] is None
@@ -4,9 +4,13 @@ Unit tests for atmospheric correction module
 
 import pytest
 import numpy as np
+import subprocess
+import sys
 import tempfile
 from pathlib import Path
+import atmospheric_correction
 from atmospheric_correction import AtmosphericCorrection, AtmosphericCorrectionPipeline
+from scipy.ndimage import uniform_filter
 import rasterio
 from rasterio.transform import Affine
 
@@ -256,5 +260,163 @@ class TestAtmosphericCorrectionPipeline:
         assert (output_dir / "phase_corrected_combined.tif").exists()
 
 
+    def test_parallel_pipeline_exits(self, synthetic_dem, synthetic_interferogram, temp_dir):
+        """Test the process-pool path completes and the interpreter exits cleanly"""
+        script = (
+            "import atmospheric_correction as ac\n"
+            "ac.PIPELINE_MIN_PIXELS = 0\n"
+            f"pipeline = ac.AtmosphericCorrectionPipeline({synthetic_dem!r}, {synthetic_interferogram!r}, {temp_dir!r})\n"
+            "estimators = {'ztd': 'tropospheric_delay_correction', 'hp': 'estimate_aps_high_pass_filter'}\n"
+            "parallel = pipeline._run_estimators_parallel(estimators)\n"
+            "for name, method in estimators.items():\n"
+            "    assert (parallel[name] == getattr(pipeline.corrector, method)()).all(), name\n"
+            "assert pipeline.run_full_correction()['status'] == 'completed'\n"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            timeout=300
+        )
+        
+        assert proc.returncode == 0, proc.stderr
+        assert (Path(temp_dir) / "phase_corrected_combined.tif").exists()
+
+
+requires_numba = pytest.mark.skipif(
+    not atmospheric_correction.NUMBA_AVAILABLE, reason="numba not installed"
+)
+
+
+class TestKernels:
+    """Test fused/optimized kernels against their NumPy references"""
+
+    @requires_numba
+    def test_local_correlation_numba_matches_numpy(self):
+        """Test numba local-correlation combine matches the NumPy version"""
+        rng = np.random.default_rng(0)
+        phase = rng.normal(size=(96, 96))
+        dem = rng.normal(1000, 300, size=(96, 96))
+        phase[3:9, 40:70] = np.nan
+        
+        valid = np.isfinite(phase) & np.isfinite(dem)
+        x = np.where(valid, phase, 0.0)
+        dem_centered = dem - dem[valid].mean()
+        y = np.where(valid, dem_centered, 0.0)
+        n = uniform_filter(valid.astype(np.float64), 16)
+        means = [uniform_filter(a, 16) for a in (x, y, x * y, x * x, y * y)]
+        
+        expected = atmospheric_correction._local_correlation_aps_numpy(n, *means, dem_centered, 10 / 16 ** 2)
+        actual = atmospheric_correction._local_correlation_aps_numba(n, *means, dem_centered, 10 / 16 ** 2)
+        
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+
+    @pytest.mark.parametrize("sigma", [2.0, 9.5])
+    def test_gaussian_filter_fft_matches_scipy(self, sigma):
+        """Test FFT Gaussian matches scipy's reflect-mode gaussian_filter"""
+        from scipy.ndimage import gaussian_filter
+        
+        data = np.random.default_rng(1).normal(size=(120, 90)).astype(np.float32)
+        
+        actual = atmospheric_correction._gaussian_filter_fft(data, sigma)
+        
+        assert actual.dtype == np.float32
+        np.testing.assert_allclose(actual, gaussian_filter(data, sigma), atol=1e-5)
+
+    def test_gaussian_filter_tiled_matches_scipy(self):
+        """Test halo-tiled Gaussian is identical to the whole-array filter"""
+        from scipy.ndimage import gaussian_filter
+        
+        data = np.random.default_rng(5).normal(size=(700, 1100)).astype(np.float32)
+        
+        np.testing.assert_array_equal(
+            atmospheric_correction._gaussian_filter_tiled(data, 5.5),
+            gaussian_filter(data, 5.5)
+        )
+
+    def test_high_pass_fft_method(self, synthetic_dem, synthetic_interferogram):
+        """Test the FFT path of the high-pass estimator matches the direct path"""
+        corrector = AtmosphericCorrection(synthetic_dem, synthetic_interferogram)
+        
+        direct = corrector.estimate_aps_high_pass_filter(method="direct")
+        fft = corrector.estimate_aps_high_pass_filter(method="fft")
+        
+        np.testing.assert_allclose(fft, direct, atol=1e-5)
+
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    def test_nan_stats_match_nan_reductions(self, dtype):
+        """Test fused statistics match the nan* reductions (both backends)"""
+        data = np.random.default_rng(2).normal(3.0, 2.0, size=(64, 80)).astype(dtype)
+        data[::7, ::5] = np.nan
+        data[10] = np.nan
+        
+        expected = atmospheric_correction._nan_stats_numpy(data)
+        
+        np.testing.assert_allclose(
+            [np.nanmin(data), np.nanmax(data), np.nanmean(data), np.nanstd(data)],
+            expected[:4], rtol=1e-5
+        )
+        np.testing.assert_allclose(atmospheric_correction._nan_stats(data), expected, rtol=1e-5)
+        if atmospheric_correction.NUMBA_AVAILABLE:
+            np.testing.assert_allclose(
+                atmospheric_correction._nan_stats_numba(data), expected, rtol=1e-5
+            )
+
+
+    @pytest.mark.parametrize("order", [1, 2, 3])
+    def test_polyfit_normal_matches_polyfit(self, order):
+        """Test normal-equation polynomial fit matches np.polyfit"""
+        rng = np.random.default_rng(3)
+        x = rng.normal(1500, 600, size=20000).astype(np.float32)
+        y = (2e-7 * x ** 2 + 1e-3 * x + rng.normal(0, 0.1, size=x.size)).astype(np.float32)
+        
+        np.testing.assert_allclose(
+            atmospheric_correction._polyfit_normal(x, y, order),
+            np.polyfit(x, y, order),
+            rtol=1e-6, atol=1e-12
+        )
+
+    def test_nonlinear_height_correction_removes_trend(self, synthetic_dem, synthetic_interferogram):
+        """Test polynomial correction removes a quadratic height signal"""
+        corrector = AtmosphericCorrection(synthetic_dem, synthetic_interferogram)
+        dem = corrector.dem_data
+        phase = (1e-6 * dem ** 2 + 1e-3 * dem).astype(np.float32)
+        
+        corrected = corrector.nonlinear_height_correction(phase, order=2)
+        
+        assert np.nanstd(corrected) < 1e-3 * np.nanstd(phase)
+
+
+    @requires_numba
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    def test_tropospheric_delay_numba_matches_numpy(self, dtype):
+        """Test fused Saastamoinen kernel matches the NumPy expression"""
+        dem = np.random.default_rng(4).normal(1200, 800, size=(70, 50)).astype(dtype)
+        dem[5, 5] = np.nan
+        args = (float(np.nanmean(dem)), 288.15, 1013.25, 0.0065, 0.6, 0.0554, float(np.cos(np.pi / 6)))
+        
+        expected = atmospheric_correction._tropospheric_delay_numpy(dem, *args)
+        actual = atmospheric_correction._tropospheric_delay_numba(dem, *args)
+        
+        assert np.isnan(actual[5, 5])
+        np.testing.assert_allclose(actual, expected, rtol=1e-5)
+
+
+    @requires_numba
+    def test_water_vapor_numba_matches_numpy(self):
+        """Test fused PWV kernel matches the NumPy clip/scale model"""
+        dem = np.random.default_rng(6).normal(2000, 2500, size=(60, 40)).astype(np.float32)
+        dem[1, 1] = np.nan
+        
+        expected = atmospheric_correction._water_vapor_delay_numpy(dem)
+        actual = atmospheric_correction._water_vapor_delay_numba(dem)
+        
+        assert np.isnan(actual[1, 1])
+        np.testing.assert_allclose(actual, expected, rtol=1e-6)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
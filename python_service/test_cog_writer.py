@@ -0,0 +1,55 @@
+"""
+Unit tests for Cloud-Optimized GeoTIFF output
+"""
+
+import warnings
+
+import pytest
+import numpy as np
+import rasterio
+from rasterio.transform import Affine
+
+from cog_writer import staged_cog
+
+
+def _write_staging(path, data):
+    with rasterio.open(
+        path, 'w', driver='GTiff', height=data.shape[0], width=data.shape[1], count=1,
+        dtype=rasterio.float32, crs='EPSG:4326', transform=Affine.identity(), tiled=True
+    ) as dst:
+        dst.write(data, 1)
+
+
+@pytest.fixture(autouse=True)
+def _quiet_identity_transform():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", rasterio.errors.NotGeoreferencedWarning)
+        yield
+
+
+class TestStagedCOG:
+    """Test staging files are published as COGs"""
+
+    def test_publishes_cog_with_overviews(self, tmp_path):
+        """Test the output is a tiled DEFLATE COG with overviews and intact data"""
+        data = np.random.default_rng(4).normal(size=(300, 200)).astype(np.float32)
+
+        with staged_cog(tmp_path / "ztd.tif", blocksize=64) as staging_file:
+            _write_staging(staging_file, data)
+
+        with rasterio.open(tmp_path / "ztd.tif") as src:
+            np.testing.assert_array_equal(src.read(1), data)
+            assert src.block_shapes == [(64, 64)]
+            assert src.overviews(1) == [2, 4, 8]  # Until the overview fits one tile
+            assert src.tags(ns="IMAGE_STRUCTURE")["LAYOUT"] == "COG"
+            assert src.compression.value == "DEFLATE"
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["ztd.tif"]
+
+    def test_failure_leaves_no_files(self, tmp_path):
+        """Test an error while staging publishes nothing and removes the staging file"""
+        with pytest.raises(RuntimeError):
+            with staged_cog(tmp_path / "ztd.tif") as staging_file:
+                _write_staging(staging_file, np.zeros((32, 32), dtype=np.float32))
+                raise RuntimeError("tile failed")
+
+        assert not list(tmp_path.iterdir())
@@ -0,0 +1,217 @@
+"""
+Unit tests for the download service (local HTTP server, no external network)
+"""
+
+import asyncio
+import importlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+PAYLOAD = bytes(range(256)) * 4096  # 1MB
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD, honouring single open-ended Range requests"""
+
+    requests_seen = []
+
+    def do_GET(self):
+        RangeHandler.requests_seen.append(dict(self.headers))
+        if self.path.split("?")[0] != "/product.zip":
+            self.send_error(404)
+            return
+
+        range_header = self.headers.get("Range")
+        if range_header:
+            start = int(range_header[len("bytes="):].rstrip("-"))
+            body = PAYLOAD[start:]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        else:
+            body = PAYLOAD
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"payload-v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    """Local HTTP server for the test module"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """DownloadManager writing under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    download_service = importlib.import_module("download_service")
+    manager = download_service.DownloadManager(str(tmp_path / "downloads"))
+    RangeHandler.requests_seen.clear()
+    yield manager
+    manager.close()
+
+
+def _wait(manager, file_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = manager.get_download_status(file_id)
+        if status["status"] in ("completed", "failed"):
+            return status
+        time.sleep(0.01)
+    raise AssertionError("download did not finish")
+
+
+class TestDownloadManager:
+    """Test streamed downloads and Range resume"""
+
+    def test_download(self, manager, server):
+        """Test a full download is written intact"""
+        file_id = manager.start_download(f"{server}/product.zip", "product.zip")
+
+        status = _wait(manager, file_id)
+
+        assert status["status"] == "completed"
+        assert status["downloaded_size"] == len(PAYLOAD)
+        assert (manager.download_dir / "product.zip").read_bytes() == PAYLOAD
+
+    def test_http_error(self, manager, server):
+        """Test non-200 responses fail the download"""
+        file_id = manager.start_download(f"{server}/missing.zip", "missing.zip")
+
+        status = _wait(manager, file_id)
+
+        assert status["status"] == "failed"
+        assert status["error_message"] == "HTTP 404"
+
+    def test_download_many(self, manager, server):
+        """Test concurrent downloads awaited from another event loop"""
+        items = [(f"{server}/product.zip?copy={i}", f"copy{i}.zip") for i in range(4)]
+        items.append((f"{server}/missing.zip", "missing.zip"))
+
+        file_ids = asyncio.run(manager.download_many(items))
+
+        statuses = [manager.get_download_status(file_id)["status"] for file_id in file_ids]
+        assert statuses == ["completed"] * 4 + ["failed"]
+        assert (manager.download_dir / "copy3.zip").read_bytes() == PAYLOAD
+
+    def test_finished_downloads_are_evicted(self, manager, monkeypatch):
+        """Test only the oldest finished entries are dropped past the limit"""
+        monkeypatch.setattr(importlib.import_module("download_service"), "MAX_TRACKED_DOWNLOADS", 2)
+        for file_id, status in (("a", "completed"), ("b", "downloading"), ("c", "failed")):
+            manager._register(f"http://example.invalid/{file_id}", file_id, file_id)
+            manager.downloads[file_id].status = status
+
+        manager._register("http://example.invalid/d", "d", "d")
+
+        assert list(manager.downloads) == ["b", "d"]
+
+    def test_resume_requests_remaining_bytes(self, manager, server):
+        """Test resume appends only the bytes missing from the partial file"""
+        file_id = manager.start_download(f"{server}/product.zip", "product.zip")
+        _wait(manager, file_id)
+
+        # Simulate a transfer paused part-way through
+        partial = len(PAYLOAD) // 3
+        path = manager.download_dir / "product.zip"
+        path.write_bytes(PAYLOAD[:partial])
+        manager.downloads[file_id].status = "paused"
+        manager.pause_download(file_id)
+
+        assert manager.resume_download(file_id)
+        deadline = time.monotonic() + 10
+        while len(RangeHandler.requests_seen) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        status = _wait(manager, file_id)
+
+        assert status["status"] == "completed"
+        assert RangeHandler.requests_seen[-1]["Range"] == f"bytes={partial}-"
+        assert RangeHandler.requests_seen[-1]["If-Range"] == '"payload-v1"'
+        assert path.read_bytes() == PAYLOAD
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """DataCacheManager rooted at tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    download_service = importlib.import_module("download_service")
+    return download_service.DataCacheManager(str(tmp_path / "cache"))
+
+
+class TestDataCacheManager:
+    """Test cache index bookkeeping"""
+
+    def _make(self, tmp_path, name, size):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+        return str(path)
+
+    def test_total_size_and_lookup(self, cache, tmp_path):
+        """Test sizes and filename lookups follow adds, re-adds and removals"""
+        a = cache.add_to_cache(self._make(tmp_path, "a/product.zip", 10))
+        b = cache.add_to_cache(self._make(tmp_path, "b/product.zip", 20))
+        cache.add_to_cache(str(tmp_path / "a" / "product.zip"))
+
+        assert cache.get_cache_info()["total_size"] == 30
+        assert cache.file_exists("product.zip")
+
+        cache.remove_from_cache(a)
+        assert cache.file_exists("product.zip")
+        cache.remove_from_cache(b)
+        assert not cache.file_exists("product.zip")
+        assert cache.get_cache_info()["total_size"] == 0
+
+    def test_index_reloads(self, cache, tmp_path):
+        """Test a new manager sees entries flushed by the previous one"""
+        for i in range(5):
+            cache.add_to_cache(self._make(tmp_path, f"product{i}.zip", 10))
+
+        # Writes are deferred and coalesced until the timer or an explicit flush
+        assert not cache.cache_index_file.exists()
+        cache.flush()
+
+        reloaded = type(cache)(str(cache.cache_dir))
+
+        assert reloaded.file_exists("product3.zip")
+        assert reloaded.get_cache_info()["total_size"] == 50
+
+
+class TestFormatting:
+    """Test display formatting at unit boundaries"""
+
+    @pytest.fixture
+    def formats(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        return importlib.import_module("download_service")
+
+    @pytest.mark.parametrize("size, expected", [
+        (0, "0 B"), (1023, "1023 B"), (1024, "1.0 KB"), (1024 ** 2 - 1, "1024.0 KB"),
+        (1024 ** 2, "1.0 MB"), (3 * 1024 ** 3, "3.00 GB"), (2 * 1024 ** 4, "2048.00 GB"),
+    ])
+    def test_size(self, formats, size, expected):
+        assert formats._format_size(size) == expected
+
+    @pytest.mark.parametrize("speed, expected", [
+        (0, "0.0 B/s"), (512, "512.0 B/s"), (1536, "1.5 KB/s"), (5 * 1024 ** 3, "5120.0 MB/s"),
+    ])
+    def test_speed(self, formats, speed, expected):
+        assert formats._format_speed(speed) == expected
+
+    @pytest.mark.parametrize("eta, expected", [
+        (59, "59s"), (60, "1m 0s"), (3599, "59m 59s"), (3600, "1h 0m"), (7322, "2h 2m"),
+    ])
+    def test_eta(self, formats, eta, expected):
+        assert formats._format_eta(eta) == expected
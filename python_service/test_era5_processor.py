@@ -0,0 +1,369 @@
+"""
+Unit tests for ERA5 tropospheric correction
+"""
+
+import hashlib
+
+import pytest
+import numpy as np
+from scipy.interpolate import griddata
+
+import era5_processor
+from era5_processor import ERA5TroposphericCorrection
+
+
+requires_numba = pytest.mark.skipif(
+    not era5_processor.NUMBA_AVAILABLE, reason="numba not installed"
+)
+requires_xarray = pytest.mark.skipif(
+    not era5_processor.XARRAY_AVAILABLE, reason="xarray not installed"
+)
+
+
+@pytest.fixture
+def atmosphere():
+    """Temperature (K), pressure (Pa), humidity (%), elevation (m) and per-row latitude factor"""
+    rng = np.random.default_rng(0)
+    shape = (60, 80)
+    temperature = rng.normal(288.15, 5, shape)
+    pressure = rng.normal(101325, 1000, shape)
+    humidity = rng.uniform(20, 90, shape)
+    elevation = rng.normal(800, 400, shape)
+    temperature[2, 3] = np.nan
+    lat_factor = era5_processor._latitude_factor(np.linspace(40.0, 39.0, shape[0]))
+    return temperature, pressure, humidity, elevation, lat_factor
+
+
+class TestKernels:
+    """Test fused kernels against their NumPy references"""
+
+    @requires_numba
+    def test_ztd_numba_matches_numpy(self, atmosphere):
+        """Test the fused Magnus + Saastamoinen kernel"""
+        expected = era5_processor._ztd_numpy(*atmosphere)
+        actual = era5_processor._ztd(*atmosphere)
+
+        assert actual.dtype == np.float64
+        assert np.isnan(actual[2, 3])
+        np.testing.assert_allclose(actual, expected, rtol=1e-7)
+
+    def test_ztd_broadcasts_scalar_fields(self, atmosphere):
+        """Test constant fields give the same ZTD as equivalent full arrays"""
+        elevation, lat_factor = atmosphere[3:]
+        scalars = (np.float32(288.15), np.float32(101325.0), np.float32(60.0))
+        full = [np.full(elevation.shape, value, dtype=np.float64) for value in scalars]
+
+        actual = era5_processor._ztd(*scalars, elevation, lat_factor)
+
+        assert actual.shape == elevation.shape
+        np.testing.assert_allclose(
+            actual, era5_processor._ztd_numpy(*full, elevation, lat_factor), rtol=1e-7
+        )
+
+    @requires_numba
+    def test_ztd_pwv_numba_matches_numpy(self, atmosphere):
+        """Test the joint ZTD + PWV kernel"""
+        expected_ztd, expected_pwv = era5_processor._ztd_pwv_numpy(*atmosphere)
+        ztd, pwv = era5_processor._ztd_pwv(*atmosphere)
+
+        assert np.isnan(pwv[2, 3])
+        np.testing.assert_allclose(ztd, expected_ztd, rtol=1e-7)
+        np.testing.assert_allclose(pwv, expected_pwv, rtol=1e-7)
+
+    def test_ztd_pwd_shares_state(self, atmosphere, monkeypatch):
+        """Test the joint path interpolates each field once and matches the separate methods"""
+        temperature, pressure, humidity, elevation, _ = atmosphere
+        corrector = ERA5TroposphericCorrection(elevation, (40.0, 10.0, 39.0, 11.0))
+        lat = np.linspace(40.0, 39.0, elevation.shape[0])
+        lon = np.linspace(10.0, 11.0, elevation.shape[1])
+        calls = []
+        interpolate = corrector._interpolate_to_dem
+        monkeypatch.setattr(corrector, "_interpolate_to_dem", lambda *args: calls.append(1) or interpolate(*args))
+
+        ztd, pwv = corrector.calculate_ztd_pwd(
+            corrector.compute_state(temperature, pressure, humidity, lat, lon)
+        )
+
+        assert len(calls) == 3
+        np.testing.assert_allclose(ztd, corrector.calculate_ztd(temperature, pressure, humidity, lat, lon))
+        np.testing.assert_allclose(pwv, corrector.calculate_pwd(temperature, humidity, lat, lon))
+
+    def test_hydrostatic_delay_depends_on_latitude(self):
+        """Test the zenith hydrostatic delay uses 1 - 0.00266 cos(2 lat) - 0.00028 h"""
+        elevation = np.zeros((2, 1))
+        factor = era5_processor._latitude_factor(np.array([0.0, 60.0]))
+        # With e = 0 only the hydrostatic term remains
+        zhd = era5_processor._ztd_numpy(288.15, 101325.0, 0.0, elevation, factor)
+
+        assert zhd[0, 0] == pytest.approx(0.0022768 * 1013.25 / (1 - 0.00266))
+        assert zhd[1, 0] == pytest.approx(0.0022768 * 1013.25 / (1 + 0.00266 * 0.5))
+
+    def test_ztd_matches_methods(self, atmosphere):
+        """Test the ZTD helper matches the Magnus and Saastamoinen methods"""
+        temperature, pressure, humidity, elevation, _ = atmosphere
+        corrector = ERA5TroposphericCorrection(elevation, (40.0, 10.0, 39.0, 11.0))
+
+        e = corrector._calculate_vapor_pressure(temperature, humidity)
+        expected = corrector._saastamoinen_model(pressure, temperature, e, elevation)
+
+        np.testing.assert_allclose(era5_processor._ztd_numpy(*atmosphere), expected)
+
+
+class TestInterpolation:
+    """Test ERA5 fields are resampled onto the DEM grid"""
+
+    @pytest.fixture
+    def corrector(self, tmp_path):
+        corrector = ERA5TroposphericCorrection(np.zeros((30, 40)), (40.0, 10.0, 38.0, 13.0))
+        corrector.tri_cache_dir = tmp_path / "tri_cache"
+        return corrector
+
+    def test_regular_grid_shape_and_linear_field(self, corrector):
+        """Test a regular grid reproduces a bilinear field exactly in DEM orientation"""
+        lat = np.linspace(40.5, 37.5, 7)
+        lon = np.linspace(9.5, 13.5, 9)
+        field = 2.0 * lat[:, None] + 0.5 * lon[None, :]
+
+        result = corrector._interpolate_to_dem(field, lat, lon)
+
+        dem_lat = np.linspace(40.0, 38.0, 30)[:, None]
+        dem_lon = np.linspace(10.0, 13.0, 40)[None, :]
+        assert result.shape == (30, 40)
+        np.testing.assert_allclose(result, 2.0 * dem_lat + 0.5 * dem_lon)
+
+    @pytest.mark.parametrize("descending", [True, False])
+    def test_regular_grid_matches_scipy(self, corrector, descending):
+        """Test the separable bilinear path matches RegularGridInterpolator, NaN outside coverage"""
+        from scipy.interpolate import RegularGridInterpolator
+
+        rng = np.random.default_rng(7)
+        lat = np.linspace(39.6, 37.5, 8)  # DEM rows north of 39.6 fall outside
+        lon = np.linspace(9.5, 13.5, 11)
+        if not descending:
+            lat = lat[::-1]
+        field = rng.normal(size=(8, 11))
+        field[3, 4] = np.nan
+
+        result = corrector._interpolate_to_dem(field, lat, lon)
+
+        dem_lat, dem_lon = np.meshgrid(corrector.dem_lat, corrector.dem_lon, indexing="ij")
+        expected = RegularGridInterpolator((lat, lon), field, bounds_error=False, fill_value=np.nan)(
+            np.stack([dem_lat, dem_lon], axis=-1)
+        )
+        np.testing.assert_allclose(result, expected, rtol=1e-12, atol=1e-12, equal_nan=True)
+        assert np.isnan(result[0]).all() and not np.isnan(result[-1]).all()
+
+    @requires_numba
+    def test_blend_columns_numba_matches_numpy(self):
+        """Test the fused column blend matches the NumPy reference, NaN weights included"""
+        rng = np.random.default_rng(3)
+        rows = rng.normal(size=(25, 12))
+        rows[4, 6] = np.nan
+        c0, wc = era5_processor._axis_weights(np.linspace(9.5, 13.5, 12), np.linspace(9.0, 13.0, 40))
+
+        expected = era5_processor._blend_columns_numpy(rows, c0, wc)
+        actual = era5_processor._blend_columns_numba(rows, c0, wc)
+
+        np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-12, equal_nan=True)
+        assert np.isnan(actual[:, 0]).all()
+
+    def test_coordinates_from_transform(self):
+        """Test pixel-centre coordinates are derived from the geotransform"""
+        from rasterio.transform import Affine
+
+        transform = Affine(0.1, 0.0, 10.0, 0.0, -0.05, 40.0)
+        corrector = ERA5TroposphericCorrection(np.zeros((20, 30)), (40.0, 10.0, 39.0, 13.0), transform)
+
+        np.testing.assert_allclose(corrector.dem_lon, 10.05 + 0.1 * np.arange(30))
+        np.testing.assert_allclose(corrector.dem_lat, 39.975 - 0.05 * np.arange(20))
+
+    def test_scattered_points_match_griddata(self, corrector):
+        """Test scattered input matches griddata and reuses the triangulation"""
+        rng = np.random.default_rng(1)
+        lat = rng.uniform(37.5, 40.5, 200)
+        lon = rng.uniform(9.5, 13.5, 200)
+        values = rng.normal(size=200)
+
+        result = corrector._interpolate_to_dem(values, lat, lon)
+        corrector._interpolate_to_dem(values * 2, lat, lon)
+
+        dem_lat, dem_lon = np.meshgrid(
+            np.linspace(40.0, 38.0, 30), np.linspace(10.0, 13.0, 40), indexing="ij"
+        )
+        expected = griddata(np.column_stack([lat, lon]), values, (dem_lat, dem_lon), method="linear")
+        np.testing.assert_allclose(result, expected, equal_nan=True)
+        assert len(corrector._triangulations) == 1
+
+    def test_ztd_then_pwd_reuses_interpolations(self, corrector, monkeypatch):
+        """Test PWV after ZTD on the same inputs resamples nothing new"""
+        lat = np.linspace(40.5, 37.5, 7)
+        lon = np.linspace(9.5, 13.5, 9)
+        rng = np.random.default_rng(6)
+        temperature, pressure, humidity = (rng.normal(loc, 1, (7, 9)) for loc in (288, 101325, 60))
+        calls = []
+        uncached = corrector._interpolate_uncached
+        monkeypatch.setattr(corrector, "_interpolate_uncached", lambda *args: calls.append(1) or uncached(*args))
+
+        corrector.calculate_ztd(temperature, pressure, humidity, lat, lon)
+        corrector.calculate_pwd(temperature.copy(), humidity.copy(), lat, lon)
+
+        assert len(calls) == 3
+
+    def test_large_inputs_keyed_by_identity(self, corrector, monkeypatch):
+        """Test identity keys hit only for the same objects and the cache stays bounded"""
+        monkeypatch.setattr(era5_processor, "INTERP_HASH_MAX_BYTES", 0)
+        lat = np.linspace(40.5, 37.5, 7)
+        lon = np.linspace(9.5, 13.5, 9)
+        field = np.ones((7, 9))
+
+        first = corrector._interpolate_to_dem(field, lat, lon)
+        assert corrector._interpolate_to_dem(field, lat, lon) is first
+        assert corrector._interpolate_to_dem(field.copy(), lat, lon) is not first
+        assert not first.flags.writeable
+
+        for _ in range(era5_processor.INTERP_CACHE_SIZE + 2):
+            corrector._interpolate_to_dem(np.zeros((7, 9)), lat, lon)
+        assert len(corrector._interp_cache) == era5_processor.INTERP_CACHE_SIZE
+
+    def test_triangulation_persists_across_instances(self, corrector, monkeypatch):
+        """Test a later run reloads the pickled triangulation instead of rerunning Qhull"""
+        rng = np.random.default_rng(3)
+        lat = rng.uniform(37.5, 40.5, 200)
+        lon = rng.uniform(9.5, 13.5, 200)
+        values = rng.normal(size=200)
+        expected = corrector._interpolate_to_dem(values, lat, lon)
+
+        rerun = ERA5TroposphericCorrection(np.zeros((30, 40)), (40.0, 10.0, 38.0, 13.0))
+        rerun.tri_cache_dir = corrector.tri_cache_dir
+
+        def no_qhull(points):
+            raise AssertionError("triangulation was recomputed")
+
+        monkeypatch.setattr("scipy.spatial.Delaunay", no_qhull)
+        np.testing.assert_array_equal(rerun._interpolate_to_dem(values, lat, lon), expected)
+        assert len(list(corrector.tri_cache_dir.glob("*.pkl"))) == 1
+
+
+class TestLoading:
+    """Test ERA5 netCDF ingestion"""
+
+    @pytest.fixture
+    def nccopy(self, monkeypatch):
+        """Record nccopy invocations, writing the output file they name"""
+        calls = []
+
+        def run(args, **kwargs):
+            calls.append(args)
+            with open(args[-1], "wb") as f:
+                f.write(b"\x89HDF")
+
+        monkeypatch.setattr(era5_processor.shutil, "which", lambda name: f"/usr/bin/{name}")
+        monkeypatch.setattr(era5_processor.subprocess, "run", run)
+        return calls
+
+    def test_rechunk_classic_file_once(self, tmp_path, nccopy):
+        """Test netCDF-3 files are rewritten once and the copy reused"""
+        source = tmp_path / "era5.nc"
+        source.write_bytes(b"CDF\x01")
+
+        first = era5_processor._rechunk_era5(source, ntime=4)
+        second = era5_processor._rechunk_era5(source, ntime=4)
+
+        assert first == second == tmp_path / "era5.chunked.nc"
+        assert len(nccopy) == 1
+        assert "longitude/4,latitude/4,level/all,time/4" in nccopy[0]
+        assert not (tmp_path / "era5.chunked.tmp").exists()
+
+    def test_netcdf4_file_is_not_rechunked(self, tmp_path, nccopy):
+        """Test already-chunked files are read in place"""
+        source = tmp_path / "era5.nc"
+        source.write_bytes(b"\x89HDF")
+
+        assert era5_processor._rechunk_era5(source, ntime=4) == source
+        assert nccopy == []
+
+    @requires_xarray
+    def test_surface_fields(self):
+        """Test one epoch is taken at the highest-pressure level"""
+        import xarray as xr
+
+        shape = (2, 3, 4, 5)
+        ds = xr.Dataset(
+            {
+                "t": (("time", "level", "latitude", "longitude"), np.arange(np.prod(shape), dtype=float).reshape(shape)),
+                "r": (("time", "level", "latitude", "longitude"), np.full(shape, 50.0)),
+            },
+            coords={
+                "time": [0, 1],
+                "level": [500, 1000, 850],
+                "latitude": np.linspace(41, 38, 4),
+                "longitude": np.linspace(10, 14, 5),
+            },
+        )
+
+        temperature, humidity, pressure, lat, lon = era5_processor._era5_surface_fields(ds, time_index=1)
+
+        np.testing.assert_array_equal(temperature, ds["t"].values[1, 1])
+        assert pressure == pytest.approx(100000.0)
+        assert lat.shape == (4,) and lon.shape == (5,)
+
+
+class TestDownloader:
+    """Test ERA5 download caching"""
+
+    def test_cache_key_is_stable(self, tmp_path, monkeypatch):
+        """Test the cache file name depends only on the request"""
+        monkeypatch.chdir(tmp_path)
+        downloader = era5_processor.ERA5DataDownloader()
+        bbox = (40.0, 10.0, 39.0, 11.0)
+
+        first = downloader.download_era5_data("2024-01-01", "2024-01-13", bbox)
+        second = downloader.download_era5_data("2024-01-01", "2024-01-13", bbox)
+        other = downloader.download_era5_data("2024-01-01", "2024-01-25", bbox)
+
+        assert first["source"] == "cds"
+        assert second == {"status": "completed", "file": first["file"], "source": "cache"}
+        assert other["file"] != first["file"]
+        assert first["file"].endswith("era5_" + hashlib.blake2b(
+            f"2024-01-01|2024-01-13|{bbox}|{sorted(first['variables'])}".encode(), digest_size=16
+        ).hexdigest() + ".nc")
+
+
+class TestOutputs:
+    """Test ZTD/PWD raster writing"""
+
+    def test_write_raster_gathers_statistics(self, tmp_path):
+        """Test the tiled write round-trips and its statistics match nan reductions"""
+        import rasterio
+
+        rng = np.random.default_rng(5)
+        data = rng.normal(2.4, 0.1, (600, 700))
+        data[10, 20] = np.nan
+        pipeline = object.__new__(era5_processor.ERA5AtmosphericCorrection)
+
+        moments = pipeline._write_raster(tmp_path / "ztd.tif", data)
+
+        with rasterio.open(tmp_path / "ztd.tif") as src:
+            np.testing.assert_array_equal(src.read(1), data.astype(np.float32))
+            assert src.block_shapes == [(512, 512)]
+            assert src.overviews(1) == [2]
+            assert src.tags(ns="IMAGE_STRUCTURE")["LAYOUT"] == "COG"
+        reference = data.astype(np.float32).astype(np.float64)
+        assert moments.mean == pytest.approx(np.nanmean(reference), rel=1e-12)
+        assert moments.std() == pytest.approx(np.nanstd(reference), rel=1e-9)
+
+
+class TestSimulation:
+    """Test simulated ERA5 fields"""
+
+    def test_simulated_field(self):
+        """Test fields are float32, reproducible and have the requested moments"""
+        fields = [
+            era5_processor._simulated_field(np.random.default_rng(42), (200, 300), 288.15, 5)
+            for _ in range(2)
+        ]
+
+        assert fields[0].dtype == np.float32
+        np.testing.assert_array_equal(fields[0], fields[1])
+        assert fields[0].mean() == pytest.approx(288.15, abs=0.1)
+        assert fields[0].std() == pytest.approx(5, rel=0.02)
@@ -0,0 +1,235 @@
+"""
+Unit tests for GACOS atmospheric correction
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import numpy as np
+import rasterio
+from rasterio.transform import Affine
+
+import gacos_processor
+from gacos_processor import GACOSAtmosphericCorrection, GACOSClient
+
+
+def _affine_supported():
+    try:
+        Affine.identity() * (0, 0)
+        return True
+    except TypeError:
+        return False
+
+
+# Dataset bounds need Affine arithmetic, which some affine/rasterio pairings break
+requires_affine = pytest.mark.skipif(
+    not _affine_supported(), reason="affine incompatible with installed rasterio"
+)
+
+
+def _write(path, data, **profile):
+    with rasterio.open(
+        path, 'w', driver='GTiff', height=data.shape[0], width=data.shape[1], count=1,
+        dtype=rasterio.float32, crs='EPSG:4326', transform=Affine.identity(), **profile
+    ) as dst:
+        dst.write(data.astype(np.float32), 1)
+    return str(path)
+
+
+@pytest.fixture
+def scene(tmp_path):
+    """DEM, interferogram and GACOS ZTD files on a shared 70x50 grid"""
+    rng = np.random.default_rng(0)
+    shape = (70, 50)
+    ifg = rng.normal(0, 2, shape)
+    ifg[5, 7] = np.nan
+    ztd = rng.normal(2.4, 0.05, shape)
+    return {
+        "dem": _write(tmp_path / "dem.tif", rng.normal(800, 300, shape)),
+        "ifg": _write(tmp_path / "ifg.tif", ifg),
+        "ztd": _write(tmp_path / "ztd.tif", ztd),
+        "output_dir": str(tmp_path / "out"),
+    }
+
+
+class TestCorrection:
+    """Test the fused phase-delay subtraction"""
+
+    def test_correct_phase_matches_reference(self, monkeypatch):
+        """Test the in-place and numexpr paths match the two-step formula"""
+        rng = np.random.default_rng(1)
+        ifg = rng.normal(0, 2, (30, 40)).astype(np.float32)
+        ztd = rng.normal(2.4, 0.05, (30, 40)).astype(np.float32)
+        expected = ifg - (4 * np.pi * ztd.astype(np.float64)) / 0.0555
+
+        for numexpr in {False, gacos_processor.NUMEXPR_AVAILABLE}:
+            monkeypatch.setattr(gacos_processor, "NUMEXPR_AVAILABLE", numexpr)
+            actual = gacos_processor._correct_phase(ifg, ztd, gacos_processor._phase_factor(0.0555))
+
+            assert actual.dtype == np.float32
+            np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-3)
+
+    @requires_affine
+    def test_apply_gacos_correction(self, scene, monkeypatch):
+        """Test the tiled output and streamed statistics match a direct computation"""
+        monkeypatch.setattr(gacos_processor, "TILE_SIZE", 16)
+        corrector = GACOSAtmosphericCorrection(scene["dem"], scene["ifg"], scene["output_dir"])
+
+        result = corrector.apply_gacos_correction(scene["ztd"])
+
+        assert result["status"] == "completed"
+        with rasterio.open(scene["ifg"]) as src:
+            ifg = src.read(1).astype(np.float64)
+        with rasterio.open(scene["ztd"]) as src:
+            delay = 4 * np.pi * src.read(1).astype(np.float64) / 0.0555
+        with rasterio.open(result["output_file"]) as src:
+            written = src.read(1)
+            assert src.block_shapes == [(16, 16)]
+            assert src.compression.value == "DEFLATE"
+            assert src.tags(ns="IMAGE_STRUCTURE")["LAYOUT"] == "COG"
+
+        np.testing.assert_allclose(written, ifg - delay, rtol=1e-5, atol=1e-3)
+        assert np.isnan(written[5, 7])
+        stats = result["statistics"]
+        assert stats["original_std"] == pytest.approx(np.nanstd(ifg), rel=1e-6)
+        assert stats["corrected_std"] == pytest.approx(np.nanstd(ifg - delay), rel=1e-4)
+        assert stats["mean_phase_delay"] == pytest.approx(delay.mean(), rel=1e-6)
+
+    @requires_affine
+    def test_grid_mismatch(self, scene, tmp_path):
+        """Test a GACOS product on a different grid is rejected"""
+        corrector = GACOSAtmosphericCorrection(scene["dem"], scene["ifg"], scene["output_dir"])
+        other = _write(tmp_path / "other.tif", np.zeros((32, 32)))
+
+        result = corrector.apply_gacos_correction(other)
+
+        assert result["status"] == "error"
+        assert "does not match" in result["error"]
+
+
+class TestValidation:
+    """Test coverage counting"""
+
+    @pytest.mark.parametrize("nodata", [None, -9999.0])
+    def test_coverage_counts_nan_and_nodata(self, tmp_path, nodata):
+        """Test NaN and declared nodata pixels both count as uncovered"""
+        data = np.ones((70, 50))
+        data[:7] = np.nan
+        data[7:14] = -9999.0
+        gacos_file = _write(tmp_path / "ztd.tif", data, nodata=nodata)
+        # Coverage needs no interferogram state
+        corrector = object.__new__(GACOSAtmosphericCorrection)
+
+        result = corrector.validate_gacos_coverage(gacos_file, coverage_threshold=0.85)
+
+        invalid = 7 * 50 if nodata is None else 14 * 50
+        assert result["total_pixels"] == 3500
+        assert result["valid_pixels"] == 3500 - invalid
+        assert result["coverage"] == pytest.approx((3500 - invalid) / 3500)
+        assert result["is_valid"] is (nodata is None)
+
+
+PRODUCT = bytes(range(256)) * 8192  # 2MB
+
+
+class ProductHandler(BaseHTTPRequestHandler):
+    """Serves PRODUCT under /products/, 404 elsewhere"""
+
+    def do_GET(self):
+        if not self.path.startswith("/products/"):
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(PRODUCT)))
+        self.end_headers()
+        self.wfile.write(PRODUCT)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    """Local HTTP server for the test module"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ProductHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+class TestClient:
+    """Test async GACOS product downloads"""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        return GACOSClient()
+
+    def test_download_many_streams_urls(self, client, server):
+        """Test URL products are streamed and results keep the requested order"""
+        ids = [f"GACOS_{i}" for i in range(4)]
+        urls = {product_id: f"{server}/products/{product_id}.tif" for product_id in ids}
+
+        results = client.download_gacos_products_many(ids, urls)
+
+        assert [result["product_id"] for result in results] == ids
+        for result in results:
+            assert result["status"] == "completed"
+            assert open(result["file"], "rb").read() == PRODUCT
+        assert not list(client.cache_dir.glob("*.part"))
+
+        cached = client.download_gacos_product("GACOS_2", url=urls["GACOS_2"])
+        assert cached["source"] == "cache"
+
+    def test_http_error_leaves_no_file(self, client, server):
+        """Test a failed product reports an error without affecting the others"""
+        results = client.download_gacos_products_many(
+            ["GACOS_missing", "GACOS_ok"],
+            {"GACOS_missing": f"{server}/missing.tif", "GACOS_ok": f"{server}/products/ok.tif"}
+        )
+
+        assert [result["status"] for result in results] == ["error", "completed"]
+        assert not (client.cache_dir / "GACOS_missing.tif").exists()
+        assert not list(client.cache_dir.glob("*.part"))
+
+    def test_simulated_product(self, client):
+        """Test products without a URL are generated locally"""
+        result = client.download_gacos_product("GACOS_sim")
+
+        assert result["status"] == "completed"
+        with rasterio.open(result["file"]) as src:
+            assert src.shape == (256, 256)
+
+
+class TestPipeline:
+    """Test the concurrent download / correction pipeline"""
+
+    @requires_affine
+    def test_products_corrected_in_worker_processes(self, scene, tmp_path, monkeypatch):
+        """Test each valid product gets its own output and low coverage is skipped"""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(gacos_processor, "PARALLEL_MIN_PIXELS", 0)
+        gaps = np.full((70, 50), np.nan)
+        gaps[:10] = 2.4
+        files = {"GACOS_a": scene["ztd"], "GACOS_b": scene["ztd"], "GACOS_gaps": _write(tmp_path / "gaps.tif", gaps)}
+
+        pipeline = gacos_processor.GACOSCorrectionPipeline(
+            scene["dem"], scene["ifg"], scene["output_dir"], "2024-01-01", "2024-01-13", (40, 10, 39, 11)
+        )
+        monkeypatch.setattr(pipeline.client, "query_gacos_products", lambda *args: {
+            "status": "completed", "products": [{"id": product_id} for product_id in files]
+        })
+        monkeypatch.setattr(pipeline.client, "download_gacos_products_many", lambda product_ids: [
+            {"status": "completed", "file": files[product_id]} for product_id in product_ids
+        ])
+
+        result = pipeline.run_full_correction()
+
+        assert result["status"] == "completed"
+        assert sorted(result["corrections"]) == ["GACOS_a", "GACOS_b"]
+        outputs = [result["corrections"][product_id]["correction"]["output_file"] for product_id in ("GACOS_a", "GACOS_b")]
+        assert outputs[0] != outputs[1]
+        with rasterio.open(outputs[0]) as a, rasterio.open(outputs[1]) as b:
+            np.testing.assert_array_equal(a.read(1), b.read(1))
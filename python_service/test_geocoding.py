@@ -0,0 +1,407 @@
+"""
+Unit tests for geocoding and map overlay generation
+"""
+
+import math
+
+import pytest
+import numpy as np
+
+import geocoding
+from geocoding import BoundingBox, GeocodingProcessor, GeoTransform
+
+
+requires_numba = pytest.mark.skipif(
+    not geocoding.NUMBA_AVAILABLE, reason="numba not installed"
+)
+
+
+@pytest.fixture
+def geocoder(tmp_path):
+    """GeocodingProcessor writing under tmp_path"""
+    return GeocodingProcessor(str(tmp_path / "geocoded"))
+
+
+@pytest.fixture
+def bounds():
+    return BoundingBox(36.5, 37.0, 38.0, 38.5)
+
+
+class TestGeoTransform:
+    """Test pixel / geographic coordinate conversion"""
+
+    @pytest.mark.parametrize("rotation", [0.0, 0.002])
+    def test_geo_to_pixel_inverts_pixel_to_geo(self, rotation):
+        """Test pixel centres map back to their pixel for whole arrays at once"""
+        transform = GeoTransform(36.5, 0.01, rotation, 38.5, -rotation, -0.01)
+        rows, cols = np.mgrid[0:40, 0:60]
+        x, y = transform.pixel_to_geo(cols + 0.5, rows + 0.5)
+
+        col, row = transform.geo_to_pixel(x, y)
+
+        assert col.dtype == np.int32
+        np.testing.assert_array_equal(col, cols)
+        np.testing.assert_array_equal(row, rows)
+
+    def test_geo_to_pixel_scalar(self):
+        """Test scalars return ints, floored west of / north of the origin"""
+        transform = GeoTransform(36.5, 0.01, 0.0, 38.5, 0.0, -0.01)
+
+        assert transform.geo_to_pixel(36.555, 38.405) == (5, 9)
+        col, row = transform.geo_to_pixel(36.495, 38.505)
+        assert (col, row) == (-1, -1) and type(col) is int
+
+
+class TestStatistics:
+    """Test single-pass raster statistics"""
+
+    @pytest.mark.parametrize("numba", [False, True])
+    def test_matches_nan_reductions(self, numba, monkeypatch):
+        """Test both paths match nanmin/nanmax/nanmean/nanstd, also with a large offset"""
+        if numba and not geocoding.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        monkeypatch.setattr(geocoding, "NUMBA_AVAILABLE", numba)
+        data = (1000 + np.random.default_rng(9).normal(size=(120, 90)) * 0.01).astype(np.float32)
+        data[::7, ::3] = np.nan
+        data[5] = np.nan
+
+        minimum, maximum, mean, std = geocoding._nan_stats(data)
+
+        reference = data.astype(np.float64)
+        assert minimum == np.nanmin(reference) and maximum == np.nanmax(reference)
+        assert mean == pytest.approx(np.nanmean(reference), rel=1e-12)
+        assert std == pytest.approx(np.nanstd(reference), rel=1e-9)
+
+    def test_all_nan(self):
+        assert np.isnan(geocoding._nan_stats(np.full((4, 4), np.nan, dtype=np.float32))).all()
+
+    def test_extract_geotiff_info(self, geocoder, bounds):
+        """Test the reported statistics come from the float32 raster"""
+        data = np.random.default_rng(10).normal(size=(30, 40))
+
+        info = geocoder.extract_geotiff_info(data, bounds=bounds)
+
+        reference = data.astype(np.float32).astype(np.float64)
+        assert info["data_type"] == "float32"
+        assert info["statistics"]["std"] == pytest.approx(np.std(reference), rel=1e-9)
+        assert info["statistics"]["max"] == reference.max()
+
+
+class TestGeoJSONOverlay:
+    """Test point features emitted for kept pixels"""
+
+    def _reference_features(self, data, bounds, threshold):
+        height, width = data.shape
+        features = []
+        for row in range(height):
+            for col in range(width):
+                value = data[row, col]
+                if np.isnan(value) or (threshold is not None and abs(value) < threshold):
+                    continue
+                lon = bounds.min_lon + (col + 0.5) * bounds.width / width
+                lat = bounds.max_lat - (row + 0.5) * bounds.height / height
+                features.append({
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                    "properties": {"value": float(value), "row": row, "col": col}
+                })
+        return features
+
+    @pytest.mark.parametrize("threshold", [None, 0.0, 1.5])
+    def test_features_match_pixel_loop(self, geocoder, bounds, threshold):
+        """Test the masked pass keeps the same pixels, order and values as a per-pixel loop"""
+        data = np.random.default_rng(0).normal(size=(20, 30))
+        data[3, 4] = np.nan
+
+        overlay = geocoder.create_geojson_overlay(data, bounds, threshold)
+
+        expected = self._reference_features(data, bounds, threshold)
+        assert len(overlay["features"]) == len(expected)
+        for actual, reference in zip(overlay["features"], expected):
+            assert actual["properties"] == reference["properties"]
+            assert actual["geometry"]["coordinates"] == pytest.approx(reference["geometry"]["coordinates"])
+            assert type(actual["properties"]["row"]) is int
+
+
+def _meshgrid_reference(data, src_bounds, dst_bounds, dst_size, method):
+    """Reprojection evaluated on full 2-D coordinate grids"""
+    height, width = data.shape
+    dst_xx, dst_yy = np.meshgrid(
+        np.linspace(dst_bounds.min_lon, dst_bounds.max_lon, dst_size[0]),
+        np.linspace(dst_bounds.max_lat, dst_bounds.min_lat, dst_size[1])
+    )
+    col = (dst_xx - src_bounds.min_lon) / src_bounds.width * width
+    row = (src_bounds.max_lat - dst_yy) / src_bounds.height * height
+    if method == "nearest":
+        return data[np.clip(np.round(row).astype(int), 0, height - 1),
+                    np.clip(np.round(col).astype(int), 0, width - 1)]
+    col0 = np.clip(np.floor(col).astype(int), 0, width - 1)
+    row0 = np.clip(np.floor(row).astype(int), 0, height - 1)
+    col1 = np.clip(col0 + 1, 0, width - 1)
+    row1 = np.clip(row0 + 1, 0, height - 1)
+    col_frac = col - col0
+    row_frac = row - row0
+    return (data[row0, col0] * (1 - col_frac) * (1 - row_frac) +
+            data[row0, col1] * col_frac * (1 - row_frac) +
+            data[row1, col0] * (1 - col_frac) * row_frac +
+            data[row1, col1] * col_frac * row_frac)
+
+
+    def test_pixel_axes_cached_per_grid(self, geocoder, bounds, monkeypatch):
+        """Test axes are reused for the same grid and the oldest grid is evicted"""
+        monkeypatch.setattr(geocoding, "AXES_CACHE_SIZE", 2)
+        lons, lats = geocoder._pixel_axes(20, 30, bounds)
+
+        assert geocoder._pixel_axes(20, 30, bounds)[0] is lons
+        assert lats[0] == pytest.approx(bounds.max_lat - 0.5 * bounds.height / 20)
+        assert not lons.flags.writeable
+        geocoder._pixel_axes(20, 31, bounds)
+        geocoder._pixel_axes(21, 30, bounds)
+        assert geocoder._pixel_axes(20, 30, bounds)[0] is not lons
+
+
+class TestReproject:
+    """Test resampling onto a destination grid"""
+
+    @pytest.mark.parametrize("method", ["nearest", "bilinear"])
+    def test_matches_meshgrid_reference(self, geocoder, bounds, method):
+        """Test broadcasting 1-D source axes matches evaluating full coordinate grids, in float32"""
+        data = np.random.default_rng(1).normal(size=(40, 50)).astype(np.float32)
+        data[7, 9] = np.nan
+        # Partly outside the source, so edge clipping is exercised
+        dst_bounds = BoundingBox(36.8, 37.2, 38.3, 38.6)
+
+        result = geocoder.reproject(data, bounds, dst_bounds, (33, 21), method)
+
+        expected = _meshgrid_reference(data, bounds, dst_bounds, (33, 21), method)
+        assert result.shape == (21, 33)
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, expected, rtol=1e-6, atol=1e-6, equal_nan=True)
+
+    def test_bilinear_numpy_fallback(self, geocoder, bounds, monkeypatch):
+        """Test the NumPy kernel is used, and agrees, when numba is unavailable"""
+        monkeypatch.setattr(geocoding, "NUMBA_AVAILABLE", False)
+        data = np.random.default_rng(2).normal(size=(40, 50)).astype(np.float32)
+        dst_bounds = BoundingBox(36.8, 37.2, 38.3, 38.6)
+
+        result = geocoder.reproject(data, bounds, dst_bounds, (33, 21), "bilinear")
+
+        expected = _meshgrid_reference(data, bounds, dst_bounds, (33, 21), "bilinear")
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, expected, rtol=1e-6, atol=1e-6)
+
+    @requires_numba
+    def test_bilinear_numba_matches_numpy(self):
+        """Test the fused kernel against the NumPy reference, NaN and edges included"""
+        rng = np.random.default_rng(3)
+        data = rng.normal(size=(30, 25))
+        data[10, 12] = np.nan
+        col = np.linspace(-2.0, 27.0, 41)
+        row = np.linspace(-1.0, 31.0, 37)
+        out = np.empty((37, 41))
+
+        actual = geocoding._bilinear_numba(data, col, row, out)
+
+        assert actual is out
+        np.testing.assert_allclose(
+            actual, geocoding._bilinear_numpy(data, col, row), rtol=1e-12, atol=1e-12, equal_nan=True
+        )
+
+
+def _jet_reference():
+    """Jet table built entry by entry"""
+    colors = np.zeros((256, 3), dtype=np.uint8)
+    for i in range(256):
+        t = i / 255
+        if t < 0.125:
+            colors[i] = [0, 0, int(255 * (0.5 + 4 * t))]
+        elif t < 0.375:
+            colors[i] = [0, int(255 * (4 * (t - 0.125))), 255]
+        elif t < 0.625:
+            colors[i] = [int(255 * (4 * (t - 0.375))), 255, int(255 * (1 - 4 * (t - 0.375)))]
+        elif t < 0.875:
+            colors[i] = [255, int(255 * (1 - 4 * (t - 0.625))), 0]
+        else:
+            colors[i] = [int(255 * (1 - 4 * (t - 0.875))), 0, 0]
+    return colors
+
+
+class TestColormaps:
+    """Test the precomputed colormap tables"""
+
+    def test_jet_matches_piecewise_definition(self):
+        """Test the vectorized table reproduces the per-entry piecewise definition"""
+        np.testing.assert_array_equal(geocoding.COLORMAP_LUTS["jet"], _jet_reference())
+
+    @pytest.mark.parametrize("name, first, last", [
+        ("viridis", [68, 1, 84], [255, 255, 254]),
+        ("coolwarm", [0, 0, 255], [255, 0, 0]),
+        ("rdylgn", [255, 0, 0], [0, 255, 0]),
+    ])
+    def test_endpoints(self, name, first, last):
+        lut = geocoding.COLORMAP_LUTS[name]
+        assert lut.shape == (256, 3) and lut.dtype == np.uint8
+        assert lut[0].tolist() == first and lut[-1].tolist() == last
+
+    def test_tables_are_shared(self, geocoder):
+        """Test lookups return the module tables, falling back to viridis"""
+        assert geocoder._get_colormap("jet") is geocoding.COLORMAP_LUTS["jet"]
+        assert geocoder._get_colormap("unknown") is geocoding.COLORMAP_LUTS["viridis"]
+        assert not geocoding.COLORMAP_LUTS["jet"].flags.writeable
+
+    def _reference_rgba(self, data, colors):
+        """Normalize, index and assign each channel separately"""
+        valid = ~np.isnan(data)
+        vmin, vmax = np.nanmin(data), np.nanmax(data)
+        normalized = np.zeros_like(data) if vmax == vmin else (data - vmin) / (vmax - vmin)
+        indices = np.clip(np.nan_to_num(normalized * 255).astype(int), 0, 255)
+        rgba = np.zeros((*data.shape, 4), dtype=np.uint8)
+        for i in range(3):
+            rgba[..., i] = colors[indices, i]
+        rgba[..., 3] = np.where(valid, 200, 0)
+        return rgba
+
+    @pytest.mark.parametrize("dtype", [np.float64, np.float32])
+    def test_apply_colormap_matches_reference(self, geocoder, dtype):
+        """Test the single RGBA lookup matches per-channel assignment, NaN transparent"""
+        data = np.random.default_rng(4).normal(size=(64, 48)).astype(dtype)
+        data[5, 6] = np.nan
+
+        rgba = geocoder._apply_colormap(data, "coolwarm")
+
+        np.testing.assert_array_equal(rgba, self._reference_rgba(data, geocoding.COLORMAP_LUTS["coolwarm"]))
+        assert rgba[5, 6, 3] == 0
+
+    @pytest.mark.parametrize("fill", [np.nan, 3.0])
+    def test_apply_colormap_degenerate(self, geocoder, fill):
+        """Test all-NaN tiles are fully transparent and constant tiles use the first color"""
+        data = np.full((8, 8), fill)
+
+        rgba = geocoder._apply_colormap(data, "jet")
+
+        expected = np.zeros((8, 8, 4), dtype=np.uint8) if np.isnan(fill) else \
+            np.broadcast_to(geocoding.COLORMAP_RGBA["jet"][0], (8, 8, 4))
+        np.testing.assert_array_equal(rgba, expected)
+
+
+class TestTiles:
+    """Test the tile pyramid"""
+
+    @pytest.fixture
+    def captured(self, geocoder, monkeypatch):
+        """Tile data passed to _save_tile, keyed by (zoom, x, y)"""
+        tiles = {}
+        save = geocoder._save_tile
+
+        def capture(tile_data, zoom, tile_x, tile_y, colormap):
+            tiles[zoom, tile_x, tile_y] = tile_data
+            save(tile_data, zoom, tile_x, tile_y, colormap)
+
+        monkeypatch.setattr(geocoder, "_save_tile", capture)
+        return tiles
+
+    def test_tile_set_matches_per_level_ranges(self, geocoder, bounds, captured):
+        """Test every level lists the tiles covering the bounds, in zoom then (x, y) order"""
+        data = np.random.default_rng(5).normal(size=(60, 60))
+
+        info = geocoder.generate_tiles(data, bounds, min_zoom=6, max_zoom=9, tile_size=16)
+
+        expected = []
+        for zoom in range(6, 10):
+            min_x, min_y = geocoder._lon_lat_to_tile(bounds.min_lon, bounds.max_lat, zoom)
+            max_x, max_y = geocoder._lon_lat_to_tile(bounds.max_lon, bounds.min_lat, zoom)
+            expected += [(zoom, x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+        assert info["tiles"].dtype == geocoding.TILE_DTYPE
+        assert info["tiles"][["zoom", "x", "y"]].tolist() == expected
+        assert set(captured) == set(expected)
+
+    @pytest.mark.filterwarnings("ignore:Mean of empty slice")
+    def test_parent_is_average_of_children(self, geocoder, bounds, captured):
+        """Test only the top level is reprojected and parents average 2x2 child pixels"""
+        data = np.random.default_rng(6).normal(size=(60, 60))
+
+        geocoder.generate_tiles(data, bounds, min_zoom=7, max_zoom=9, tile_size=16)
+
+        for (zoom, x, y), tile in captured.items():
+            if zoom == 9:
+                expected = geocoder.reproject(data, bounds, geocoder._tile_to_bounds(x, y, zoom), (16, 16))
+            else:
+                mosaic = np.full((32, 32), np.nan)
+                for dy in (0, 1):
+                    for dx in (0, 1):
+                        child = captured.get((zoom + 1, 2 * x + dx, 2 * y + dy))
+                        if child is not None:
+                            mosaic[dy * 16:(dy + 1) * 16, dx * 16:(dx + 1) * 16] = child
+                expected = np.nanmean(mosaic.reshape(16, 2, 16, 2), axis=(1, 3))
+            assert tile.dtype == np.float32
+            np.testing.assert_allclose(tile, expected, rtol=1e-6, atol=1e-6, equal_nan=True)
+
+    def test_tile_math_accepts_arrays(self, geocoder):
+        """Test the vectorized tile helpers match scalar slippy-map formulas"""
+        lon = np.array([-179.9, -12.3, 0.0, 36.5, 179.9])
+        lat = np.array([-84.0, -33.3, 0.1, 38.5, 84.0])
+        zoom = 9
+        n = 2 ** zoom
+
+        tile_x, tile_y = geocoder._lon_lat_to_tile(lon, lat, zoom)
+
+        for k in range(lon.size):
+            rad = math.radians(lat[k])
+            assert tile_x[k] == int((lon[k] + 180) / 360 * n)
+            assert tile_y[k] == int((1 - math.log(math.tan(rad) + 1 / math.cos(rad)) / math.pi) / 2 * n)
+            tile = geocoder._tile_to_bounds(int(tile_x[k]), int(tile_y[k]), zoom)
+            assert tile.min_lon == pytest.approx(tile_x[k] / n * 360 - 180)
+            assert tile.max_lat == pytest.approx(math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y[k] / n)))))
+            assert tile.contains(lon[k], lat[k])
+        assert geocoder._lon_lat_to_tile(36.5, 38.5, zoom) == (int(tile_x[3]), int(tile_y[3]))
+
+    def test_tile_bounds_from_level_edges(self, geocoder, bounds):
+        """Test bounds listed per tile match converting each tile on its own"""
+        info = geocoder.generate_tiles(np.ones((20, 20)), bounds, min_zoom=7, max_zoom=8, tile_size=8)
+
+        for tile in geocoder.tile_records(info["tiles"]):
+            expected = geocoder._tile_to_bounds(tile["x"], tile["y"], tile["zoom"]).to_dict()
+            assert tile["bounds"] == pytest.approx(expected)
+            assert tile["path"].endswith(f"tiles/{tile['zoom']}/{tile['x']}/{tile['y']}.png")
+            assert type(tile["zoom"]) is int
+
+    def test_geocoded_json_lists_tile_dicts(self, geocoder):
+        """Test the saved result serializes tile metadata as a list of dicts"""
+        import json
+
+        data = np.random.default_rng(7).normal(size=(20, 20))
+        # Small footprint keeps the default zoom 8-14 pyramid cheap
+        result = geocoder.geocode_insar_result(data, BoundingBox(36.5, 37.0, 36.55, 37.05), result_type="coherence")
+
+        with open(result["output_path"]) as f:
+            saved = json.load(f)
+        records = geocoder.tile_records(result["tiles"]["tiles"])
+        assert saved["tiles"]["tiles"] == json.loads(json.dumps(records))
+        assert len(saved["tiles"]["tiles"]) == len(result["tiles"]["tiles"]) > 0
+
+    def test_split_zoom(self, geocoder, bounds, monkeypatch):
+        """Test small pyramids stay serial and large ones split at the first level with enough tasks"""
+        grids = {zoom: geocoder._tile_range(bounds, zoom) for zoom in range(6, 11)}
+        monkeypatch.setattr(geocoding, "TILE_WORKERS", 2)
+
+        assert geocoder._split_zoom(grids, 6, 10) == 6
+        monkeypatch.setattr(geocoding, "PARALLEL_MIN_TILES", 0)
+        split = geocoder._split_zoom(grids, 6, 10)
+        assert geocoder._leaf_count(grids[split]) >= 8 > geocoder._leaf_count(grids[split - 1])
+
+    def test_parallel_matches_serial(self, geocoder, bounds, captured, monkeypatch):
+        """Test subtrees built in worker processes give the same tiles and parent data"""
+        data = np.random.default_rng(8).normal(size=(60, 60))
+        serial = geocoder.generate_tiles(data, bounds, min_zoom=6, max_zoom=9, tile_size=16)
+        serial_data = dict(captured)
+        captured.clear()
+        monkeypatch.setattr(geocoding, "PARALLEL_MIN_TILES", 0)
+        monkeypatch.setattr(geocoding, "TILE_WORKERS", 2)
+
+        parallel = geocoder.generate_tiles(data, bounds, min_zoom=6, max_zoom=9, tile_size=16)
+
+        np.testing.assert_array_equal(parallel["tiles"], serial["tiles"])
+        # Levels above the split are averaged in this process from the workers' subtree roots
+        assert captured and all(zoom < 9 for zoom, _, _ in captured)
+        for key, tile in captured.items():
+            np.testing.assert_allclose(tile, serial_data[key], rtol=1e-12, equal_nan=True)
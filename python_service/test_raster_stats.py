@@ -0,0 +1,49 @@
+"""
+Unit tests for streaming raster statistics
+"""
+
+import pytest
+import numpy as np
+
+from raster_stats import OnlineMoments
+
+
+class TestOnlineMoments:
+    """Test tile-wise moments against whole-array NumPy reductions"""
+
+    def test_matches_nan_stats(self):
+        """Test uneven tiles with NaN reproduce np.nanmean / np.nanstd"""
+        rng = np.random.default_rng(2)
+        data = rng.normal(3, 2, (70, 50)).astype(np.float32)
+        data[::7, ::5] = np.nan
+        moments = OnlineMoments()
+
+        for rows in np.array_split(np.arange(70), 4):
+            moments.update(data[rows])
+        moments.update(np.full((3, 3), np.nan, dtype=np.float32))
+
+        reference = data.astype(np.float64)
+        assert moments.count == np.count_nonzero(~np.isnan(data))
+        assert moments.mean == pytest.approx(np.nanmean(reference), rel=1e-12)
+        assert moments.std() == pytest.approx(np.nanstd(reference), rel=1e-12)
+        assert moments.std(ddof=1) == pytest.approx(np.nanstd(reference, ddof=1), rel=1e-12)
+
+    def test_large_offset_keeps_precision(self):
+        """Test a small spread on a large mean survives (no sum-of-squares cancellation)"""
+        rng = np.random.default_rng(4)
+        data = 1e8 + rng.normal(0, 1e-2, 100_000)
+        moments = OnlineMoments()
+
+        for tile in np.array_split(data, 37):
+            moments.update(tile)
+
+        assert moments.std() == pytest.approx(np.std(data), rel=1e-6)
+
+    def test_empty_and_scalar(self):
+        """Test no values give NaN and scalars count as one value"""
+        moments = OnlineMoments()
+        assert np.isnan(moments.mean) and np.isnan(moments.std())
+
+        moments.update(2.5)
+        assert moments.mean == 2.5 and moments.std() == 0.0
+        assert np.isnan(moments.std(ddof=1))